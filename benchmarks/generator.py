@@ -0,0 +1,276 @@
+"""
+Synthetic Geo DB at benchmark scale
+
+Payloads have the shape of the published Geo Database Dump files: States,
+Metro Areas, Counties, Cities and Zip Codes across US, Canadian and Mexican
+states, with bounding boxes on aggregates and long tailed populations.
+About 55% of the shapes are Zip Codes, 35% Cities, 7% Counties and 1% Metro
+Areas, like the managed database.
+
+    from benchmarks.generator import generate_geo_db
+    geo_shape_dict, search_dict = generate_geo_db(num_shapes=100_000)
+
+The same generator builds the small per state Geo DB of the tests, and the
+payloads are written as the local cache or served as the data store.
+"""
+from contextlib import contextmanager
+import functools
+import gzip
+from http import HTTPStatus
+import http.server
+import json
+import os
+import random
+import re
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+from yat_geo_db.fuzzy import ngrams
+
+STATES = {
+    'US': [
+        ('AL', 32.8, -86.8), ('AZ', 34.2, -111.7), ('CA', 37.2, -119.5), ('CO', 39.0, -105.5),
+        ('FL', 28.6, -82.4), ('GA', 32.7, -83.4), ('IL', 40.0, -89.2), ('IN', 39.9, -86.3),
+        ('KY', 37.5, -85.3), ('LA', 31.1, -92.0), ('MI', 44.3, -85.4), ('MN', 46.3, -94.3),
+        ('MO', 38.4, -92.5), ('NC', 35.6, -79.4), ('NY', 42.9, -75.5), ('OH', 40.3, -82.8),
+        ('OK', 35.6, -97.5), ('PA', 40.9, -77.8), ('TN', 35.9, -86.4), ('TX', 31.5, -99.3),
+        ('VA', 37.5, -78.9), ('WA', 47.4, -120.5), ('WI', 44.6, -89.9),
+    ],
+    'CA': [('AB', 54.5, -114.5), ('BC', 50.0, -123.0), ('MB', 50.5, -97.5), ('ON', 45.5, -79.5), ('QC', 46.8, -72.0)],
+    'MX': [('CH', 28.6, -106.1), ('JA', 20.6, -103.3), ('NL', 25.7, -100.3), ('SO', 29.3, -110.3)],
+}
+# Share of Cities per country, Zip Codes follow Cities
+COUNTRY_WEIGHTS = {'US': .78, 'CA': .12, 'MX': .10}
+SYLLABLES = [
+    'an', 'ar', 'ber', 'bur', 'ca', 'ches', 'da', 'del', 'field', 'ford', 'glen', 'ham', 'har', 'hill',
+    'ing', 'ka', 'lan', 'ley', 'lo', 'ma', 'mar', 'mont', 'na', 'new', 'or', 'pal', 'port', 'ra', 'ridge',
+    'ro', 'san', 'sha', 'spring', 'ster', 'ta', 'ton', 'va', 'ville', 'wa', 'wood',
+]
+# Zip Codes per City and one County per COUNTY_EVERY, one Metro Area per METRO_EVERY Cities
+ZIP_CODES_PER_CITY = (1, 2)
+COUNTY_EVERY = 5
+METRO_EVERY = 35
+
+
+def clean(value: str) -> str:
+    return re.sub('[^0-9a-zA-Z ]+', '', value).lower()
+
+
+def bbox(latitude: float, longitude: float, half_size: float) -> Dict[str, str]:
+    return {
+        'll_latitude': f'{latitude - half_size:.6f}',
+        'ur_latitude': f'{latitude + half_size:.6f}',
+        'll_longitude': f'{longitude - half_size:.6f}',
+        'ur_longitude': f'{longitude + half_size:.6f}',
+    }
+
+
+def postal_code(rng: random.Random, country: str, index: int) -> str:
+    """Unique postal code in the country's format"""
+    if country == 'CA':
+        letters = 'ABCEGHJKLMNPRSTVXY'
+        return (f'{letters[index % 18]}{index // 18 % 10}{letters[index // 180 % 18]} '
+                f'{index // 3240 % 10}{letters[rng.randrange(18)]}{rng.randrange(10)}')
+    # Stride coprime to 10^5 spreads consecutive codes over the whole range
+    return f'{(index * 7919 + 501) % 100000:05d}'
+
+
+class GeoDBGenerator(object):
+    """Builds the shape records, reference codes and ids are unique"""
+    def __init__(self, seed: int = 7, syllables: List[str] = SYLLABLES):
+        self.rng = random.Random(seed)
+        self.syllables = syllables
+        self.geo_shape_dict: Dict[str, Dict] = {}
+        self.next_id = 1
+
+    def add(self, geo_type: str, value: str, reference_code: str, latitude: float, longitude: float,
+            country: str, state: str, population: int, area: float = 0.0, half_size: float = 0.0,
+            zip_code: str = None, city: str = None, metro: str = None):
+        is_aggregate = geo_type != 'City'
+        self.geo_shape_dict[reference_code] = {
+            'value': value,
+            'clean_value': clean(value),
+            'id': self.next_id,
+            'area': round(area, 3),
+            'bbox': bbox(latitude, longitude, half_size),
+            'geo_type': geo_type,
+            'latitude': round(latitude, 5),
+            'longitude': round(longitude, 5),
+            'ref_data': {'city': city, 'country': country, 'zip_code': zip_code, 'state_prov': state, 'metro': metro},
+            'population': population,
+            'is_zip_code': geo_type == 'ZipCode',
+            'is_aggregate': is_aggregate,
+            'long_display': value,
+            'short_display': value.split(',')[0],
+            'reference_code': reference_code,
+            'primary_timezone': 'America/Chicago',
+            'is_three_digit_zip_code': False,
+        }
+        self.next_id += 1
+
+    def name(self) -> str:
+        rng = self.rng
+        return ''.join(rng.choice(self.syllables) for _ in range(rng.choice((2, 2, 3)))).title()
+
+    def city_population(self) -> int:
+        if self.rng.random() < .1:
+            return 0
+        return min(int(self.rng.paretovariate(1.1) * 400), 9_000_000)
+
+    def add_state(self, country: str, state: str, latitude: float, longitude: float):
+        self.add('State', f'{state}, {country}', f'{country.lower()}__{state.lower()}', latitude, longitude,
+                 country, state, self.rng.randint(10**6, 3 * 10**7), area=self.rng.uniform(4e4, 2.5e5), half_size=4.0)
+
+    def add_metro(self, name: str, reference_code: str, latitude: float, longitude: float,
+                  country: str, state: str, population: int, city: str = None):
+        self.add('MetroArea', f'{name} Metro Area, {state}', reference_code, latitude, longitude, country, state,
+                 population, area=self.rng.uniform(2000, 9000), half_size=1.2, city=city, metro=f'{name} Metro Area')
+
+    def add_city(self, country: str, state: str, state_lat: float, state_lng: float, city_index: int,
+                 postal_index: Dict[str, int], metros: bool = True):
+        """A City with its Zip Codes, a County every COUNTY_EVERY and a Metro Area every METRO_EVERY Cities"""
+        rng = self.rng
+        name = self.name()
+        latitude = state_lat + rng.uniform(-3.5, 3.5)
+        longitude = state_lng + rng.uniform(-4.5, 4.5)
+        city_code = f'{country.lower()}__{state.lower()}__{name.lower()}_{city_index}'
+        population = self.city_population()
+        self.add('City', f'{name}, {state}', city_code, latitude, longitude, country, state,
+                 population, city=name)
+
+        for _ in range(rng.randint(*ZIP_CODES_PER_CITY)):
+            zip_code = postal_code(rng, country, postal_index[country])
+            postal_index[country] += 1
+            half_size = rng.uniform(.02, .25)
+            self.add('ZipCode', f'{zip_code}, {country}', f'{country.lower()}__{clean(zip_code).replace(" ", "")}_{city_index}',
+                     latitude + rng.uniform(-.08, .08), longitude + rng.uniform(-.08, .08), country, state,
+                     rng.randint(0, 60000), area=(half_size * 69) ** 2, half_size=half_size,
+                     zip_code=zip_code, city=name)
+        if city_index % COUNTY_EVERY == 0:
+            half_size = rng.uniform(.3, .9)
+            self.add('County', f'{name} County, {state}', f'{city_code}_county', latitude, longitude,
+                     country, state, rng.randint(1000, 500000), area=(half_size * 69) ** 2, half_size=half_size,
+                     city=name)
+        if metros and city_index % METRO_EVERY == 0:
+            self.add_metro(name, f'{name.lower()}_{state.lower()}_{city_index}_metro', latitude, longitude,
+                           country, state, max(population, 1) * rng.randint(3, 12), city=name)
+
+    def generate(self, num_shapes: int) -> Dict[str, Dict]:
+        """About `num_shapes` shapes, Cities spread over the states by COUNTRY_WEIGHTS"""
+        rng = self.rng
+        states = [
+            (country, state, latitude, longitude)
+            for country, country_states in STATES.items() for state, latitude, longitude in country_states
+        ]
+        weights = [COUNTRY_WEIGHTS[country] / len(STATES[country]) for country, *_ in states]
+        for country, state, latitude, longitude in states:
+            self.add_state(country, state, latitude, longitude)
+
+        postal_index = {country: 0 for country in STATES}
+        city_index = 0
+        while len(self.geo_shape_dict) < num_shapes:
+            country, state, state_lat, state_lng = rng.choices(states, weights)[0]
+            self.add_city(country, state, state_lat, state_lng, city_index, postal_index)
+            city_index += 1
+        return self.geo_shape_dict
+
+    def generate_states(self, states: Dict[str, List[Tuple[str, float, float]]], num_cities: int) -> Dict[str, Dict]:
+        """
+        Every state of `states` with one Metro Area (`<state>_<country>_metro`)
+        and `num_cities` Cities, for small Geo DBs of known layout
+        """
+        postal_index = {country: 0 for country in states}
+        city_index = 0
+        for country, country_states in states.items():
+            for state, latitude, longitude in country_states:
+                self.add_state(country, state, latitude, longitude)
+                self.add_metro(state, f'{state.lower()}_{country.lower()}_metro', latitude, longitude,
+                               country, state, self.rng.randint(10**5, 10**6))
+                for _ in range(num_cities):
+                    self.add_city(country, state, latitude, longitude, city_index, postal_index, metros=False)
+                    city_index += 1
+        return self.geo_shape_dict
+
+
+def build_search_dict(geo_shape_dict: Dict[str, Dict]) -> Dict[str, List[str]]:
+    """`{ngram: [reference_code, ...]}` over clean values, as the search file holds"""
+    search_dict: Dict[str, List[str]] = {}
+    for reference_code, shape in geo_shape_dict.items():
+        for ngram in ngrams(shape['clean_value'], 3):
+            search_dict.setdefault(ngram, []).append(reference_code)
+    return search_dict
+
+
+def generate_geo_db(num_shapes: int = 100_000, seed: int = 7) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    """Generate `geo_shape_dict` and `search_dict` payloads with about `num_shapes` shapes"""
+    geo_shape_dict = GeoDBGenerator(seed=seed).generate(num_shapes)
+    return geo_shape_dict, build_search_dict(geo_shape_dict)
+
+
+def write_geo_db(data_dir: str, geo_shape_dict: Dict, search_dict: Dict, version: str = None) -> str:
+    """Write payloads where `GeoManager.load_data` looks for the local cache"""
+    local_path = os.path.join(data_dir, 'geo_db', version or 'current')
+    os.makedirs(local_path, exist_ok=True)
+    with open(os.path.join(local_path, 'geo_manager_ngram_search.json'), 'w') as f:
+        json.dump(search_dict, f)
+    with open(os.path.join(local_path, 'geo_manager_shape.json'), 'w') as f:
+        json.dump(geo_shape_dict, f)
+    return local_path
+
+
+def write_remote_geo_db(remote_dir: str, geo_shape_dict: Dict, search_dict: Dict):
+    """Write payloads as the data store serves them, plain and gzip compressed"""
+    os.makedirs(remote_dir, exist_ok=True)
+    for file_name, payload in [('geo_manager_ngram_search.json', search_dict), ('geo_manager_shape.json', geo_shape_dict)]:
+        content = json.dumps(payload).encode('utf-8')
+        with open(os.path.join(remote_dir, file_name), 'wb') as f:
+            f.write(content)
+        with open(os.path.join(remote_dir, f'{file_name}.gz'), 'wb') as f:
+            f.write(gzip.compress(content))
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static files with ETag validators, requests are recorded in `request_log` when given"""
+    def __init__(self, *args, request_log: list = None, **kwargs):
+        self.request_log = request_log
+        self.etag = None
+        super().__init__(*args, **kwargs)
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            if self.headers.get('If-None-Match') == self.etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.end_headers()
+                return None
+        return super().send_head()
+
+    def send_response(self, code, message=None):
+        if self.request_log is not None:
+            self.request_log.append((self.path.lstrip('/'), int(code)))
+        super().send_response(code, message)
+
+    def end_headers(self):
+        if self.etag is not None:
+            self.send_header('ETag', self.etag)
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_directory(directory: str, request_log: list = None) -> Iterator[str]:
+    """Serve a directory over HTTP on localhost, yields the base url"""
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory, request_log=request_log)
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/'
+    finally:
+        server.shutdown()
+        server.server_close()
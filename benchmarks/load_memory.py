@@ -0,0 +1,120 @@
+"""
+Peak memory of `GeoManager.load_data` from a remote store
+
+A synthetic Geo DB is served over HTTP from a local directory, every load
+runs in a fresh interpreter and reports the peak resident set size above the
+post-import baseline and the peak traced Python allocations.  `legacy` is the
+pre-streaming load path (whole responses inflated, decoded and parsed in
+memory, then indexed), `streaming` is the current `load_data`.
+
+    python -m benchmarks.load_memory --num-shapes 30000
+"""
+import argparse
+import gzip
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+from yat_geo_db import GeoManager
+from yat_geo_db.settings import GEO_SHAPE_FILE_NAME, SEARCH_FILE_NAME
+
+from benchmarks.generator import generate_geo_db, serve_directory, write_remote_geo_db
+
+MODES = ['legacy', 'streaming']
+
+
+def max_rss_bytes() -> int:
+    """Peak resident set size, `VmHWM` where available (`ru_maxrss` survives exec on Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def legacy_load_data(geo_manager: GeoManager, base_url: str, compressed: bool):
+    """`load_data` before streaming, without the local cache write"""
+    payloads = []
+    for file_name in [SEARCH_FILE_NAME, GEO_SHAPE_FILE_NAME]:
+        if compressed:
+            file_name += '.gz'
+        response = requests.get(f'{base_url}{file_name}')
+        if compressed:
+            payloads.append(json.loads(gzip.decompress(response.content).decode('utf-8')))
+        else:
+            payloads.append(response.json())
+    geo_manager.search_dict, geo_manager.geo_shape_dict = payloads
+    geo_manager._generate_maps()
+
+
+def run_load(mode: str, base_url: str, compressed: bool, trace: bool) -> dict:
+    geo_manager = GeoManager(data_dir=tempfile.mkdtemp(prefix='yat_geo_db_bench_'))
+    geo_manager.get_base_url = lambda version=None: base_url
+    baseline = max_rss_bytes()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        legacy_load_data(geo_manager, base_url, compressed)
+    else:
+        geo_manager.load_data(force_db_fetch=True, cache_local=False, compressed=compressed)
+    seconds = time.perf_counter() - start
+    result = {'mode': mode, 'seconds': seconds, 'peak_rss': max_rss_bytes() - baseline, 'num_shapes': geo_manager.num_shapes}
+    if trace:
+        result['traced_current'], result['traced_peak'] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result
+
+
+def megabytes(value: int) -> str:
+    return f'{value / 2 ** 20:8.1f} MB'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-shapes', type=int, default=30_000, help='Shapes of the synthetic Geo DB')
+    parser.add_argument('--uncompressed', action='store_true', help='Fetch uncompressed files')
+    parser.add_argument('--run', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_load(args.run, args.base_url, not args.uncompressed, args.trace)))
+        return
+
+    with tempfile.TemporaryDirectory() as remote_dir:
+        geo_shape_dict, search_dict = generate_geo_db(num_shapes=args.num_shapes)
+        write_remote_geo_db(remote_dir, geo_shape_dict, search_dict)
+        file_sizes = {file_name: os.path.getsize(os.path.join(remote_dir, file_name)) for file_name in sorted(os.listdir(remote_dir))}
+        del geo_shape_dict, search_dict
+        print('\n'.join(f'{file_name:36} {megabytes(size)}' for file_name, size in file_sizes.items()))
+
+        with serve_directory(remote_dir) as base_url:
+            for mode in MODES:
+                results = {}
+                # Timing and RSS from an untraced run, tracemalloc slows allocations down
+                for trace in (True, False):
+                    command = [sys.executable, '-m', 'benchmarks.load_memory', '--run', mode, '--base-url', base_url]
+                    command += ['--uncompressed'] * args.uncompressed + ['--trace'] * trace
+                    results.update(json.loads(subprocess.run(command, check=True, capture_output=True).stdout))
+                print(
+                    f"{mode:10} shapes={results['num_shapes']} load={results['seconds']:6.2f}s "
+                    f"peak_rss={megabytes(results['peak_rss'])} traced_peak={megabytes(results['traced_peak'])} "
+                    f"traced_retained={megabytes(results['traced_current'])}"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Offline benchmark suite
+
+Generates a synthetic Geo DB (`benchmarks.generator`), serves it over HTTP
+from a local directory to fill the local cache, then measures:
+
+    load        cold `load_data` from the local cache, in a fresh interpreter
+    build       `_generate_maps` over the loaded payloads
+    fuzzy       `fuzzy_search` by query length and filter selectivity
+    radius      `radius_search` by radius
+    distance    `get_shape_pair_distance`, `distances` and `distance_matrix`
+
+Every case runs `--rounds` times and keeps the fastest round (as `timeit`
+does, slower rounds are mostly scheduler noise), and reports throughput,
+latency percentiles and the peak RSS of the process.  `--output` saves the
+results as JSON, `--baseline` compares to a saved run and flags cases whose
+p50 latency grew by more than `--threshold`.
+
+    python -m benchmarks.suite --num-shapes 100000
+    python -m benchmarks.suite --num-shapes 100000 --output after.json --baseline before.json
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from yat_geo_db import GeoManager
+
+from benchmarks.generator import generate_geo_db, serve_directory, write_remote_geo_db
+from benchmarks.load_memory import max_rss_bytes, megabytes
+
+QUERY_LENGTHS = (3, 5, 8, 12, 20)
+RADII = (5, 25, 100, 250)
+FILTER_CASES = {
+    'none': None,
+    'geo_type': {'geo_type': 'City'},
+    'country': {'ref_data.country': 'CA'},
+    'state': {'ref_data.state_prov': 'TN'},
+    'unindexed': {'ref_data.zip_code': None},
+}
+PERCENTILES = (50, 90, 99)
+ROUNDS = 3
+
+
+def time_calls(func: Callable, args_ls: Sequence) -> np.ndarray:
+    """Latency of `func` called once per item of `args_ls`, with the garbage collector off as in `timeit`"""
+    latencies = np.empty(len(args_ls), dtype=np.float64)
+    gc.collect()
+    gc.disable()
+    try:
+        for index, args in enumerate(args_ls):
+            start = time.perf_counter()
+            func(*args)
+            latencies[index] = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return latencies
+
+
+def measure(name: str, func: Callable, args_ls: Sequence, rounds: int = ROUNDS, **params) -> Dict:
+    """Latencies and throughput of `func` over `args_ls`, from the fastest of `rounds` rounds"""
+    latencies = min((time_calls(func, args_ls) for _ in range(rounds)), key=lambda latencies: latencies.sum())
+    seconds = float(latencies.sum())
+    result = {
+        'name': name,
+        'params': params,
+        'calls': len(args_ls),
+        'seconds': seconds,
+        'throughput': len(args_ls) / seconds if seconds else float('inf'),
+        'max_ms': float(latencies.max() * 1000) if len(latencies) else 0.0,
+        'peak_rss': max_rss_bytes(),
+    }
+    for percentile in PERCENTILES:
+        result[f'p{percentile}_ms'] = float(np.percentile(latencies, percentile) * 1000) if len(latencies) else 0.0
+    return result
+
+
+def run_load(data_dir: str) -> Dict:
+    """Cold `load_data` from the local cache, run in a fresh interpreter"""
+    baseline = max_rss_bytes()
+    start = time.perf_counter()
+    geo_manager = GeoManager(data_dir=data_dir)
+    geo_manager.load_data()
+    return {
+        'name': 'load',
+        'params': {'source': 'local_cache'},
+        'calls': 1,
+        'seconds': time.perf_counter() - start,
+        'peak_rss': max_rss_bytes(),
+        'peak_rss_above_baseline': max_rss_bytes() - baseline,
+        'num_shapes': geo_manager.num_shapes,
+    }
+
+
+def fuzzy_queries(rng: random.Random, clean_values: List[str], length: int, count: int) -> List[str]:
+    """Prefixes of shape values, a quarter with two characters swapped"""
+    queries = []
+    for _ in range(count):
+        query = rng.choice(clean_values)[:length]
+        if len(query) >= 5 and rng.random() < .25:
+            index = rng.randrange(1, len(query) - 1)
+            query = query[:index - 1] + query[index] + query[index - 1] + query[index + 1:]
+        queries.append(query)
+    return queries
+
+
+def selectivity(geo_manager: GeoManager, filters: Dict) -> float:
+    if filters is None:
+        return 1.0
+    positions = np.arange(len(geo_manager.shape_reference_codes))
+    return float(geo_manager.shape_filter_mask(positions, filters).mean())
+
+
+def run_suite(geo_manager: GeoManager,
+              geo_shape_dict: Dict,
+              search_dict: Dict,
+              num_queries: int,
+              seed: int,
+              rounds: int = ROUNDS) -> List[Dict]:
+    rng = random.Random(seed)
+    results = []
+
+    def measure_case(name, func, args_ls, **params):
+        return measure(name, func, args_ls, rounds=rounds, **params)
+
+    # Index build over the raw payloads, as `load_data` did before streaming
+    builder = GeoManager(data_dir=geo_manager.data_dir)
+    builder.geo_shape_dict, builder.search_dict = geo_shape_dict, search_dict
+    results.append(measure_case('build', builder._generate_maps, [()], source='payloads'))
+    del builder
+
+    clean_values = [shape['clean_value'] for shape in geo_shape_dict.values() if shape['geo_type'] in ('City', 'ZipCode')]
+    for length in QUERY_LENGTHS:
+        queries = fuzzy_queries(rng, clean_values, length, num_queries)
+        for case, filters in FILTER_CASES.items():
+            results.append(measure_case(
+                'fuzzy', lambda query: geo_manager.fuzzy_search(query, num_results=10, filters=filters),
+                [(query,) for query in queries],
+                length=length, filters=case, selectivity=round(selectivity(geo_manager, filters), 4)
+            ))
+
+    reference_codes = list(geo_shape_dict)
+    origins = [rng.choice(reference_codes) for _ in range(num_queries)]
+    for radius in RADII:
+        results.append(measure_case(
+            'radius', lambda reference_code: geo_manager.radius_search(reference_code, radius),
+            [(reference_code,) for reference_code in origins], radius=radius
+        ))
+        results.append(measure_case(
+            'radius', lambda reference_code: geo_manager.radius_search(reference_code, radius, full_results=True),
+            [(reference_code,) for reference_code in origins[:max(num_queries // 10, 1)]],
+            radius=radius, full_results=True
+        ))
+
+    pairs = [(rng.choice(reference_codes), rng.choice(reference_codes)) for _ in range(num_queries)]
+    results.append(measure_case('distance', geo_manager.get_shape_pair_distance, pairs, method='pair'))
+    batch = [([orig for orig, _ in pairs], [dest for _, dest in pairs])]
+    results.append(measure_case('distance', geo_manager.distances, batch, method='distances', pairs=len(pairs)))
+    side = int(np.sqrt(num_queries * 100))
+    matrix = [(rng.sample(reference_codes, min(side, len(reference_codes))), rng.sample(reference_codes, min(side, len(reference_codes))))]
+    results.append(measure_case('distance', geo_manager.distance_matrix, matrix, method='matrix', shape=f'{side}x{side}'))
+    return results
+
+
+def format_result(result: Dict) -> str:
+    params = ' '.join(f'{key}={value}' for key, value in result['params'].items())
+    if result['name'] == 'load':
+        return (f"{result['name']:9} {params:46} {result['seconds']:9.3f}s "
+                f"shapes={result['num_shapes']} peak_rss={megabytes(result['peak_rss'])}")
+    percentiles = ' '.join(f"p{percentile}={result[f'p{percentile}_ms']:8.3f}ms" for percentile in PERCENTILES)
+    return (f"{result['name']:9} {params:46} {result['throughput']:10.1f}/s {percentiles} "
+            f"max={result['max_ms']:8.3f}ms peak_rss={megabytes(result['peak_rss'])}")
+
+
+def result_key(result: Dict) -> str:
+    return json.dumps([result['name'], result['params']], sort_keys=True)
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[str]:
+    """Cases whose p50 latency (seconds for load) grew by more than `threshold` over the baseline"""
+    baseline = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None:
+            continue
+        metric = 'seconds' if result['name'] == 'load' else 'p50_ms'
+        if previous[metric] > 0 and result[metric] > previous[metric] * (1 + threshold):
+            regressions.append(
+                f"{result['name']} {result['params']}: {metric} {previous[metric]:.3f} -> {result[metric]:.3f} "
+                f"({result[metric] / previous[metric] - 1:+.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-shapes', type=int, default=100_000, help='Shapes in the synthetic Geo DB, 10k to 2M')
+    parser.add_argument('--queries', type=int, default=200, help='Queries per case')
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='Rounds per case, the fastest is kept')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Save results as JSON')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare to')
+    parser.add_argument('--threshold', type=float, default=.2, help='Flagged slowdown over the baseline, default 20%%')
+    parser.add_argument('--run-load', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_load:
+        print(json.dumps(run_load(args.run_load)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='yat_geo_db_bench_') as temp_dir:
+        start = time.perf_counter()
+        geo_shape_dict, search_dict = generate_geo_db(num_shapes=args.num_shapes, seed=args.seed)
+        print(f'generated shapes={len(geo_shape_dict)} ngrams={len(search_dict)} in {time.perf_counter() - start:.1f}s')
+
+        # Local cache as a remote load writes it (compressed, with meta)
+        remote_dir = os.path.join(temp_dir, 'remote')
+        data_dir = os.path.join(temp_dir, 'data')
+        write_remote_geo_db(remote_dir, geo_shape_dict, search_dict)
+        geo_manager = GeoManager(data_dir=data_dir)
+        with serve_directory(remote_dir) as base_url:
+            geo_manager.get_base_url = lambda version=None: base_url
+            geo_manager.load_data(compressed=True)
+
+        command = [sys.executable, '-m', 'benchmarks.suite', '--run-load', data_dir]
+        results = [json.loads(subprocess.run(command, check=True, capture_output=True).stdout)]
+        print(format_result(results[0]))
+        for result in run_suite(geo_manager, geo_shape_dict, search_dict, args.queries, args.seed, rounds=args.rounds):
+            print(format_result(result))
+            results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'num_shapes': args.num_shapes, 'queries': args.queries, 'results': results}, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.threshold)
+        print('\n'.join(['regressions:'] + regressions) if regressions else 'no regressions')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
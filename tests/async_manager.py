@@ -0,0 +1,83 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from yat_geo_db import AsyncGeoManager, GeoManager
+
+from tests.fixtures import generate_geo_db, serve_directory, write_geo_db, write_remote_geo_db
+
+
+class AsyncGeoManagerTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.geo_shape_dict, cls.search_dict = generate_geo_db()
+		cls.remote_dir = os.path.join(cls.temp_dir.name, 'remote')
+		write_remote_geo_db(cls.remote_dir, cls.geo_shape_dict, cls.search_dict)
+		cls.local_dir = os.path.join(cls.temp_dir.name, 'local')
+		write_geo_db(cls.local_dir, cls.geo_shape_dict, cls.search_dict)
+		cls.GeoManager = GeoManager(data_dir=cls.local_dir)
+		cls.GeoManager.load_data()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def test_aload_data_from_remote(self):
+		for compressed in (False, True):
+			data_dir = os.path.join(self.temp_dir.name, f'fetched-{compressed}')
+			geo_manager = GeoManager(data_dir=data_dir)
+			with serve_directory(self.remote_dir) as base_url:
+				geo_manager.get_base_url = lambda version=None: base_url
+				asyncio.run(geo_manager.aload_data(compressed=compressed))
+			self.assertEqual(dict(geo_manager.geo_shape_dict), self.GeoManager.geo_shape_dict)
+			self.assertEqual(geo_manager.fuzzy_search('Nash', num_results=5), self.GeoManager.fuzzy_search('Nash', num_results=5))
+			self.assertTrue(os.path.exists(os.path.join(data_dir, 'geo_db', 'current', 'geo_manager_shape.json.gz')))
+
+	def test_aload_missing_file_raises(self):
+		geo_manager = GeoManager(data_dir=os.path.join(self.temp_dir.name, 'missing'))
+		with serve_directory(os.path.join(self.temp_dir.name, 'local')) as base_url:
+			geo_manager.get_base_url = lambda version=None: base_url
+			with self.assertRaises(ValueError):
+				asyncio.run(geo_manager.aload_data())
+
+	def test_awaitable_queries(self):
+		async def run():
+			geo_manager = AsyncGeoManager(data_dir=self.local_dir)
+			ticks = 0
+
+			async def ticker():
+				nonlocal ticks
+				while True:
+					ticks += 1
+					await asyncio.sleep(0)
+
+			ticker_task = asyncio.create_task(ticker())
+			await geo_manager.load_data()
+			reference_codes = list(self.geo_shape_dict)[:5]
+			results = await asyncio.gather(
+				geo_manager.fuzzy_search('Nash', num_results=5),
+				geo_manager.best_fuzzy_search('Nashville'),
+				geo_manager.best_fuzzy_search_many(['Nashville', 'Chicago', 'Nashville'], workers=1),
+				geo_manager.radius_search(reference_codes[0], 50),
+				geo_manager.radius_search_many(reference_codes, 50),
+				geo_manager.nearest(36.1, -86.7, k=3),
+			)
+			ticker_task.cancel()
+			return results, ticks, reference_codes
+
+		results, ticks, reference_codes = asyncio.run(run())
+		self.assertGreater(ticks, 0)
+		self.assertEqual(results, [
+			self.GeoManager.fuzzy_search('Nash', num_results=5),
+			self.GeoManager.best_fuzzy_search('Nashville'),
+			[self.GeoManager.best_fuzzy_search(value) for value in ['Nashville', 'Chicago', 'Nashville']],
+			self.GeoManager.radius_search(reference_codes[0], 50),
+			self.GeoManager.radius_search_many(reference_codes, 50),
+			self.GeoManager.nearest(36.1, -86.7, k=3),
+		])
+
+
+if __name__ == '__main__':
+	unittest.main()
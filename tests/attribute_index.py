@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from yat_geo_db import GeoManager
+from yat_geo_db.geo_manager import apply_shape_filters
+
+from tests.fixtures import load_test_manager
+
+
+class AttributeIndexTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def random_filters(self, rng):
+		shape = self.GeoManager.geo_shape_dict[rng.choice(self.GeoManager.shape_reference_codes)]
+		options = [
+			{'geo_type': shape['geo_type']},
+			{'geo_type': 'Unknown'},
+			{'ref_data.country': shape['ref_data']['country'], 'is_zip_code': True},
+			{'ref_data.state_prov': shape['ref_data']['state_prov'], 'is_aggregate': False},
+			{'ref_data.city': shape['ref_data']['city']},
+			{'geo_type': shape['geo_type'], 'ref_data.zip_code': shape['ref_data']['zip_code']},
+			{'missing.key': None},
+		]
+		return rng.choice(options)
+
+	def test_mask_matches_record_filters(self):
+		rng = random.Random(4)
+		positions = np.arange(len(self.GeoManager.shape_reference_codes))
+		records = [self.GeoManager.geo_shape_dict[key] for key in self.GeoManager.shape_reference_codes]
+		for _ in range(30):
+			filters = self.random_filters(rng)
+			self.assertEqual(
+				self.GeoManager.shape_filter_mask(positions, filters).tolist(),
+				[apply_shape_filters(value=record, filters=filters) for record in records]
+			)
+
+	def test_filters_apply_before_fuzzy_cutoff(self):
+		shape = next(
+			shape for shape in self.GeoManager.geo_shape_dict.values() if shape['geo_type'] == 'ZipCode'
+		)
+		filters = {'geo_type': 'ZipCode', 'ref_data.state_prov': shape['ref_data']['state_prov']}
+		results = self.GeoManager.fuzzy_search(shape['value'][:3], num_results=20, filters=filters)
+		self.assertGreater(len(results), 0, 'No results returned')
+		self.assertTrue(all(apply_shape_filters(value=result['extra'], filters=filters) for result in results))
+
+	def test_snapshot_filters_match(self):
+		snapshot_path = os.path.join(self.temp_dir.name, 'snapshot')
+		self.GeoManager.save_snapshot(snapshot_path)
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_snapshot(snapshot_path)
+		rng = random.Random(5)
+		for _ in range(20):
+			filters = self.random_filters(rng)
+			shape = self.GeoManager.geo_shape_dict[rng.choice(self.GeoManager.shape_reference_codes)]
+			self.assertEqual(
+				geo_manager.nearest(shape['latitude'], shape['longitude'], k=5, filters=filters),
+				self.GeoManager.nearest(shape['latitude'], shape['longitude'], k=5, filters=filters)
+			)
+			self.assertEqual(
+				geo_manager.fuzzy_search(shape['value'][:5], num_results=5, filters=filters),
+				self.GeoManager.fuzzy_search(shape['value'][:5], num_results=5, filters=filters)
+			)
+
+	def test_added_entities_use_record_filters(self):
+		geo_manager = load_test_manager(self.temp_dir.name)
+		geo_manager.add_entity('Zyxwvut Place', 'custom__1', extra_entity={'geo_type': 'Custom'})
+		reference_code = geo_manager.shape_reference_codes[0]
+		geo_manager.add_entity('Zyxwvut Other', reference_code, extra_entity={'geo_type': 'Custom'})
+		results = geo_manager.fuzzy_search('zyxwvut', filters={'geo_type': 'Custom'})
+		self.assertEqual(sorted(result['id'] for result in results), sorted(['custom__1', reference_code]))
+		self.assertEqual(geo_manager.fuzzy_search('zyxwvut', filters={'geo_type': 'City'}), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,54 @@
+import random
+import tempfile
+import unittest
+
+from tests.fixtures import load_test_manager
+
+
+class AutocompleteTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name, num_cities=120)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def test_keystrokes_match_fuzzy_search(self):
+		rng = random.Random(6)
+		shapes = list(self.GeoManager.geo_shape_dict.values())
+		for _ in range(40):
+			value = rng.choice(shapes)['value']
+			filters = rng.choice([None, {'geo_type': 'City'}])
+			session = self.GeoManager.start_autocomplete(num_results=5, filters=filters)
+			for character in value:
+				self.assertEqual(
+					session.extend(character),
+					self.GeoManager.fuzzy_search(session.text, num_results=5, filters=filters)
+				)
+
+	def test_edits_start_over(self):
+		session = self.GeoManager.start_autocomplete(num_results=10)
+		for text in ['nas', 'nash', 'nashv', 'nas', 'nasvil', 'chicago', 'chi cago!', 'c']:
+			self.assertEqual(session.update(text), self.GeoManager.fuzzy_search(text, num_results=10))
+
+	def test_reload_resets_session(self):
+		geo_manager = load_test_manager(self.temp_dir.name, num_cities=120)
+		session = geo_manager.start_autocomplete(num_results=5)
+		session.update('spring')
+		geo_manager.load_data()
+		self.assertEqual(session.extend('f'), geo_manager.fuzzy_search('springf', num_results=5))
+
+	def test_added_entity_resets_session(self):
+		geo_manager = load_test_manager(self.temp_dir.name, num_cities=120)
+		session = geo_manager.start_autocomplete(num_results=5)
+		session.update('zzqx')
+		geo_manager.add_entity('zzqxville', 'custom__zzqxville', extra_entity={'population': 1000})
+		results = session.extend('v')
+		self.assertEqual(results, geo_manager.fuzzy_search('zzqxv', num_results=5))
+		self.assertEqual(results[0]['id'], 'custom__zzqxville')
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,59 @@
+import random
+import tempfile
+import unittest
+
+from tests.fixtures import load_test_manager
+
+
+class BulkSearchTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+		rng = random.Random(8)
+		values = [shape['value'] for shape in cls.GeoManager.geo_shape_dict.values()]
+		cls.search_entities = [rng.choice(values)[:rng.randint(2, 12)] for _ in range(300)]
+		cls.search_entities += [value.upper() for value in cls.search_entities[:50]] + ['', 'zzzz']
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def expected(self, **kwargs):
+		return [self.GeoManager.best_fuzzy_search(search_entity, **kwargs) for search_entity in self.search_entities]
+
+	def test_in_process(self):
+		self.assertEqual(
+			list(self.GeoManager.best_fuzzy_search_many(self.search_entities, workers=1, chunk_size=7)),
+			self.expected()
+		)
+
+	def test_bounded_dedup(self):
+		for dedup_size in (0, 5):
+			self.assertEqual(
+				list(self.GeoManager.best_fuzzy_search_many(
+					self.search_entities, workers=1, chunk_size=3, dedup_size=dedup_size
+				)),
+				self.expected()
+			)
+
+	def test_fork_pool(self):
+		filters = {'ref_data.country': 'US'}
+		self.assertEqual(
+			list(self.GeoManager.best_fuzzy_search_many(
+				iter(self.search_entities), filters=filters, score_threshold=.5, workers=2, chunk_size=16
+			)),
+			self.expected(filters=filters, score_threshold=.5)
+		)
+
+	def test_spawn_pool_with_snapshot(self):
+		self.assertEqual(
+			list(self.GeoManager.best_fuzzy_search_many(
+				self.search_entities[:80], workers=2, chunk_size=20, start_method='spawn'
+			)),
+			self.expected()[:80]
+		)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,47 @@
+import random
+import tempfile
+import unittest
+
+from tests.fixtures import load_test_manager
+
+
+class DistanceMatrixTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def assertPayloadEqual(self, result, index, expected):
+		self.assertAlmostEqual(float(result['distance'][index]), expected['distance'], places=3)
+		self.assertAlmostEqual(float(result['normalized_distance'][index]), expected['normalized_distance'], places=3)
+		self.assertEqual(bool(result['aggregate'][index]), expected['aggregate'])
+
+	def test_matrix_matches_pair_distance(self):
+		rng = random.Random(2)
+		orig_refs = rng.sample(list(self.GeoManager.geo_shape_dict), 20) + ['missing__code']
+		dest_refs = rng.sample(list(self.GeoManager.geo_shape_dict), 15)
+		result = self.GeoManager.distance_matrix(orig_refs, dest_refs)
+		self.assertEqual(result['distance'].shape, (21, 15))
+		for i, orig_ref in enumerate(orig_refs):
+			for j, dest_ref in enumerate(dest_refs):
+				self.assertPayloadEqual(
+					result, (i, j), self.GeoManager.get_shape_pair_distance(orig_ref, dest_ref)
+				)
+
+	def test_paired_distances(self):
+		rng = random.Random(4)
+		orig_refs = rng.sample(list(self.GeoManager.geo_shape_dict), 50)
+		dest_refs = rng.sample(list(self.GeoManager.geo_shape_dict), 50)
+		result = self.GeoManager.distances(orig_refs, dest_refs)
+		for index, (orig_ref, dest_ref) in enumerate(zip(orig_refs, dest_refs)):
+			self.assertPayloadEqual(result, index, self.GeoManager.get_shape_pair_distance(orig_ref, dest_ref))
+		with self.assertRaises(ValueError):
+			self.GeoManager.distances(orig_refs, dest_refs[1:])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,34 @@
+"""
+Small synthetic Geo DB written to a local cache directory so tests can run
+without fetching the managed database, built with the benchmark generator
+"""
+from benchmarks.generator import (
+	GeoDBGenerator, build_search_dict, serve_directory, write_geo_db, write_remote_geo_db
+)
+from yat_geo_db import GeoManager
+
+
+STATES = {
+	'US': [('TN', 36.1, -86.7), ('IL', 41.8, -87.6), ('TX', 31.0, -97.5), ('WA', 47.5, -121.0)],
+	'CA': [('ON', 44.0, -79.5), ('BC', 49.3, -123.1)],
+	'MX': [('NL', 25.7, -100.3)],
+}
+SYLLABLES = ['na', 'sh', 'vil', 'le', 'chi', 'ca', 'go', 'dal', 'las', 'at', 'lan', 'ta', 'spr', 'ing', 'field', 'ro', 'ck', 'mem', 'phis']
+
+__all__ = [
+	'generate_geo_db', 'load_test_manager', 'serve_directory', 'write_geo_db', 'write_remote_geo_db',
+]
+
+
+def generate_geo_db(num_cities: int = 40, seed: int = 7):
+	"""Generate `geo_shape_dict` and `search_dict` payloads, `num_cities` Cities per state"""
+	geo_shape_dict = GeoDBGenerator(seed=seed, syllables=SYLLABLES).generate_states(STATES, num_cities)
+	return geo_shape_dict, build_search_dict(geo_shape_dict)
+
+
+def load_test_manager(data_dir: str, **kwargs) -> GeoManager:
+	"""GeoManager loaded from a freshly generated synthetic Geo DB"""
+	write_geo_db(data_dir, *generate_geo_db(**kwargs))
+	geo_manager = GeoManager(data_dir=data_dir)
+	geo_manager.load_data()
+	return geo_manager
@@ -0,0 +1,128 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+
+from yat_geo_db import GeoManager
+
+from tests.fixtures import generate_geo_db, serve_directory, write_remote_geo_db
+
+
+class HotReloadTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.geo_shape_dict, cls.search_dict = generate_geo_db()
+		cls.reference_code = next(iter(cls.geo_shape_dict))
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def setUp(self):
+		self.remote_dir = tempfile.mkdtemp(dir=self.temp_dir.name)
+		write_remote_geo_db(self.remote_dir, self.geo_shape_dict, self.search_dict)
+		self.request_log = []
+
+	def manager(self, base_url):
+		geo_manager = GeoManager(data_dir=tempfile.mkdtemp(dir=self.temp_dir.name))
+		geo_manager.get_base_url = lambda version=None: base_url
+		geo_manager.load_data(compressed=True)
+		return geo_manager
+
+	def change_remote(self, value):
+		time.sleep(.01)
+		geo_shape_dict = dict(self.geo_shape_dict)
+		geo_shape_dict[self.reference_code] = dict(geo_shape_dict[self.reference_code], value=value)
+		write_remote_geo_db(self.remote_dir, geo_shape_dict, self.search_dict)
+
+	def test_reload_swaps_dataset(self):
+		with serve_directory(self.remote_dir) as base_url:
+			geo_manager = self.manager(base_url)
+			info = geo_manager.dataset_info()
+			self.assertEqual(info['data_version'], 'current')
+			self.assertEqual(info['num_shapes'], len(self.geo_shape_dict))
+			self.assertIsNotNone(info['built_at'])
+			self.assertGreater(info['build_seconds'], 0)
+
+			self.change_remote('Reloaded Value')
+			reloaded = geo_manager.reload(compressed=True)
+		self.assertGreater(reloaded['generation'], info['generation'])
+		self.assertEqual(reloaded, geo_manager.dataset_info())
+		self.assertEqual(geo_manager.get_shape_by_ref_code(self.reference_code)['value'], 'Reloaded Value')
+
+	def test_unchanged_reload_keeps_dataset(self):
+		with serve_directory(self.remote_dir, request_log=self.request_log) as base_url:
+			geo_manager = self.manager(base_url)
+			dataset = geo_manager.dataset
+			self.request_log.clear()
+			geo_manager.reload(compressed=True)
+		self.assertEqual([status for _, status in self.request_log], [304, 304])
+		self.assertIs(geo_manager.dataset, dataset)
+
+	def test_queries_see_one_dataset(self):
+		with serve_directory(self.remote_dir) as base_url:
+			geo_manager = self.manager(base_url)
+			expected = geo_manager.fuzzy_search('Nash', num_results=5)
+			self.change_remote('Reloaded Value')
+
+			# A pinned block keeps the dataset it started with across a swap
+			with geo_manager.pinned() as dataset:
+				geo_manager.reload_async(compressed=True).result()
+				self.assertIs(geo_manager.dataset, dataset)
+				self.assertEqual(geo_manager.get_shape_by_ref_code(self.reference_code)['value'], dataset.geo_shape_dict[self.reference_code]['value'])
+			self.assertIsNot(geo_manager.dataset, dataset)
+			self.assertEqual(geo_manager.get_shape_by_ref_code(self.reference_code)['value'], 'Reloaded Value')
+
+			# Queries running alongside reloads never fail or mix datasets
+			errors = []
+			done = threading.Event()
+
+			def query():
+				while not done.is_set():
+					try:
+						results = geo_manager.fuzzy_search('Nash', num_results=5)
+						if [result['id'] for result in results] != [result['id'] for result in expected]:
+							errors.append(results)
+					except Exception as e:
+						errors.append(e)
+
+			threads = [threading.Thread(target=query) for _ in range(3)]
+			for thread in threads:
+				thread.start()
+			for value in ('First Value', 'Second Value'):
+				self.change_remote(value)
+				geo_manager.reload(compressed=True)
+			done.set()
+			for thread in threads:
+				thread.join()
+		self.assertEqual(errors, [])
+
+	def test_reload_async(self):
+		with serve_directory(self.remote_dir) as base_url:
+			geo_manager = self.manager(base_url)
+			self.change_remote('Reloaded Value')
+			future = geo_manager.reload_async(compressed=True)
+			self.assertIsInstance(future, Future)
+			self.assertEqual(future.result(timeout=30), geo_manager.dataset_info())
+		self.assertEqual(geo_manager.get_shape_by_ref_code(self.reference_code)['value'], 'Reloaded Value')
+
+	def test_auto_reload(self):
+		with serve_directory(self.remote_dir) as base_url:
+			geo_manager = self.manager(base_url)
+			generation = geo_manager.dataset.generation
+			self.change_remote('Reloaded Value')
+			geo_manager.start_auto_reload(.05, compressed=True)
+			deadline = time.monotonic() + 30
+			while geo_manager.dataset.generation == generation and time.monotonic() < deadline:
+				time.sleep(.02)
+			geo_manager.stop_auto_reload()
+		self.assertIsNone(geo_manager._auto_reload)
+		self.assertEqual(geo_manager.get_shape_by_ref_code(self.reference_code)['value'], 'Reloaded Value')
+		with self.assertRaises(ValueError):
+			geo_manager.start_auto_reload(0)
+
+
+if __name__ == '__main__':
+	unittest.main()
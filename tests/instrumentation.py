@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+from yat_geo_db.instrumentation import QueryStats, QueryTrace
+
+from tests.fixtures import load_test_manager
+
+
+class InstrumentationTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def load_traced_manager(self, **kwargs):
+		traces = []
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, instrumentation=traces.append, **kwargs)
+		geo_manager.load_data()
+		return geo_manager, traces
+
+	def test_fuzzy_search_trace(self):
+		geo_manager, traces = self.load_traced_manager()
+		self.assertEqual([trace.operation for trace in traces], ['load_data'])
+		self.assertEqual(list(traces[0].stages), ['read_shapes', 'read_search', 'build', 'swap'])
+		self.assertEqual(traces[0].counts['shapes'], geo_manager.num_shapes)
+
+		filters = {'geo_type': 'City', 'ref_data.zip_code': None}
+		results = geo_manager.fuzzy_search('Nashvile', num_results=3, filters=filters)
+		self.assertEqual(results, self.GeoManager.fuzzy_search('Nashvile', num_results=3, filters=filters))
+		trace = traces[-1]
+		self.assertEqual(trace.operation, 'fuzzy_search')
+		self.assertEqual(trace.params['search_entity'], 'Nashvile')
+		self.assertEqual(
+			list(trace.stages), ['clean', 'postings', 'merge', 'rank', 'indexed_filter', 'filter', 'score', 'format']
+		)
+		self.assertAlmostEqual(sum(trace.stages.values()), trace.seconds, delta=trace.seconds * .5)
+		counts = trace.counts
+		self.assertEqual(counts['posting_lists'], len(trace.posting_sizes))
+		self.assertEqual(counts['postings'], sum(trace.posting_sizes))
+		self.assertGreaterEqual(counts['candidates'], counts['indexed_candidates'])
+		self.assertGreaterEqual(counts['indexed_candidates'], counts['top_candidates'])
+		self.assertGreaterEqual(counts['top_candidates'], counts['filtered_candidates'])
+		self.assertEqual(counts['results'], len(results))
+		self.assertIsNone(trace.cache_hit)
+
+		# Short searches go to the prefix index
+		geo_manager.fuzzy_search('na')
+		self.assertEqual(list(traces[-1].stages), ['prefix_search'])
+
+	def test_best_fuzzy_and_radius_search_traces(self):
+		geo_manager, traces = self.load_traced_manager(query_cache_size=8)
+		self.assertEqual(geo_manager.best_fuzzy_search('Nashville TN'), self.GeoManager.best_fuzzy_search('Nashville TN'))
+		self.assertEqual([trace.operation for trace in traces[1:]], ['best_fuzzy_search'])
+		self.assertFalse(traces[-1].cache_hit)
+		self.assertIn(traces[-1].counts['results'], (0, 1))
+
+		reference_code = geo_manager.shape_reference_codes[10]
+		for _ in range(2):
+			self.assertEqual(
+				geo_manager.radius_search(reference_code, 50, filters={'geo_type': 'City'}),
+				self.GeoManager.radius_search(reference_code, 50, filters={'geo_type': 'City'})
+			)
+		miss, hit = traces[-2:]
+		self.assertEqual(miss.operation, 'radius_search')
+		self.assertEqual(list(miss.stages), ['origin', 'spatial', 'radius_mask', 'filter'])
+		self.assertGreaterEqual(miss.counts['candidates'], miss.counts['radius_matches'])
+		self.assertEqual(miss.counts['filtered_candidates'], miss.counts['results'])
+		self.assertEqual((miss.cache_hit, hit.cache_hit), (False, True))
+		self.assertEqual(hit.counts['results'], miss.counts['results'])
+
+	def test_query_stats(self):
+		stats = QueryStats(window=3)
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, instrumentation=stats)
+		geo_manager.load_data()
+		for search in ('Nash', 'Chicago', 'Memphis', 'Dallas'):
+			geo_manager.fuzzy_search(search, num_results=5)
+
+		summary = geo_manager.query_stats()
+		self.assertEqual(summary['load_data']['calls'], 1)
+		fuzzy = summary['fuzzy_search']
+		self.assertEqual((fuzzy['calls'], fuzzy['window']), (4, 3))
+		self.assertEqual(sorted(fuzzy['seconds']), ['max', 'p50', 'p90', 'p99'])
+		self.assertLessEqual(fuzzy['stages']['merge']['p50'], fuzzy['stages']['merge']['max'])
+		self.assertEqual(fuzzy['counts']['results']['max'], 5)
+		self.assertEqual(stats.percentiles('fuzzy_search', 'results', percentiles=(50,)), {'p50': 5.0, 'max': 5.0})
+		self.assertEqual(stats.percentiles('radius_search'), {})
+		self.assertEqual([trace.params['search_entity'] for trace in stats.traces('fuzzy_search')], ['Chicago', 'Memphis', 'Dallas'])
+
+		stats.reset()
+		self.assertEqual(geo_manager.query_stats(), {})
+		self.assertIsNone(self.GeoManager.query_stats())
+
+	def test_failing_hook(self):
+		def hook(trace: QueryTrace):
+			raise RuntimeError('hook failed')
+
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, instrumentation=hook)
+		with self.assertLogs('yat_geo_db.geo_manager', level='WARNING'):
+			geo_manager.load_data()
+		with self.assertLogs('yat_geo_db.geo_manager', level='WARNING'):
+			self.assertEqual(geo_manager.fuzzy_search('Nash'), self.GeoManager.fuzzy_search('Nash'))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from yat_geo_db import GeoManager
+from yat_geo_db.local_cache import CACHE_META_FILE_NAME, CacheChecksumError
+
+from tests.fixtures import generate_geo_db, serve_directory, write_geo_db, write_remote_geo_db
+
+
+class LocalCacheTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.geo_shape_dict, cls.search_dict = generate_geo_db()
+		cls.local_dir = os.path.join(cls.temp_dir.name, 'local')
+		write_geo_db(cls.local_dir, cls.geo_shape_dict, cls.search_dict)
+		cls.GeoManager = GeoManager(data_dir=cls.local_dir)
+		cls.GeoManager.load_data()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def setUp(self):
+		self.remote_dir = tempfile.mkdtemp(dir=self.temp_dir.name)
+		write_remote_geo_db(self.remote_dir, self.geo_shape_dict, self.search_dict)
+		self.data_dir = tempfile.mkdtemp(dir=self.temp_dir.name)
+		self.cache_path = os.path.join(self.data_dir, 'geo_db', 'current')
+		self.request_log = []
+
+	def load(self, geo_manager=None, **kwargs):
+		geo_manager = geo_manager or GeoManager(data_dir=self.data_dir)
+		with serve_directory(self.remote_dir, request_log=self.request_log) as base_url:
+			geo_manager.get_base_url = lambda version=None: base_url
+			geo_manager.load_data(**kwargs)
+		return geo_manager
+
+	def assert_same_data(self, geo_manager):
+		self.assertEqual(dict(geo_manager.geo_shape_dict), self.GeoManager.geo_shape_dict)
+		self.assertEqual(geo_manager.fuzzy_search('Nash', num_results=5), self.GeoManager.fuzzy_search('Nash', num_results=5))
+
+	def test_compressed_cache_with_meta(self):
+		for compressed in (False, True):
+			self.setUp()
+			self.assert_same_data(self.load(compressed=compressed))
+			self.assertEqual(
+				sorted(os.listdir(self.cache_path)),
+				[CACHE_META_FILE_NAME, 'geo_manager_ngram_search.json.gz', 'geo_manager_shape.json.gz']
+			)
+			with open(os.path.join(self.cache_path, CACHE_META_FILE_NAME)) as f:
+				entry = json.load(f)['files']['geo_manager_shape.json']
+			self.assertEqual(entry['remote_file'], 'geo_manager_shape.json.gz' if compressed else 'geo_manager_shape.json')
+			self.assertIsNotNone(entry['etag'])
+			self.assertIsNotNone(entry['last_modified'])
+			self.assertEqual(entry['size'], os.path.getsize(os.path.join(self.cache_path, 'geo_manager_shape.json.gz')))
+			self.assert_same_data(self.load())
+
+	def test_conditional_refresh(self):
+		geo_manager = self.load(compressed=True)
+		ngram_index = geo_manager.ngram_index
+		self.request_log.clear()
+		self.load(geo_manager, force_db_fetch=True, compressed=True)
+		self.assertEqual([status for _, status in self.request_log], [304, 304])
+		self.assertIs(geo_manager.ngram_index, ngram_index)
+
+		# A new process reads the unchanged files from the cache
+		self.request_log.clear()
+		fresh_manager = self.load(force_db_fetch=True, compressed=True)
+		self.assertEqual([status for _, status in self.request_log], [304, 304])
+		self.assert_same_data(fresh_manager)
+
+		# Only the changed file is downloaded, then data is rebuilt
+		time.sleep(.01)
+		geo_shape_dict = dict(self.geo_shape_dict)
+		reference_code = next(iter(geo_shape_dict))
+		geo_shape_dict[reference_code] = dict(geo_shape_dict[reference_code], value='Changed Value')
+		write_remote_geo_db(self.remote_dir, geo_shape_dict, self.search_dict)
+		os.utime(os.path.join(self.remote_dir, 'geo_manager_ngram_search.json.gz'), ns=(0, 0))
+		self.request_log.clear()
+		self.load(geo_manager, force_db_fetch=True, compressed=True)
+		self.assertEqual(self.request_log, [('geo_manager_shape.json.gz', 200), ('geo_manager_ngram_search.json.gz', 200)])
+		self.assertIsNot(geo_manager.ngram_index, ngram_index)
+		self.assertEqual(geo_manager.get_shape_by_ref_code(reference_code)['value'], 'Changed Value')
+
+		# Validators are kept per remote file, an uncompressed fetch downloads again
+		self.request_log.clear()
+		self.load(geo_manager, force_db_fetch=True)
+		self.assertEqual([status for _, status in self.request_log], [200, 200])
+
+	def test_build_ngrams_skips_search_file(self):
+		geo_manager = self.load(compressed=True, build_ngrams=True)
+		self.assertEqual(self.request_log, [('geo_manager_shape.json.gz', 200)])
+		self.assertEqual(sorted(os.listdir(self.cache_path)), [CACHE_META_FILE_NAME, 'geo_manager_shape.json.gz'])
+		self.assert_same_data(geo_manager)
+
+		# Caches without the search file build the n-gram index too
+		cached_manager = GeoManager(data_dir=self.data_dir)
+		cached_manager.load_data()
+		self.assert_same_data(cached_manager)
+
+	def test_checksum_mismatch(self):
+		self.load()
+		shape_path = os.path.join(self.cache_path, 'geo_manager_shape.json.gz')
+		with open(shape_path, 'r+b') as f:
+			content = f.read()
+			f.seek(0)
+			f.write(content[:-9] + bytes([content[-9] ^ 1]) + content[-8:])
+		with self.assertRaises(CacheChecksumError):
+			GeoManager(data_dir=self.data_dir).load_data()
+
+	def test_legacy_plain_cache(self):
+		geo_manager = GeoManager(data_dir=self.local_dir)
+		geo_manager.load_data()
+		self.assertIsNone(geo_manager.cache_checksums)
+		self.assert_same_data(geo_manager)
+
+		write_geo_db(self.data_dir, self.geo_shape_dict, self.search_dict)
+		geo_manager = self.load(force_db_fetch=True)
+		self.assertEqual([status for _, status in self.request_log], [200, 200])
+		self.assertNotIn('geo_manager_shape.json', os.listdir(self.cache_path))
+		self.assert_same_data(geo_manager)
+
+	def test_failed_refresh_keeps_cache(self):
+		self.load()
+		with open(os.path.join(self.cache_path, CACHE_META_FILE_NAME)) as f:
+			meta = f.read()
+		os.remove(os.path.join(self.remote_dir, 'geo_manager_ngram_search.json'))
+		time.sleep(.01)
+		write_remote_geo_db(self.remote_dir, {}, {})
+		with open(os.path.join(self.remote_dir, 'geo_manager_ngram_search.json'), 'w') as f:
+			f.write('{"broken": ')
+		with self.assertRaises(ValueError):
+			self.load(force_db_fetch=True)
+		with open(os.path.join(self.cache_path, CACHE_META_FILE_NAME)) as f:
+			self.assertEqual(f.read(), meta)
+		self.assert_same_data(self.load())
+
+
+if __name__ == '__main__':
+	unittest.main()
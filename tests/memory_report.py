@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+
+from tests.fixtures import load_test_manager
+
+
+class MemoryReportTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def test_report(self):
+		report = self.GeoManager.memory_report(largest_postings=3, shared=True)
+		structures = report['structures']
+		self.assertEqual(report['num_shapes'], self.GeoManager.num_shapes)
+		self.assertEqual(report['total_bytes'], sum(structure['bytes'] for structure in structures.values()))
+		self.assertEqual(report['mapped_bytes'], 0)
+		self.assertGreater(structures['geo_shape_dict']['bytes'], structures['radius_search_map']['bytes'])
+		# Radius search shapes are views over `shape_columns`, the map reads the shared position lookup
+		self.assertLess(structures['radius_search_map']['bytes'], structures['shape_columns']['bytes'])
+		self.assertGreaterEqual(structures['radius_search_map']['shared_bytes'], structures['shape_position_map']['bytes'])
+
+		geo_types = report['geo_types']
+		self.assertEqual(sum(geo_type['shapes'] for geo_type in geo_types.values()), report['num_shapes'])
+		self.assertEqual(geo_types['City']['shapes'], sum(
+			1 for shape in self.GeoManager.geo_shape_dict.values() if shape['geo_type'] == 'City'
+		))
+		# Every entry of the shape dicts, not the dicts themselves
+		per_shape_bytes = structures['geo_shape_dict']['bytes']
+		self.assertLess(sum(geo_type['bytes'] for geo_type in geo_types.values()), per_shape_bytes)
+		self.assertGreater(sum(geo_type['bytes'] for geo_type in geo_types.values()), per_shape_bytes * .9)
+		self.assertEqual(report['partitions'], {})
+
+		postings = report['largest_posting_lists']
+		self.assertEqual(len(postings), 3)
+		self.assertEqual([entry['postings'] for entry in postings], sorted(
+			(len(self.GeoManager.search_dict[ngram]) for ngram in self.GeoManager.search_dict), reverse=True
+		)[:3])
+		self.assertEqual(postings[0]['postings'], len(self.GeoManager.search_dict[postings[0]['ngram']]))
+		json.dumps(report)
+
+	def test_snapshot_and_partitions(self):
+		path = os.path.join(self.temp_dir.name, 'memory_snapshot')
+		self.GeoManager.save_snapshot(path)
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_snapshot(path, mmap=True)
+		report = geo_manager.memory_report()
+		self.assertGreater(report['mapped_bytes'], 0)
+		self.assertGreater(report['structures']['ngram_index']['mapped_bytes'], 0)
+		self.assertGreater(report['geo_types']['City']['mapped_bytes'], 0)
+
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, partition_key='ref_data.country')
+		geo_manager.load_data()
+		partitions = geo_manager.memory_report()['partitions']
+		self.assertEqual(sorted(partitions), ['CA', 'MX', 'US'])
+		self.assertEqual(sum(partition['shapes'] for partition in partitions.values()), geo_manager.num_shapes)
+		self.assertGreater(partitions['US']['bytes'], partitions['MX']['bytes'])
+
+	def test_compare_to(self):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_data()
+		before = json.loads(json.dumps(geo_manager.memory_report()))
+		for index in range(20):
+			geo_manager.add_entity(f'Memoryville {index}, TN', f'us__tn__memoryville_{index}')
+		comparison = geo_manager.memory_report(compare_to=before)['comparison']
+		self.assertGreater(comparison['total_bytes']['change'], 0)
+		self.assertEqual(
+			comparison['total_bytes']['change'],
+			comparison['total_bytes']['after'] - comparison['total_bytes']['before']
+		)
+		self.assertGreater(comparison['structures']['geo_shape_dict']['change'], 0)
+		self.assertEqual(comparison['structures']['shape_columns']['change'], 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,74 @@
+import random
+import tempfile
+import unittest
+
+from yat_geo_db.columns import ShapeColumns
+from yat_geo_db.geo_manager import apply_shape_filters
+from yat_geo_db.geometry import lat_lng_dist
+from yat_geo_db.spatial import SpatialIndex
+
+from tests.fixtures import load_test_manager
+
+
+class NearestTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def full_scan_nearest(self, latitude, longitude, k, filters=None):
+		distances = [
+			(lat_lng_dist((latitude, longitude), (shape['latitude'], shape['longitude'])), shape['reference_code'])
+			for shape in self.GeoManager.geo_shape_dict.values()
+			if apply_shape_filters(value=shape, filters=filters)
+		]
+		return [reference_code for _, reference_code in sorted(distances, key=lambda item: item[0])[:k]]
+
+	def test_matches_full_scan(self):
+		rng = random.Random(5)
+		for _ in range(100):
+			latitude, longitude = rng.uniform(20, 55), rng.uniform(-130, -75)
+			k = rng.choice([1, 3, 10])
+			filters = rng.choice([None, {'geo_type': 'City'}, {'geo_type': 'ZipCode', 'ref_data.country': 'US'}])
+			results = self.GeoManager.nearest(latitude, longitude, k=k, filters=filters)
+			self.assertEqual(
+				[shape['reference_code'] for shape in results],
+				self.full_scan_nearest(latitude, longitude, k, filters)
+			)
+
+	def test_antimeridian(self):
+		rng = random.Random(6)
+		records = [
+			{'id': index, 'latitude': rng.uniform(-10, 10), 'longitude': rng.choice([-1, 1]) * rng.uniform(170, 180)}
+			for index in range(600)
+		]
+		spatial_index = SpatialIndex.from_columns(ShapeColumns(records))
+		for _ in range(150):
+			latitude, longitude = rng.uniform(-10, 10), rng.choice([-1, 1]) * rng.uniform(170, 180)
+			k = rng.choice([1, 5, 20])
+			positions, _ = spatial_index.nearest(latitude, longitude, k=k)
+			expected = sorted(
+				range(len(records)),
+				key=lambda position: (
+					lat_lng_dist((latitude, longitude), (records[position]['latitude'], records[position]['longitude'])), position
+				)
+			)[:k]
+			self.assertEqual(positions.tolist(), expected)
+
+	def test_distance_payload(self):
+		shape = next(value for value in self.GeoManager.geo_shape_dict.values() if value['geo_type'] == 'City')
+		result = self.GeoManager.nearest(shape['latitude'], shape['longitude'], filters={'geo_type': 'City'})
+		self.assertEqual(result[0]['reference_code'], shape['reference_code'])
+		self.assertEqual(result[0]['distance'], {'distance': 0.0, 'normalized_distance': 0.0, 'aggregate': False})
+		self.assertNotIn('distance', shape)
+
+	def test_no_match(self):
+		self.assertEqual(self.GeoManager.nearest(36.1, -86.7, k=2, filters={'geo_type': 'Planet'}), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
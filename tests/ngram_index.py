@@ -0,0 +1,150 @@
+from collections import Counter
+import numpy as np
+import random
+import tempfile
+import unittest
+
+from yat_geo_db.attributes import ATTRIBUTE_INDEX_KEYS
+from yat_geo_db.fuzzy import ngrams
+from yat_geo_db.geo_manager import apply_shape_filters, geo_damerau_levenshtein_distance
+from yat_geo_db.ngram_index import NgramIndex
+
+from tests.fixtures import generate_geo_db, write_geo_db
+from yat_geo_db import GeoManager
+
+
+def reference_fuzzy_search(geo_manager, geo_shape_dict, search_dict, search_entity, num_results=50, filters=None):
+	"""
+	Fuzzy Search over plain `search_dict` lists of reference codes, filters on
+	indexed keys apply before the candidate cutoff
+	"""
+	search_entity = geo_manager.clean_entity(search_entity)
+	search_res = {ngram: search_dict.get(ngram, '') for ngram in ngrams(search_entity, 3)}
+	indexed_filters = {
+		key: value for key, value in (filters or {}).items() if key in ATTRIBUTE_INDEX_KEYS
+	}
+	top_search_res = dict(
+		Counter([
+			y for x in search_res.values() for y in x
+			if apply_shape_filters(value=geo_shape_dict[y], filters=indexed_filters)
+		]).most_common(max(num_results, 500))
+	)
+	results = {
+		geo_shape_dict[key]['clean_value']: {
+			'value': geo_shape_dict[key]['value'],
+			'clean_value': geo_shape_dict[key]['clean_value'],
+			'distance': geo_damerau_levenshtein_distance(search_entity, geo_shape_dict[key]['clean_value'].lower()),
+			'ngram_similarity': geo_manager.entity_fuzzy_score(search_entity, geo_shape_dict[key]['clean_value'].lower()),
+			'score': geo_manager.geo_search_score(
+				search_entity, geo_shape_dict[key]['clean_value'].lower(), geo_shape_dict[key].get('population', 0)
+			),
+			'id': key,
+			'extra': geo_shape_dict[key]
+		}
+		for key in top_search_res
+		if apply_shape_filters(value=geo_shape_dict[key], filters=filters)
+	}
+	return sorted(results.values(), key=lambda result: result['score'], reverse=True)[0:num_results]
+
+
+class NgramIndexTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.geo_shape_dict, cls.search_dict = generate_geo_db(num_cities=120)
+		write_geo_db(cls.temp_dir.name, cls.geo_shape_dict, cls.search_dict)
+		cls.GeoManager = GeoManager(data_dir=cls.temp_dir.name)
+		cls.GeoManager.load_data()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def test_matches_list_postings(self):
+		rng = random.Random(1)
+		shapes = list(self.geo_shape_dict.values())
+		for _ in range(150):
+			value = rng.choice(shapes)['value']
+			search_entity = value[:rng.randint(3, len(value))]
+			if len(self.GeoManager.clean_entity(search_entity)) <= self.GeoManager.prefix_search_length:
+				continue
+			num_results = rng.choice([1, 5, 50])
+			self.assertEqual(
+				self.GeoManager.fuzzy_search(search_entity, num_results=num_results),
+				reference_fuzzy_search(
+					self.GeoManager, self.geo_shape_dict, self.search_dict, search_entity, num_results
+				)
+			)
+
+	def test_matches_with_typos_and_filters(self):
+		rng = random.Random(2)
+		shapes = list(self.geo_shape_dict.values())
+		for _ in range(100):
+			shape = rng.choice(shapes)
+			value = list(shape['value'])
+			value[rng.randrange(len(value))] = rng.choice('aeioux ')
+			filters = rng.choice([None, {'geo_type': 'City'}, {'ref_data.country': shape['ref_data']['country']}])
+			self.assertEqual(
+				self.GeoManager.fuzzy_search(''.join(value), num_results=10, filters=filters),
+				reference_fuzzy_search(
+					self.GeoManager, self.geo_shape_dict, self.search_dict, ''.join(value), 10, filters
+				)
+			)
+
+	def test_ngram_counts(self):
+		ngram_counts = self.GeoManager.ngram_index.ngram_counts
+		for position, reference_code in enumerate(self.GeoManager.shape_reference_codes):
+			clean_value = self.geo_shape_dict[reference_code]['clean_value'].lower()
+			self.assertEqual(ngram_counts[position], len(set(ngrams(clean_value, 3))))
+
+	def test_repeated_and_readded_entities(self):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_data()
+		geo_manager.add_entity('Banana Bananas', 'custom__banana', extra_entity={'population': 10})
+		geo_manager.add_entity('Bandana', 'custom__bandana')
+		geo_manager.add_entity('Bananarama', 'custom__banana', extra_entity={'population': 10})
+		for search_entity in ['banana', 'bananarama', 'bandana', '12345']:
+			self.assertEqual(
+				geo_manager.fuzzy_search(search_entity),
+				reference_fuzzy_search(
+					geo_manager, geo_manager.geo_shape_dict, geo_manager.search_dict, search_entity
+				)
+			)
+
+	def test_search_dict_view(self):
+		for ngram in list(self.search_dict)[::50]:
+			self.assertEqual(self.GeoManager.search_dict[ngram], self.search_dict[ngram])
+		self.assertEqual(len(self.GeoManager.search_dict), len(self.search_dict))
+
+	def test_from_values(self):
+		position_map = {reference_code: position for position, reference_code in enumerate(self.geo_shape_dict)}
+		expected = NgramIndex.from_search_dict(self.search_dict, position_map, len(position_map)).to_arrays()
+		ngram_index = NgramIndex.from_values([shape['clean_value'].lower() for shape in self.geo_shape_dict.values()])
+		for name, array in ngram_index.to_arrays().items():
+			self.assertTrue(np.array_equal(array, expected[name]), name)
+
+		ngram_index = NgramIndex.from_values(['ab', '', 'säo paulo', 'abcab'])
+		self.assertEqual(list(ngram_index.get_postings('äo ')), [2])
+		self.assertEqual(list(ngram_index.get_postings('ab')), [])
+		self.assertEqual(list(ngram_index.ngram_counts), [0, 0, 7, 3])
+		self.assertEqual(len(NgramIndex.from_values([])), 0)
+
+	def test_built_ngrams(self):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_data(build_ngrams=True)
+		self.assertEqual(dict(geo_manager.search_dict), dict(self.GeoManager.search_dict))
+		for search_entity in ['Nash', 'chicgo', 'spring']:
+			self.assertEqual(geo_manager.fuzzy_search(search_entity), self.GeoManager.fuzzy_search(search_entity))
+
+	def test_add_entity(self):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_data()
+		for index in range(200):
+			geo_manager.add_entity(f'Zyxwvut Custom {index}', f'custom__{index}', extra_entity={'population': 0})
+		results = geo_manager.fuzzy_search('Zyxwvut Custom 17', num_results=3)
+		self.assertEqual(results[0]['id'], 'custom__17')
+		self.assertEqual(len(geo_manager.search_dict['zyx']), 200)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,121 @@
+import random
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+
+from tests.fixtures import generate_geo_db, load_test_manager
+
+
+SEARCHES = ['Nash', 'chicago', 'spring field', 'Dal', 'mem', 'rock ville', 'at', 'lanta on']
+
+
+class PartitionsTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+		cls.geo_shape_dict, _ = generate_geo_db()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def manager(self, **kwargs):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, **kwargs)
+		geo_manager.load_data()
+		return geo_manager
+
+	def assert_partition_queries(self, geo_manager, key, value):
+		filters = {key: value}
+		for search in SEARCHES:
+			self.assertEqual(
+				geo_manager.fuzzy_search(search, partition=value, num_results=10),
+				self.GeoManager.fuzzy_search(search, num_results=10, filters=filters)
+			)
+		rng = random.Random(3)
+		for reference_code in rng.sample(sorted(geo_manager.geo_shape_dict), 20):
+			self.assertEqual(
+				geo_manager.radius_search(reference_code, 75, partition=value),
+				self.GeoManager.radius_search(reference_code, 75, filters=filters)
+			)
+		latitude, longitude = 36.1, -86.7
+		self.assertEqual(
+			[shape['reference_code'] for shape in geo_manager.nearest(latitude, longitude, k=5, partition=value)],
+			[shape['reference_code'] for shape in self.GeoManager.nearest(latitude, longitude, k=5, filters=filters)]
+		)
+
+	def test_country_partitions(self):
+		geo_manager = self.manager(partition_key='ref_data.country')
+		self.assertEqual(sorted(geo_manager.partition_index), ['CA', 'MX', 'US'])
+		self.assertEqual(len(geo_manager.geo_shape_dict), len(self.geo_shape_dict))
+		for country in ('US', 'CA', 'MX'):
+			self.assert_partition_queries(geo_manager, 'ref_data.country', country)
+
+		# Without a partition queries cover every Shape
+		self.assertEqual(geo_manager.fuzzy_search('Nash'), self.GeoManager.fuzzy_search('Nash'))
+		reference_code = next(iter(self.geo_shape_dict))
+		self.assertEqual(geo_manager.radius_search(reference_code, 75), self.GeoManager.radius_search(reference_code, 75))
+		self.assertEqual(geo_manager.fuzzy_search('Nash', partition='FR'), [])
+		self.assertEqual(geo_manager.radius_search(reference_code, 75, partition='FR'), [])
+
+	def test_geo_type_partitions(self):
+		geo_manager = self.manager(partition_key='geo_type')
+		for geo_type in ('City', 'ZipCode'):
+			self.assert_partition_queries(geo_manager, 'geo_type', geo_type)
+		session = geo_manager.start_autocomplete(num_results=5, partition='City')
+		for text in ('N', 'Na', 'Nas', 'Nash'):
+			self.assertEqual(
+				session.update(text),
+				self.GeoManager.fuzzy_search(text, num_results=5, filters={'geo_type': 'City'})
+			)
+
+	def test_load_only_partitions(self):
+		geo_manager = self.manager(partitions=['CA'])
+		self.assertEqual(geo_manager.partition_key, 'ref_data.country')
+		self.assertEqual(list(geo_manager.partition_index), ['CA'])
+		self.assertEqual(
+			set(geo_manager.geo_shape_dict),
+			{code for code, shape in self.geo_shape_dict.items() if shape['ref_data']['country'] == 'CA'}
+		)
+		self.assert_partition_queries(geo_manager, 'ref_data.country', 'CA')
+		self.assertEqual(geo_manager.fuzzy_search('Nash', partition='US'), [])
+
+	def test_add_entity(self):
+		geo_manager = self.manager(partitions=['US', 'CA'])
+		geo_manager.add_entity('Nashquill, ON', 'ca__on__nashquill', extra_entity={'ref_data': {'country': 'CA'}})
+		self.assertEqual(geo_manager.fuzzy_search('Nashquill', partition='CA', num_results=1)[0]['id'], 'ca__on__nashquill')
+		self.assertNotIn(
+			'ca__on__nashquill', [result['id'] for result in geo_manager.fuzzy_search('Nashquill', partition='US')]
+		)
+		self.assertEqual(geo_manager.prefix_search('na', partition='US', num_results=500), [
+			result for result in geo_manager.prefix_search('na', num_results=500)
+			if result['extra']['ref_data']['country'] == 'US'
+		])
+		with self.assertRaises(ValueError):
+			geo_manager.add_entity('Nashquill, NL', 'mx__nl__nashquill', partition='MX')
+
+	def test_snapshot(self):
+		geo_manager = self.manager(partition_key='ref_data.country')
+		path = f'{self.temp_dir.name}/partitioned_snapshot'
+		geo_manager.save_snapshot(path)
+		attached = GeoManager.attach_dataset(path, data_dir=self.temp_dir.name, partition_key='ref_data.country')
+		self.assert_partition_queries(attached, 'ref_data.country', 'US')
+
+	def test_snapshot_without_decoding_records(self):
+		# Partition codes of keys outside the attribute index are saved with it
+		geo_manager = self.manager(partition_key='primary_timezone')
+		path = f'{self.temp_dir.name}/timezone_snapshot'
+		geo_manager.save_snapshot(path)
+		loaded = GeoManager(data_dir=self.temp_dir.name, partition_key='primary_timezone')
+		loaded.load_snapshot(path)
+		self.assertEqual(loaded.geo_shape_dict.record_at.cache_info().currsize, 0)
+		self.assertEqual(sorted(loaded.partition_index), sorted(geo_manager.partition_index))
+		self.assertEqual(
+			loaded.fuzzy_search('Nash', partition='America/Chicago'),
+			geo_manager.fuzzy_search('Nash', partition='America/Chicago')
+		)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,92 @@
+import os
+import random
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+from yat_geo_db.geo_manager import apply_shape_filters
+
+from tests.fixtures import load_test_manager
+
+
+def reference_prefix_ids(geo_manager, prefix, num_results=50, filters=None):
+	"""Prefix Search as a full scan over every Shape"""
+	matches = [
+		(-(shape.get('population') or 0), position, shape['clean_value'].lower(), reference_code)
+		for position, reference_code in enumerate(geo_manager.shape_reference_codes)
+		for shape in [geo_manager.geo_shape_dict[reference_code]]
+		if shape['clean_value'].lower().startswith(prefix) and apply_shape_filters(value=shape, filters=filters)
+	]
+	results = {}
+	for _, _, clean_value, reference_code in sorted(matches):
+		results.setdefault(clean_value, reference_code)
+	return list(results.values())[:num_results]
+
+
+class PrefixIndexTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name, num_cities=120)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def random_prefixes(self, seed, lengths):
+		rng = random.Random(seed)
+		clean_values = list(self.GeoManager.shape_clean_values)
+		return [rng.choice(clean_values)[:rng.choice(lengths)] for _ in range(60)] + ['q', 'zz', '9']
+
+	def test_short_searches_match_full_scan(self):
+		for prefix in self.random_prefixes(1, [1, 2]):
+			for num_results, filters in [(5, None), (50, None), (10, {'geo_type': 'City'}), (10, {'ref_data.city': 'Nashville'})]:
+				self.assertEqual(
+					[result['id'] for result in self.GeoManager.fuzzy_search(prefix, num_results=num_results, filters=filters)],
+					reference_prefix_ids(self.GeoManager, prefix, num_results, filters)
+				)
+
+	def test_longer_prefix_search_length(self):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, prefix_search_length=4)
+		geo_manager.load_data()
+		for prefix in self.random_prefixes(2, [3, 4]):
+			self.assertEqual(
+				[result['id'] for result in geo_manager.fuzzy_search(prefix, num_results=5)],
+				reference_prefix_ids(geo_manager, prefix, 5)
+			)
+		self.assertEqual(
+			geo_manager.fuzzy_search('nashv', num_results=5), self.GeoManager.fuzzy_search('nashv', num_results=5)
+		)
+		with self.assertRaises(ValueError):
+			GeoManager(data_dir=self.temp_dir.name, prefix_search_length=20)
+
+	def test_result_fields(self):
+		results = self.GeoManager.fuzzy_search('Na', num_results=3)
+		self.assertGreater(len(results), 0, 'No results returned')
+		self.assertEqual(
+			set(results[0]), {'value', 'clean_value', 'distance', 'ngram_similarity', 'score', 'id', 'extra'}
+		)
+		self.assertEqual(self.GeoManager.fuzzy_search(''), [])
+		self.assertEqual(self.GeoManager.fuzzy_search('!!'), [])
+
+	def test_snapshot_and_added_entities(self):
+		snapshot_path = os.path.join(self.temp_dir.name, 'snapshot')
+		self.GeoManager.save_snapshot(snapshot_path)
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_snapshot(snapshot_path)
+		for prefix in self.random_prefixes(3, [1, 2]):
+			self.assertEqual(
+				geo_manager.fuzzy_search(prefix, num_results=5), self.GeoManager.fuzzy_search(prefix, num_results=5)
+			)
+
+		geo_manager.add_entity('Qqq Town', 'custom__qqq', extra_entity={'population': 10 ** 9})
+		geo_manager.add_entity('Na Town', geo_manager.shape_reference_codes[0], extra_entity={'population': 10 ** 9})
+		self.assertEqual(geo_manager.fuzzy_search('qq', num_results=1)[0]['id'], 'custom__qqq')
+		self.assertEqual(
+			[result['id'] for result in geo_manager.fuzzy_search('n', num_results=5)],
+			reference_prefix_ids(geo_manager, 'n', 5)
+		)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+from yat_geo_db.cache import QueryCache
+
+from tests.fixtures import load_test_manager
+
+
+class QueryCacheTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def load_cached_manager(self, query_cache_size):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name, query_cache_size=query_cache_size)
+		geo_manager.load_data()
+		return geo_manager
+
+	def test_lru_eviction(self):
+		cache = QueryCache(max_size=2)
+		cache.get_or_compute('a', lambda: 1)
+		cache.get_or_compute('b', lambda: 2)
+		cache.get_or_compute('a', lambda: 1)
+		cache.get_or_compute('c', lambda: 3)
+		self.assertEqual(cache.get_or_compute('b', lambda: 'recomputed'), 'recomputed')
+		self.assertEqual(cache.stats(), {'hits': 1, 'misses': 4, 'size': 2, 'max_size': 2})
+
+	def test_cached_results_match(self):
+		geo_manager = self.load_cached_manager(64)
+		reference_code = geo_manager.shape_reference_codes[10]
+		for _ in range(2):
+			self.assertEqual(
+				geo_manager.fuzzy_search('Nash', num_results=5, filters={'geo_type': 'City', 'ref_data.country': 'US'}),
+				self.GeoManager.fuzzy_search('Nash', num_results=5, filters={'geo_type': 'City', 'ref_data.country': 'US'})
+			)
+			self.assertEqual(
+				geo_manager.radius_search(reference_code, 50, full_results=True),
+				self.GeoManager.radius_search(reference_code, 50, full_results=True)
+			)
+		# Filter order and entity cleaning do not change the key
+		geo_manager.fuzzy_search('NASH!', num_results=5, filters={'ref_data.country': 'US', 'geo_type': 'City'})
+		self.assertEqual(geo_manager.query_cache_stats()['hits'], 3)
+		self.assertEqual(geo_manager.query_cache_stats()['misses'], 2)
+
+	def test_results_are_copies(self):
+		geo_manager = self.load_cached_manager(8)
+		results = geo_manager.fuzzy_search('Nash', num_results=3)
+		results[0]['extra']['value'] = 'changed'
+		results.clear()
+		self.assertEqual(geo_manager.fuzzy_search('Nash', num_results=3), self.GeoManager.fuzzy_search('Nash', num_results=3))
+
+	def test_invalidated_on_load(self):
+		geo_manager = self.load_cached_manager(8)
+		geo_manager.fuzzy_search('Nash')
+		self.assertEqual(len(geo_manager.query_cache), 1)
+		geo_manager.load_data()
+		self.assertEqual(len(geo_manager.query_cache), 0)
+		geo_manager.fuzzy_search('Nash')
+		geo_manager.add_entity('Nashwood', 'custom__nashwood')
+		self.assertEqual(len(geo_manager.query_cache), 0)
+
+	def test_disabled_by_default(self):
+		self.assertIsNone(self.GeoManager.query_cache_stats())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,58 @@
+import random
+import tempfile
+import unittest
+
+from tests.fixtures import load_test_manager
+
+
+class RadiusSearchManyTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def test_matches_single_searches(self):
+		rng = random.Random(11)
+		reference_codes = rng.sample(list(self.GeoManager.geo_shape_dict), 150) + ['missing__code']
+		for radius, country_exact, filters in [
+			(25, False, None), (100, True, None), (60, False, {'geo_type': 'ZipCode'})
+		]:
+			results = self.GeoManager.radius_search_many(
+				reference_codes, radius, country_exact=country_exact, filters=filters
+			)
+			self.assertEqual(len(results), len(reference_codes))
+			for reference_code, result in zip(reference_codes, results):
+				self.assertEqual(result, self.GeoManager.radius_search(
+					reference_code, radius, country_exact=country_exact, filters=filters
+				))
+
+	def test_lat_lng_full_results(self):
+		results = self.GeoManager.radius_search_lat_lng_many(
+			latitudes=[36.1, 41.8, float('nan')], longitudes=[-86.7, -87.6, 0.0], radius=40, full_results=True
+		)
+		self.assertEqual(len(results), 3)
+		self.assertGreater(len(results[0]), 0, 'No results returned')
+		self.assertEqual(results[2], [])
+		self.assertTrue(all('distance' in shape_obj for shape_obj in results[0]))
+
+	def test_full_results_distance_per_origin(self):
+		origins = ['tn_us_metro', 'us__tn']
+		results = self.GeoManager.radius_search_many(origins, 100, full_results=True)
+		shared = set.intersection(*[{shape_obj['reference_code'] for shape_obj in result} for result in results])
+		self.assertGreater(len(shared), 0, 'No Shape returned for both origins')
+		for origin, result in zip(origins, results):
+			for shape_obj in result:
+				if shape_obj['reference_code'] in shared:
+					self.assertEqual(
+						shape_obj['distance'], self.GeoManager.get_shape_pair_distance(origin, shape_obj['reference_code'])
+					)
+		for shape_obj in results[0]:
+			self.assertNotIn('distance', self.GeoManager.get_shape_by_id(shape_obj['id']))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+
+from tests.fixtures import load_test_manager
+
+
+def worker_searches(geo_manager, reference_codes):
+	return [
+		(
+			geo_manager.get_shape_by_ref_code(reference_code),
+			geo_manager.radius_search(reference_code, 60, country_exact=True),
+			geo_manager.fuzzy_search(geo_manager.get_shape_by_ref_code(reference_code)['value'][:5], num_results=5),
+		)
+		for reference_code in reference_codes
+	]
+
+
+def attached_worker_searches(task):
+	path, reference_codes = task
+	return worker_searches(GeoManager.attach_dataset(path), reference_codes)
+
+
+def forked_worker_searches(reference_codes):
+	return worker_searches(shared_manager, reference_codes)
+
+
+shared_manager = None
+
+
+class SharedDatasetTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+		cls.reference_codes = list(cls.GeoManager.geo_shape_dict)[::40]
+		cls.expected = worker_searches(cls.GeoManager, cls.reference_codes)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def shared_manager(self):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_data()
+		geo_manager.share_dataset(os.path.join(self.temp_dir.name, f'shared-{id(geo_manager)}'))
+		return geo_manager
+
+	def test_owner_matches(self):
+		geo_manager = self.shared_manager()
+		self.assertEqual(worker_searches(geo_manager, self.reference_codes), self.expected)
+		path = geo_manager.shared_dataset_path
+		geo_manager.remove_shared_dataset()
+		self.assertFalse(os.path.exists(path))
+		self.assertEqual(worker_searches(geo_manager, self.reference_codes[:3]), self.expected[:3])
+
+	def test_spawned_workers_attach(self):
+		geo_manager = self.shared_manager()
+		context = multiprocessing.get_context('spawn')
+		with context.Pool(2) as pool:
+			results = pool.map(
+				attached_worker_searches,
+				[(geo_manager.shared_dataset_path, [reference_code]) for reference_code in self.reference_codes]
+			)
+		self.assertEqual([result for results_ls in results for result in results_ls], self.expected)
+		geo_manager.remove_shared_dataset()
+
+	@unittest.skipUnless('fork' in multiprocessing.get_all_start_methods(), 'fork not available')
+	def test_forked_workers_inherit(self):
+		global shared_manager
+		shared_manager = self.shared_manager()
+		with multiprocessing.get_context('fork').Pool(2) as pool:
+			results = pool.map(forked_worker_searches, [[reference_code] for reference_code in self.reference_codes])
+		self.assertEqual([result for results_ls in results for result in results_ls], self.expected)
+		shared_manager.remove_shared_dataset()
+		shared_manager = None
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+
+from tests.fixtures import load_test_manager
+
+
+class SnapshotTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+		cls.snapshot_path = os.path.join(cls.temp_dir.name, 'snapshot')
+		cls.GeoManager.save_snapshot(cls.snapshot_path)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def load_snapshot(self, mmap=True):
+		geo_manager = GeoManager(data_dir=self.temp_dir.name)
+		geo_manager.load_snapshot(self.snapshot_path, mmap=mmap)
+		return geo_manager
+
+	def test_lookups_match(self):
+		geo_manager = self.load_snapshot()
+		self.assertEqual(geo_manager.num_shapes, self.GeoManager.num_shapes)
+		self.assertEqual(geo_manager.data_version, 'current')
+		for reference_code, shape in list(self.GeoManager.geo_shape_dict.items())[::7]:
+			self.assertEqual(geo_manager.get_shape_by_ref_code(reference_code), shape)
+			self.assertEqual(geo_manager.get_shape_by_id(shape['id']), shape)
+		self.assertIsNone(geo_manager.get_shape_by_ref_code('missing__code'))
+		self.assertIsNone(geo_manager.get_shape_by_id(-1))
+
+	def test_searches_match(self):
+		rng = random.Random(9)
+		for mmap in (True, False):
+			geo_manager = self.load_snapshot(mmap=mmap)
+			for reference_code in rng.sample(list(self.GeoManager.geo_shape_dict), 30):
+				self.assertEqual(
+					geo_manager.radius_search(reference_code, 80, country_exact=True),
+					self.GeoManager.radius_search(reference_code, 80, country_exact=True)
+				)
+				shape = self.GeoManager.get_shape_by_ref_code(reference_code)
+				self.assertEqual(
+					geo_manager.fuzzy_search(shape['value'][:6], num_results=5),
+					self.GeoManager.fuzzy_search(shape['value'][:6], num_results=5)
+				)
+				self.assertEqual(
+					geo_manager.get_shape_pair_distance(reference_code, 'tn_us_metro'),
+					self.GeoManager.get_shape_pair_distance(reference_code, 'tn_us_metro')
+				)
+
+	def test_snapshot_of_snapshot(self):
+		geo_manager = self.load_snapshot()
+		path = os.path.join(self.temp_dir.name, 'snapshot_copy')
+		geo_manager.save_snapshot(path)
+		copy_manager = GeoManager(data_dir=self.temp_dir.name)
+		copy_manager.load_snapshot(path)
+		self.assertEqual(
+			copy_manager.fuzzy_search('nash', num_results=5), self.GeoManager.fuzzy_search('nash', num_results=5)
+		)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,93 @@
+import random
+import tempfile
+import unittest
+
+from yat_geo_db.geo_manager import apply_shape_filters
+from yat_geo_db.geometry import latitude_delta_from_miles, longitude_delta_from_miles
+
+from tests.fixtures import load_test_manager
+
+
+def full_scan_shape_ids(geo_manager, latitude, longitude, radius, country_filter=None, filters=None):
+	"""Radius Search as a full scan over every Radius Shape"""
+	lng_delta = longitude_delta_from_miles(lat=latitude, miles=radius)
+	lat_delta = latitude_delta_from_miles(miles=radius)
+	return [
+		radius_shape.pk for radius_shape in geo_manager.radius_search_map.values()
+		if radius_shape.radius_match(latitude, longitude, lat_delta, lng_delta, country_filter)
+		and apply_shape_filters(value=radius_shape.shape_extra, filters=filters)
+	]
+
+
+class SpatialIndexTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.GeoManager = load_test_manager(cls.temp_dir.name)
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def test_matches_full_scan(self):
+		rng = random.Random(3)
+		shapes = list(self.GeoManager.geo_shape_dict.values())
+		for _ in range(200):
+			origin = rng.choice(shapes)
+			latitude = origin['latitude'] + rng.uniform(-.5, .5)
+			longitude = origin['longitude'] + rng.uniform(-.5, .5)
+			radius = rng.choice([1, 10, 50, 150, 500, 3000])
+			country_filter = rng.choice([None, origin['ref_data']['country']])
+			filters = rng.choice([None, {'geo_type': 'City'}, {'ref_data.state_prov': origin['ref_data']['state_prov']}])
+			self.assertEqual(
+				self.GeoManager.get_radius_lat_lng_shape_ids(
+					latitude, longitude, radius, country_filter=country_filter, filters=filters
+				),
+				full_scan_shape_ids(self.GeoManager, latitude, longitude, radius, country_filter, filters)
+			)
+
+	def test_radius_search_by_reference_code(self):
+		for reference_code in list(self.GeoManager.geo_shape_dict)[::25]:
+			shape = self.GeoManager.get_shape_by_ref_code(reference_code)
+			results = self.GeoManager.radius_search(reference_code=reference_code, radius=50, country_exact=True)
+			self.assertEqual(
+				results,
+				full_scan_shape_ids(
+					self.GeoManager, shape['latitude'], shape['longitude'], 50, shape['ref_data']['country']
+				)
+			)
+
+	def test_point_search_matches_full_scan(self):
+		lat_delta = latitude_delta_from_miles(miles=75)
+		lng_delta = longitude_delta_from_miles(lat=41.8, miles=75)
+		expected = [
+			radius_shape for radius_shape in self.GeoManager.radius_search_map.values()
+			if radius_shape.radius_match(41.8, -87.6, lat_delta, lng_delta) and not radius_shape.is_aggregate
+		]
+		self.assertEqual(self.GeoManager.radius_lat_lng_search(41.8, -87.6, 75), expected)
+
+	def test_radius_shapes_read_columns(self):
+		for position, reference_code in enumerate(self.GeoManager.shape_reference_codes[::40]):
+			position *= 40
+			record = self.GeoManager.geo_shape_dict[reference_code]
+			radius_shape = self.GeoManager.radius_search_map[reference_code]
+			self.assertEqual(radius_shape, self.GeoManager.radius_shape_ls[position])
+			self.assertEqual(
+				(radius_shape.pk, radius_shape.latitude, radius_shape.longitude, radius_shape.is_aggregate),
+				(record['id'], record['latitude'], record['longitude'], record['is_aggregate'])
+			)
+			self.assertEqual((radius_shape.country, radius_shape.geo_type), (record['ref_data']['country'], record['geo_type']))
+			self.assertEqual(radius_shape.reference_code, reference_code)
+			self.assertIs(radius_shape.shape_extra, record)
+			self.assertFalse(hasattr(radius_shape, '__dict__'))
+		self.assertNotIn('missing__code', self.GeoManager.radius_search_map)
+		self.assertEqual(len(self.GeoManager.radius_search_map), len(self.GeoManager.shape_columns))
+
+	def test_point_search_excludes_aggregates(self):
+		results = self.GeoManager.radius_lat_lng_search(36.1, -86.7, 100)
+		self.assertGreater(len(results), 0, 'No results returned')
+		self.assertFalse(any(radius_shape.is_aggregate for radius_shape in results))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,120 @@
+import gzip
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from yat_geo_db import GeoManager
+from yat_geo_db.stream import inflate_chunks, load_json_object
+
+from tests.fixtures import generate_geo_db, serve_directory, write_geo_db, write_remote_geo_db
+
+
+def split_chunks(content: bytes, rng, max_size: int = 7):
+	chunks = []
+	start = 0
+	while start < len(content):
+		size = rng.randint(1, max_size)
+		chunks.append(content[start:start + size])
+		start += size
+	return chunks
+
+
+class StreamParserTest(unittest.TestCase):
+	def test_matches_json_loads(self):
+		rng = random.Random(3)
+		payloads = [
+			{},
+			{'a': 1},
+			{'us__tn__nashville': {'value': 'Nashville, TN', 'population': 715884, 'latitude': 36.16589, 'area': 1.5e3}},
+			{'nas': ['us__tn__nashville', 'us__37201'], 'éé': ['Montréal 😀'], 'n': None, 't': True, 'f': False, 'x': -12.5e-3},
+			{str(i): [i * 1.5, str(i) * i, {'k': [None] * (i % 3)}] for i in range(300)},
+			{f'us__{i}': {'bbox': {'a': i}, 'ref_data': {'b': [i]}, 'value': '}, "x": {', 'ref': {'c': {}}} for i in range(500)},
+			{f'{i}': [{'k': {'a': [1]}, 'n': {}}, '], "x": ['] for i in range(500)},
+		]
+		for payload in payloads:
+			for indent in (None, 2):
+				content = json.dumps(payload, ensure_ascii=False, indent=indent).encode('utf-8')
+				for max_size in (1, 3, 64, len(content) + 1):
+					self.assertEqual(load_json_object(split_chunks(content, rng, max_size)), payload)
+
+	def test_long_value(self):
+		payload = {'ngram': ['us__' + str(i) for i in range(20000)], 'last': 1234567}
+		content = json.dumps(payload).encode('utf-8')
+		self.assertEqual(load_json_object(split_chunks(content, random.Random(4), 100)), payload)
+
+	def test_invalid_json(self):
+		for content in [b'', b'[1, 2]', b'{"a": 1', b'{"a": 1,}', b'{"a" 1}', b'{1: 2}', b'{"a": 1} x', b'{"a": tru}']:
+			with self.assertRaises(ValueError, msg=content):
+				load_json_object(split_chunks(content, random.Random(5), 2))
+
+	def test_inflate(self):
+		content = json.dumps({str(i): i for i in range(5000)}).encode('utf-8')
+		compressed = gzip.compress(content[:1000]) + gzip.compress(content[1000:])
+		chunks = list(inflate_chunks(split_chunks(compressed, random.Random(6), 50), chunk_size=256))
+		self.assertEqual(b''.join(chunks), content)
+		self.assertLessEqual(max(len(chunk) for chunk in chunks), 256)
+		with self.assertRaises(ValueError):
+			list(inflate_chunks([compressed[:len(compressed) // 3]]))
+
+
+class StreamingLoadTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.temp_dir = tempfile.TemporaryDirectory()
+		cls.geo_shape_dict, cls.search_dict = generate_geo_db()
+		cls.remote_dir = os.path.join(cls.temp_dir.name, 'remote')
+		write_remote_geo_db(cls.remote_dir, cls.geo_shape_dict, cls.search_dict)
+		cls.local_dir = os.path.join(cls.temp_dir.name, 'local')
+		write_geo_db(cls.local_dir, cls.geo_shape_dict, cls.search_dict)
+		cls.GeoManager = GeoManager(data_dir=cls.local_dir)
+		cls.GeoManager.load_data()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.temp_dir.cleanup()
+
+	def assert_same_data(self, geo_manager):
+		self.assertEqual(dict(geo_manager.geo_shape_dict), self.GeoManager.geo_shape_dict)
+		self.assertEqual(dict(geo_manager.search_dict), dict(self.GeoManager.search_dict))
+		for search in ['Nash', 'chicago', 'spr']:
+			self.assertEqual(geo_manager.fuzzy_search(search, num_results=5), self.GeoManager.fuzzy_search(search, num_results=5))
+
+	def test_local_load(self):
+		self.assertEqual(
+			{reference_code: list(values) for reference_code, values in self.GeoManager.search_dict.items()},
+			{ngram: [reference_code for reference_code in values if reference_code in self.geo_shape_dict] for ngram, values in self.search_dict.items()}
+		)
+
+	def test_remote_load(self):
+		for compressed in (False, True):
+			data_dir = os.path.join(self.temp_dir.name, f'remote-{compressed}')
+			geo_manager = GeoManager(data_dir=data_dir)
+			with serve_directory(self.remote_dir) as base_url:
+				geo_manager.get_base_url = lambda version=None: base_url
+				geo_manager.load_data(compressed=compressed)
+			self.assert_same_data(geo_manager)
+
+			cache_path = os.path.join(data_dir, 'geo_db', 'current')
+			self.assertEqual(sorted(os.listdir(os.path.dirname(cache_path))), ['current'])
+			cached_manager = GeoManager(data_dir=data_dir)
+			cached_manager.load_data()
+			self.assert_same_data(cached_manager)
+
+	def test_failed_download_leaves_no_cache(self):
+		remote_dir = os.path.join(self.temp_dir.name, 'remote-shape-only')
+		write_remote_geo_db(remote_dir, self.geo_shape_dict, self.search_dict)
+		os.remove(os.path.join(remote_dir, 'geo_manager_ngram_search.json'))
+		data_dir = os.path.join(self.temp_dir.name, 'failed')
+		geo_manager = GeoManager(data_dir=data_dir)
+		with serve_directory(remote_dir) as base_url:
+			geo_manager.get_base_url = lambda version=None: base_url
+			with self.assertRaises(ValueError):
+				geo_manager.load_data()
+		self.assertEqual(os.listdir(os.path.join(data_dir, 'geo_db')), [])
+		self.assertEqual(geo_manager.num_shapes, 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,3 +1,5 @@
 __version__ = "1.1.2"
 
-from .geo_manager import GeoManager
\ No newline at end of file
+from .geo_manager import GeoManager
+from .async_manager import AsyncGeoManager
+from .instrumentation import QueryStats, QueryTrace
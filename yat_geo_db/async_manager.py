@@ -0,0 +1,142 @@
+"""
+asyncio front end of GeoManager
+"""
+from .geo_manager import GeoManager
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Union
+
+
+class AsyncGeoManager(object):
+    """
+    Awaitable GeoManager, loading and queries run in an executor so the event
+    loop stays responsive.  The default executor is the loop's thread pool,
+    numpy heavy searches (radius, batch, distance) release the GIL for most
+    of their work.  The wrapped manager is available as `geo_manager` for
+    cheap synchronous lookups.
+    """
+    def __init__(self, geo_manager: GeoManager = None, executor: Executor = None, **kwargs):
+        self.geo_manager = geo_manager if geo_manager is not None else GeoManager(**kwargs)
+        self.executor = executor
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def load_data(self,
+                        version: str = None,
+                        force_db_fetch: bool = False,
+                        cache_local: bool = True,
+                        compressed: bool = False,
+                        build_ngrams: bool = False):
+        """Load data, see `GeoManager.aload_data`"""
+        await self.geo_manager.aload_data(
+            version=version, force_db_fetch=force_db_fetch, cache_local=cache_local,
+            compressed=compressed, build_ngrams=build_ngrams, executor=self.executor
+        )
+
+    async def reload(self,
+                     version: str = None,
+                     force_db_fetch: bool = True,
+                     cache_local: bool = True,
+                     compressed: bool = False,
+                     build_ngrams: bool = False) -> Dict:
+        """Reload while queries keep running, see `GeoManager.reload`"""
+        return await self._run(
+            self.geo_manager.reload, version=version, force_db_fetch=force_db_fetch,
+            cache_local=cache_local, compressed=compressed, build_ngrams=build_ngrams
+        )
+
+    async def load_snapshot(self, path: str, mmap: bool = True):
+        await self._run(self.geo_manager.load_snapshot, path, mmap=mmap)
+
+    async def fuzzy_search(self,
+                           search_entity: str,
+                           partition: str = None,
+                           num_results: int = 50,
+                           filters: Dict = None) -> List[Dict]:
+        return await self._run(
+            self.geo_manager.fuzzy_search, search_entity, partition=partition,
+            num_results=num_results, filters=filters
+        )
+
+    async def best_fuzzy_search(self,
+                                search_entity: str,
+                                partition: str = None,
+                                score_threshold: float = .90,
+                                filters: Dict = None) -> Optional[Dict]:
+        return await self._run(
+            self.geo_manager.best_fuzzy_search, search_entity, partition=partition,
+            score_threshold=score_threshold, filters=filters
+        )
+
+    async def best_fuzzy_search_many(self,
+                                     search_entities: Iterable[str],
+                                     partition: str = None,
+                                     score_threshold: float = .90,
+                                     filters: Dict = None,
+                                     workers: int = None,
+                                     chunk_size: int = 256) -> List[Optional[Dict]]:
+        """Bulk Best Result Search, results in input order as a list"""
+        return await self._run(lambda: list(self.geo_manager.best_fuzzy_search_many(
+            search_entities, partition=partition, score_threshold=score_threshold,
+            filters=filters, workers=workers, chunk_size=chunk_size
+        )))
+
+    async def radius_search(self,
+                            reference_code: str,
+                            radius,
+                            country_exact: bool = False,
+                            full_results: bool = False,
+                            filters: Dict = None,
+                            partition: str = None) -> List[Union[int, Dict]]:
+        return await self._run(
+            self.geo_manager.radius_search, reference_code, radius, country_exact=country_exact,
+            full_results=full_results, filters=filters, partition=partition
+        )
+
+    async def radius_search_many(self,
+                                 reference_codes: List[str],
+                                 radius,
+                                 country_exact: bool = False,
+                                 full_results: bool = False,
+                                 filters: Dict = None,
+                                 partition: str = None) -> List[List[Union[int, Dict]]]:
+        return await self._run(
+            self.geo_manager.radius_search_many, reference_codes, radius, country_exact=country_exact,
+            full_results=full_results, filters=filters, partition=partition
+        )
+
+    async def radius_search_lat_lng_many(self,
+                                         latitudes: List[float],
+                                         longitudes: List[float],
+                                         radius,
+                                         reference_codes: List[str] = None,
+                                         country_filters: List[str] = None,
+                                         full_results: bool = False,
+                                         filters: Dict = None,
+                                         partition: str = None) -> List[List[Union[int, Dict]]]:
+        return await self._run(
+            self.geo_manager.radius_search_lat_lng_many, latitudes, longitudes, radius,
+            reference_codes=reference_codes, country_filters=country_filters,
+            full_results=full_results, filters=filters, partition=partition
+        )
+
+    async def nearest(self,
+                      latitude: float,
+                      longitude: float,
+                      k: int = 1,
+                      filters: Dict = None,
+                      partition: str = None) -> List[Dict]:
+        return await self._run(
+            self.geo_manager.nearest, latitude, longitude, k=k, filters=filters, partition=partition
+        )
+
+    async def distance_matrix(self, orig_refs: List[str], dest_refs: List[str]) -> Dict[str, np.ndarray]:
+        return await self._run(self.geo_manager.distance_matrix, orig_refs, dest_refs)
+
+    async def distances(self, orig_refs: List[str], dest_refs: List[str]) -> Dict[str, np.ndarray]:
+        return await self._run(self.geo_manager.distances, orig_refs, dest_refs)
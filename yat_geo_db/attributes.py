@@ -0,0 +1,107 @@
+"""
+Attribute indexes over the common filter keys, `filters` on these keys are
+resolved with array lookups rather than `get_key` on every record
+"""
+from .columns import value_codes
+from .utils import get_embedded_key
+
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+ATTRIBUTE_INDEX_KEYS = ('geo_type', 'ref_data.country', 'ref_data.state_prov', 'is_zip_code', 'is_aggregate')
+
+
+class AttributeIndex(object):
+    """
+    Integer value codes per shape position for each indexed filter key, the
+    shapes matching `{key: value}` are the positions whose code is the code of
+    `value`.  Values compare as the per record check does (`==`), keys whose
+    values can not be indexed are left to that check.  Positions past the
+    index or marked `stale` (re-added entities) are not covered.
+    """
+    def __init__(self, codes: Dict[str, np.ndarray], values: Dict[str, List], num_shapes: int):
+        self.codes = codes
+        self.values = values
+        self.num_shapes = num_shapes
+        self.stale: Set[int] = set()
+        self._code_maps = {}
+        for key, key_values in values.items():
+            code_map = {}
+            for code, value in enumerate(key_values):
+                code_map.setdefault(value, code)
+            self._code_maps[key] = code_map
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], keys: Tuple[str] = ATTRIBUTE_INDEX_KEYS):
+        records = list(records)
+        codes = {}
+        values = {}
+        for key in keys:
+            try:
+                if '.' in key:
+                    path = key.split('.')
+                    key_values = [get_embedded_key(record, path) for record in records]
+                else:
+                    key_values = [record.get(key) for record in records]
+                codes[key], values[key] = value_codes(key_values)
+            except (AttributeError, TypeError):
+                # Unhashable values or records without the parent key, not indexed
+                continue
+        return cls(codes=codes, values=values, num_shapes=len(records))
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], values: Dict[str, List]):
+        """Rebuild from `to_arrays` output, arrays may be memory-mapped"""
+        num_shapes = len(next(iter(arrays.values()))) if arrays else 0
+        return cls(codes=dict(arrays), values=values, num_shapes=num_shapes)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Code arrays by key, `values` is kept separately"""
+        return dict(self.codes)
+
+    def __len__(self):
+        return self.num_shapes
+
+    def __contains__(self, key):
+        return key in self.codes
+
+    def split_filters(self, filters: Dict) -> Tuple[List[Tuple[str, int]], Optional[Dict]]:
+        """
+        `(key, code)` pairs for the indexed filters, code -1 if no shape has the
+        value, and the remaining filters (None if every filter is indexed)
+        """
+        indexed = []
+        remaining = {}
+        for key, value in filters.items():
+            try:
+                code = self._code_maps[key].get(value, -1) if key in self.codes else None
+            except TypeError:
+                code = None
+            if code is None:
+                remaining[key] = value
+            else:
+                indexed.append((key, code))
+        return indexed, remaining or None
+
+    def covered(self, positions: np.ndarray) -> np.ndarray:
+        """Mask of positions the index covers"""
+        covered = positions < self.num_shapes
+        if self.stale:
+            covered &= ~np.isin(positions, list(self.stale))
+        return covered
+
+    def mask(self, positions: np.ndarray, indexed: List[Tuple[str, int]]) -> np.ndarray:
+        """
+        Mask of positions matching every indexed filter, positions the index
+        does not cover are True
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        covered = self.covered(positions)
+        mask = np.ones(len(positions), dtype=bool)
+        covered_positions = positions[covered]
+        covered_mask = np.ones(len(covered_positions), dtype=bool)
+        for key, code in indexed:
+            covered_mask &= self.codes[key][covered_positions] == code
+        mask[covered] = covered_mask
+        return mask
@@ -0,0 +1,93 @@
+"""
+Incremental type-ahead sessions over the Fuzzy Search n-gram index
+"""
+from .fuzzy import ngrams
+from .ngram_index import rank_candidates
+
+import numpy as np
+from typing import Dict, List
+
+
+class AutocompleteSession(object):
+    """
+    Fuzzy Search state for text typed one keystroke at a time.  Per shape
+    posting counts, first posting index and distinct n-gram hits are kept
+    between calls, so an extension only merges the posting lists of its new
+    n-grams.  Any other edit (backspace, changes in the middle), a reload or
+    an added entity starts over.
+    Results are the same as `fuzzy_search` on the whole text.
+    """
+    def __init__(self, geo_manager, num_results: int = 50, filters: Dict = None, partition: str = None):
+        self.geo_manager = geo_manager
+        self.num_results = num_results
+        self.filters = filters
+        self.partition = partition
+        self.text = ''
+        self.reset()
+
+    def reset(self):
+        """Drop the accumulated candidates"""
+        self.search_entity = ''
+        self.search_ngram_ls: List[str] = []
+        self._ngram_index = self.geo_manager.get_ngram_index(self.partition)
+        self._ngram_index_version = self._ngram_index.version
+        self._seen_ngrams = set()
+        self._num_postings = 0
+        self._positions = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._first_index = np.empty(0, dtype=np.int64)
+        self._hits = np.empty(0, dtype=np.int64)
+
+    def _add_postings(self, postings: np.ndarray):
+        """Merge one n-gram's posting list into the sorted candidate arrays"""
+        positions, first_index, counts = np.unique(postings, return_index=True, return_counts=True)
+        index = np.searchsorted(self._positions, positions)
+        found = index < len(self._positions)
+        found[found] = self._positions[index[found]] == positions[found]
+
+        self._counts[index[found]] += counts[found]
+        self._hits[index[found]] += 1
+
+        missing = ~found
+        self._positions = np.insert(self._positions, index[missing], positions[missing])
+        self._counts = np.insert(self._counts, index[missing], counts[missing])
+        self._first_index = np.insert(
+            self._first_index, index[missing], self._num_postings + first_index[missing]
+        )
+        self._hits = np.insert(self._hits, index[missing], 1)
+        self._num_postings += len(postings)
+
+    def extend(self, text: str) -> List[Dict]:
+        """Append typed text, returns Fuzzy Search results for the whole text"""
+        return self.update(self.text + text)
+
+    def update(self, text: str) -> List[Dict]:
+        """Set the whole text, returns Fuzzy Search results for it, all from one dataset"""
+        with self.geo_manager.pinned():
+            search_entity = self.geo_manager.clean_entity(text)
+            # Reloads swap the index, added entities change it in place
+            if (not search_entity.startswith(self.search_entity)
+                    or self._ngram_index is not self.geo_manager.get_ngram_index(self.partition)
+                    or self._ngram_index_version != self._ngram_index.version):
+                self.reset()
+
+            search_ngram_ls = ngrams(search_entity, 3)
+            for ngram in search_ngram_ls[len(self.search_ngram_ls):]:
+                if ngram not in self._seen_ngrams:
+                    self._seen_ngrams.add(ngram)
+                    self._add_postings(self._ngram_index.get_postings(ngram))
+            self.text = text
+            self.search_entity = search_entity
+            self.search_ngram_ls = search_ngram_ls
+
+            if len(search_entity) <= self.geo_manager.prefix_search_length:
+                return self.geo_manager.prefix_search(
+                    search_entity, num_results=self.num_results, filters=self.filters, partition=self.partition
+                )
+            top_positions, _, top_hits = rank_candidates(
+                self._positions, self._first_index, self._counts, self._hits,
+                max(self.num_results, 500), keep=self.geo_manager.indexed_filter_keep(self.filters)
+            )
+            return self.geo_manager.fuzzy_candidate_results(
+                search_entity, search_ngram_ls, top_positions, top_hits, self.num_results, self.filters
+            )
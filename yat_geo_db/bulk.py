@@ -0,0 +1,137 @@
+"""
+Bulk Best Result Search over a process pool
+
+Workers share the loaded indexes rather than receiving a pickled manager.  With
+the `fork` start method workers inherit the parent's manager, with other start
+methods the parent saves a snapshot that every worker memory-maps.
+"""
+from collections import OrderedDict
+from itertools import islice
+import multiprocessing
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Manager used by pool workers, inherited on fork or loaded by `_init_worker`
+_worker_manager = None
+
+
+def _init_worker(snapshot_path: str, manager_kwargs: Dict):
+    global _worker_manager
+    from .geo_manager import GeoManager
+    _worker_manager = GeoManager.attach_dataset(snapshot_path, **manager_kwargs)
+
+
+def _best_fuzzy_search_chunk(task: Tuple[List[str], Optional[str], float, Optional[Dict]]) -> List[Optional[Dict]]:
+    search_entities, partition, score_threshold, filters = task
+    return [
+        _worker_manager.best_fuzzy_search(
+            search_entity, partition=partition, score_threshold=score_threshold, filters=filters
+        )
+        for search_entity in search_entities
+    ]
+
+
+def _chunks(values: List[str], chunk_size: int) -> Iterator[List[str]]:
+    for start in range(0, len(values), chunk_size):
+        yield values[start:start + chunk_size]
+
+
+def best_fuzzy_search_many(geo_manager,
+                           search_entities: Iterable[str],
+                           partition: str = None,
+                           score_threshold: float = .90,
+                           filters: Dict = None,
+                           workers: int = None,
+                           chunk_size: int = 256,
+                           start_method: str = None,
+                           dedup_size: int = 10000) -> Iterator[Optional[Dict]]:
+    """
+    `best_fuzzy_search` for every search entity, yielded in input order.
+    Entities are read in batches, searches are deduplicated on the cleaned
+    entity within a batch and against the results of the `dedup_size` most
+    recently seen entities of earlier batches, so memory stays bounded on
+    any input length.  The unique searches of a batch are split in chunks of
+    `chunk_size` across `workers` processes.  Duplicate entities yield the
+    same result object while it is remembered.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size <= 0:
+        raise ValueError(f'chunk_size must be positive, chunk_size={chunk_size}')
+    if dedup_size < 0:
+        raise ValueError(f'dedup_size must not be negative, dedup_size={dedup_size}')
+
+    search_entities = iter(search_entities)
+    batch_size = chunk_size * max(workers, 1) * 4
+    # Least recently used results of earlier batches, by cleaned entity
+    recent = OrderedDict()
+
+    def search_batches(search_chunks):
+        while True:
+            batch = list(islice(search_entities, batch_size))
+            if not batch:
+                return
+            keys = [geo_manager.clean_entity(search_entity) for search_entity in batch]
+            resolved = {}
+            for key in dict.fromkeys(keys):
+                if key in recent:
+                    recent.move_to_end(key)
+                    resolved[key] = recent[key]
+            pending = [key for key in dict.fromkeys(keys) if key not in resolved]
+            for key, result in zip(pending, search_chunks(pending)):
+                resolved[key] = result
+            if dedup_size:
+                for key in pending:
+                    recent[key] = resolved[key]
+                while len(recent) > dedup_size:
+                    recent.popitem(last=False)
+            for key in keys:
+                yield resolved[key]
+
+    if workers <= 1:
+        yield from search_batches(lambda pending: [
+            geo_manager.best_fuzzy_search(
+                search_entity, partition=partition, score_threshold=score_threshold, filters=filters
+            )
+            for search_entity in pending
+        ])
+        return
+
+    global _worker_manager
+    if start_method is None:
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    context = multiprocessing.get_context(start_method)
+
+    snapshot_dir = None
+    if start_method == 'fork':
+        _worker_manager = geo_manager
+        pool = context.Pool(workers)
+    else:
+        snapshot_dir = tempfile.mkdtemp(prefix='yat_geo_db_')
+        snapshot_path = os.path.join(snapshot_dir, 'snapshot')
+        geo_manager.save_snapshot(snapshot_path)
+        manager_kwargs = {
+            'lower_only': geo_manager.lower_only,
+            'data_dir': geo_manager.data_dir,
+            'prefix_search_length': geo_manager.prefix_search_length,
+            'partitions': geo_manager.partitions,
+            'partition_key': geo_manager.partition_key,
+        }
+        pool = context.Pool(workers, initializer=_init_worker, initargs=(snapshot_path, manager_kwargs))
+
+    try:
+        with pool:
+            yield from search_batches(lambda pending: [
+                result for chunk_results in pool.imap(
+                    _best_fuzzy_search_chunk,
+                    ((chunk, partition, score_threshold, filters) for chunk in _chunks(pending, chunk_size))
+                )
+                for result in chunk_results
+            ])
+    finally:
+        if start_method == 'fork':
+            _worker_manager = None
+        if snapshot_dir is not None:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
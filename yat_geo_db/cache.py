@@ -0,0 +1,67 @@
+"""
+Bounded LRU cache for query results
+"""
+from collections import OrderedDict
+from copy import deepcopy
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+def filters_cache_key(filters: Optional[Dict]) -> Optional[Tuple]:
+    """Canonical, order independent form of a `filters` dict"""
+    if filters is None:
+        return None
+    return tuple(sorted(filters.items(), key=lambda item: item[0]))
+
+
+class QueryCache(object):
+    """
+    Least recently used cache of query results with hit/miss counters.
+    Results are deep copied in and out, callers can not alter cached entries.
+    Keys that can not be hashed (unhashable filter values) are not cached.
+    """
+    def __init__(self, max_size: int = 1024):
+        if max_size <= 0:
+            raise ValueError(f'Query cache max_size must be positive, max_size={max_size}')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        try:
+            hash(key)
+        except TypeError:
+            return compute()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return deepcopy(self._entries[key])
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Drop every entry, counters are kept"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+        }
@@ -0,0 +1,136 @@
+"""
+Columnar (numpy) store of the Geo Shape fields used by Radius Search
+"""
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+BBOX_KEYS = ('ll_latitude', 'll_longitude', 'ur_latitude', 'ur_longitude')
+COLUMN_NAMES = ('pk', 'latitude', 'longitude', 'area', 'is_aggregate') + BBOX_KEYS + ('country', 'geo_type')
+
+
+def to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def float_column(values: List) -> np.ndarray:
+    """Float64 array of `values` converted as `to_float` does"""
+    try:
+        column = np.array(values, dtype=np.float64)
+        if column.shape == (len(values),):
+            return column
+    except (TypeError, ValueError):
+        pass
+    return np.array([to_float(value) for value in values], dtype=np.float64)
+
+
+def value_codes(values: Iterable) -> Tuple[np.ndarray, List]:
+    """Small integer codes of `values` and the distinct values in code order"""
+    values = list(values)
+    code_map = {value: code for code, value in enumerate(dict.fromkeys(values))}
+    dtype = np.int16 if len(code_map) <= np.iinfo(np.int16).max else np.int32
+    codes = np.fromiter(map(code_map.__getitem__, values), dtype=dtype, count=len(values))
+    return codes, list(code_map)
+
+
+class ShapeColumns(object):
+    """
+    Float64 coordinate/bounding box columns, aggregate flag and integer
+    country and geo type codes for every shape, indexed by shape position
+    (the insertion order of `geo_shape_dict`)
+    """
+    def __init__(self, records: Iterable[Dict]):
+        records = list(records)
+        nan = float('nan')
+
+        ids = [record.get('id') for record in records]
+        try:
+            self.pk = np.array(ids, dtype=np.int64)
+        except (TypeError, ValueError, OverflowError):
+            self.pk = np.array(ids, dtype=object)
+
+        self.latitude = float_column([record.get('latitude') for record in records])
+        self.longitude = float_column([record.get('longitude') for record in records])
+        self.area = float_column([record.get('area') for record in records])
+        self.is_aggregate = np.array(
+            [bool(record.get('is_aggregate', False)) for record in records], dtype=bool
+        )
+
+        # Bounding Box only applies to Aggregates, missing values never match and empty values are 0
+        no_bbox = {}
+        bbox_ls = [
+            (record.get('bbox') or no_bbox) if aggregate else no_bbox
+            for record, aggregate in zip(records, self.is_aggregate.tolist())
+        ]
+        for key in BBOX_KEYS:
+            setattr(self, key, float_column([bbox.get(key, nan) or 0 for bbox in bbox_ls]))
+
+        # Country and Geo Type as small integer codes into `country_values`/`geo_type_values`
+        self.country, self.country_values = value_codes(
+            (record.get('ref_data') or {}).get('country') for record in records
+        )
+        self.geo_type, self.geo_type_values = value_codes(record.get('geo_type') for record in records)
+        self._build_code_maps()
+
+    @classmethod
+    def from_arrays(cls,
+                    arrays: Dict[str, np.ndarray],
+                    country_values: List[Optional[str]],
+                    geo_type_values: List[Optional[str]]):
+        """Rebuild columns from `to_arrays` output, arrays may be memory-mapped"""
+        columns = cls.__new__(cls)
+        for name in COLUMN_NAMES:
+            setattr(columns, name, arrays[name])
+        columns.country_values = list(country_values)
+        columns.geo_type_values = list(geo_type_values)
+        columns._build_code_maps()
+        return columns
+
+    def _build_code_maps(self):
+        self._country_code_map = {country: code for code, country in enumerate(self.country_values)}
+        self._geo_type_code_map = {geo_type: code for code, geo_type in enumerate(self.geo_type_values)}
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Columns by name, `country_values` and `geo_type_values` are kept separately"""
+        return {name: getattr(self, name) for name in COLUMN_NAMES}
+
+    def __len__(self):
+        return len(self.latitude)
+
+    def country_code(self, country: Optional[str]) -> int:
+        """Integer code of a country, -1 if no shape has that country"""
+        return self._country_code_map.get(country, -1)
+
+    def geo_type_code(self, geo_type: Optional[str]) -> int:
+        """Integer code of a geo type, -1 if no shape has that geo type"""
+        return self._geo_type_code_map.get(geo_type, -1)
+
+    def radius_mask(self,
+                    positions: np.ndarray,
+                    latitude: float,
+                    longitude: float,
+                    lat_delta: float,
+                    lng_delta: float,
+                    country_filter: str = None) -> np.ndarray:
+        """
+        Vectorized `RadiusSearchShape.radius_match` over shape positions, the
+        ellipse test for point shapes and bounding box containment test for
+        aggregates
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            in_radius = (
+                (((latitude - self.latitude[positions]) / lat_delta) ** 2) +
+                (((longitude - self.longitude[positions]) / lng_delta) ** 2)
+            ) < 1
+        contains = (
+            (self.ur_latitude[positions] >= latitude) & (latitude >= self.ll_latitude[positions]) &
+            (self.ur_longitude[positions] >= longitude) & (longitude >= self.ll_longitude[positions])
+        )
+        mask = np.where(self.is_aggregate[positions], contains, in_radius)
+
+        if country_filter is not None:
+            mask &= self.country[positions] == self.country_code(country_filter)
+        return mask
@@ -0,0 +1,97 @@
+"""
+Loaded Geo DB as one swappable object
+
+Shape records, lookups and every index built from them live on a
+`GeoDataset`.  The manager exposes the fields as attributes that read the
+current dataset, a reload builds a complete new dataset and swaps it in with
+a single assignment.  Query methods pin the dataset for the calling thread,
+so a query that runs while a reload swaps datasets sees only one of them.
+"""
+from datetime import datetime
+from functools import wraps
+from itertools import count
+from typing import Dict
+
+DATASET_FIELDS = (
+    'geo_shape_dict',
+    'search_dict',
+    'id_reference_code_map',
+    'radius_search_map',
+    'shape_reference_codes',
+    'radius_shape_ls',
+    'shape_position_map',
+    'ngram_index',
+    'shape_clean_values',
+    'shape_columns',
+    'spatial_index',
+    'attribute_index',
+    'prefix_index',
+    'partition_index',
+    'data_version',
+    'cache_checksums',
+    'built_at',
+    'build_seconds',
+)
+
+_generations = count()
+
+
+class GeoDataset(object):
+    """
+    One loaded Geo DB.  Fields are not reassigned once built, `replace`
+    returns a copy with a new `generation`.  `add_entity` extends the
+    containers of the current dataset in place.
+    """
+    __slots__ = DATASET_FIELDS + ('generation',)
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(DATASET_FIELDS)
+        if unknown:
+            raise TypeError(f'Unknown GeoDataset fields={sorted(unknown)}')
+        for name in DATASET_FIELDS:
+            object.__setattr__(self, name, fields.get(name))
+        object.__setattr__(self, 'generation', next(_generations))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'GeoDataset is immutable, use `replace` to set {name}')
+
+    def replace(self, **fields) -> 'GeoDataset':
+        """Copy with `fields` replaced"""
+        return GeoDataset(**{**{name: getattr(self, name) for name in DATASET_FIELDS}, **fields})
+
+    def info(self) -> Dict:
+        """Version, build time and size"""
+        return {
+            'data_version': self.data_version,
+            'built_at': self.built_at.isoformat() if isinstance(self.built_at, datetime) else None,
+            'build_seconds': self.build_seconds,
+            'num_shapes': len(self.shape_reference_codes or ()),
+            'generation': self.generation,
+        }
+
+
+def dataset_property(name: str) -> property:
+    """Manager attribute reading `name` from the pinned or current dataset"""
+    def fget(self):
+        dataset = getattr(self._pinned_dataset, 'dataset', None)
+        return getattr(self._dataset if dataset is None else dataset, name)
+
+    def fset(self, value):
+        self._dataset = self._dataset.replace(**{name: value})
+
+    return property(fget, fset, doc=f'`{name}` of the current dataset')
+
+
+def pin_dataset(method):
+    """Run a manager method against the dataset current when it is called"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        pinned = self._pinned_dataset
+        if getattr(pinned, 'dataset', None) is not None:
+            return method(self, *args, **kwargs)
+        pinned.dataset = self._dataset
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            pinned.dataset = None
+    return wrapper
@@ -6,14 +6,7 @@ def ngrams(field, n=3):
     return [field[i:i+n] for i in range(len(field)-n+1)]
         
 
-def tversky_index(text1, text2, a=None, b=None, q=3, pad=True):
-    if text1 in {None, ''} or text2 in {None, ''}:
-        return 0
-    ngram1, ngram2 = set(ngrams(text1, q)), set(ngrams(text2, q))
-    agree_tot = len(ngram1.intersection(ngram2))
-    v1 = len(ngram1) - agree_tot
-    v2 = len(ngram2) - agree_tot
-
+def tversky_weights(a=None, b=None):
     if a != None and b != None:
         a = a/float(a+b)
         b = b/float(a+b)
@@ -24,6 +17,18 @@ def tversky_index(text1, text2, a=None, b=None, q=3, pad=True):
     else:
         a = 0.5
         b = 0.5
+    return a, b
+
+
+def tversky_index(text1, text2, a=None, b=None, q=3, pad=True):
+    if text1 in {None, ''} or text2 in {None, ''}:
+        return 0
+    ngram1, ngram2 = set(ngrams(text1, q)), set(ngrams(text2, q))
+    agree_tot = len(ngram1.intersection(ngram2))
+    v1 = len(ngram1) - agree_tot
+    v2 = len(ngram2) - agree_tot
+
+    a, b = tversky_weights(a, b)
     try:
         return float(agree_tot)/(agree_tot+a*v1+b*v2)
     except:
@@ -31,5 +36,20 @@ def tversky_index(text1, text2, a=None, b=None, q=3, pad=True):
         return 0
 
 
+def tversky_index_from_counts(agree_tot: int, num_ngrams1: int, num_ngrams2: int, a=None, b=None) -> float:
+    """
+    Tversky index from distinct n-gram counts, `agree_tot` shared n-grams out of
+    `num_ngrams1` and `num_ngrams2`, same value as `tversky_index` on the texts
+    """
+    v1 = num_ngrams1 - agree_tot
+    v2 = num_ngrams2 - agree_tot
+
+    a, b = tversky_weights(a, b)
+    denominator = agree_tot+a*v1+b*v2
+    if denominator == 0:
+        return 0
+    return float(agree_tot)/denominator
+
+
 def tversky_compare(val: str, options: List[str]) -> List[Tuple[str, float]]:
     return [(option, tversky_index(val, option, .5, .5)) for option in options]
\ No newline at end of file
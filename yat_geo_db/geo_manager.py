@@ -1,25 +1,50 @@
-from .fuzzy import ngrams, tversky_index
+from .attributes import ATTRIBUTE_INDEX_KEYS, AttributeIndex
+from .autocomplete import AutocompleteSession
+from .bulk import best_fuzzy_search_many
+from .cache import QueryCache, filters_cache_key
+from .columns import ShapeColumns, to_float
+from .dataset import DATASET_FIELDS, GeoDataset, dataset_property, pin_dataset
+from .fuzzy import ngrams, tversky_index, tversky_index_from_counts
+from .instrumentation import QueryStats, QueryTrace
+from .local_cache import CacheChecksumError, LocalCache
+from .memory import compare_memory_reports, dataset_memory_report
+from .ngram_index import NgramIndex, SearchDictView
+from .partitions import Partition, PartitionIndex
+from .prefix_index import PREFIX_KEY_LENGTH, PrefixIndex
 from .geometry import (
-    latitude_delta_from_miles, longitude_delta_from_miles, lat_lng_dist
+    latitude_delta_from_miles, longitude_delta_from_miles, lat_lng_dist,
+    lat_lng_dist_array
 )
-from .settings import BASE_STORE_URL
+from .settings import BASE_STORE_URL, GEO_SHAPE_FILE_NAME, SEARCH_FILE_NAME
+from .snapshot import Snapshot, default_shared_path, write_snapshot
+from .stream import (
+    STREAM_CHUNK_SIZE, inflate_chunks, iter_json_object_items, load_json_object
+)
+from .tables import ExtendedSequence, PositionMap, PositionSequence, StringTable
+from .spatial import SpatialIndex
 from .utils import get_key
 
 from jellyfish import damerau_levenshtein_distance
-
-from datetime import datetime
-from collections import Counter
-import gzip
+import numpy as np
+
+import asyncio
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from collections import ChainMap, Counter
+import heapq
 import logging
 from math import log
 import os
-import json
-from pathlib import Path
 import pytz
 import re
 import requests
-from statistics import mean
-from typing import Dict, List, Optional, Set, Union
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 
 logger = logging.getLogger(__name__)
@@ -58,35 +83,91 @@ def apply_shape_filters(value, filters):
     )
 
 
+def shape_distance_payload(distance: float,
+                           orig_is_aggregate: bool,
+                           orig_area: float,
+                           dest_is_aggregate: bool,
+                           dest_area: float) -> Dict:
+    """
+    Distance payload between two shapes, distances to aggregate areas are
+    normalized by the log of the aggregate's area
+    """
+    # Point to Point Distance
+    if not orig_is_aggregate and not dest_is_aggregate:
+        return {'distance': distance, 'normalized_distance': distance, 'aggregate': False}
+
+    # Aggregate Location distance, origin area takes precedence
+    area = orig_area if orig_is_aggregate else dest_area
+    if area < 10:
+        return {
+            'distance': distance,
+            'normalized_distance': distance,
+            'aggregate': True
+        }
+    return {
+        'distance': distance,
+        'normalized_distance': distance / log(max(area, 1)),
+        'aggregate': True
+    }
+
+
+def shape_distance_arrays(distance: np.ndarray,
+                          orig_is_aggregate: np.ndarray,
+                          orig_area: np.ndarray,
+                          dest_is_aggregate: np.ndarray,
+                          dest_area: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Vectorized `shape_distance_payload`, inputs are broadcast against each
+    other and the payload keys map to arrays
+    """
+    aggregate = np.logical_or(orig_is_aggregate, dest_is_aggregate)
+    area = np.where(orig_is_aggregate, orig_area, dest_area)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized_distance = np.where(
+            aggregate & ~(area < 10), distance / np.log(np.maximum(area, 1)), distance
+        )
+    return {
+        'distance': distance,
+        'normalized_distance': normalized_distance,
+        'aggregate': aggregate
+    }
+
+
 class ShapeManager(object):
     """
     Manager for Get actions
     """
+    @pin_dataset
     def get_shape_ref_code(self, shape_id: int) -> str:
         """Get Shape Reference Code from Shape ID"""
         return self.id_reference_code_map.get(shape_id)
     
+    @pin_dataset
     def get_shape_geo_type(self, shape_id: int) -> str:
         """Get Shape Reference Code from Shape ID"""
         shape = self.get_shape_by_id(shape_id=shape_id)
         return (shape or {}).get('geo_type')
 
+    @pin_dataset
     def get_shape_id_by_ref_code(self, reference_code: str) -> int:
         """Get Shape ID from Shape Reference Code"""
         shape = self.get_shape_by_ref_code(reference_code=reference_code)
         return (shape or {}).get('id')
 
+    @pin_dataset
     def get_shape_geo_type_by_ref_code(self, reference_code: str) -> int:
         """Get Shape Geo Type from Shape Reference Code"""
         shape = self.get_shape_by_ref_code(reference_code=reference_code)
         return (shape or {}).get('geo_type')
 
+    @pin_dataset
     def get_shape_by_ref_code(self, reference_code):
         """
         Helper function to get Shape Object from Shape Reference Code
         """
         return self.geo_shape_dict.get(reference_code)
 
+    @pin_dataset
     def get_shape_by_id(self, shape_id):
         """
         Helper function to get Shape Object from Shape ID
@@ -94,6 +175,86 @@ class ShapeManager(object):
         reference_code = self.get_shape_ref_code(shape_id)
         return self.get_shape_by_ref_code(reference_code=reference_code)
 
+    @pin_dataset
+    def shape_filter_mask(self,
+                          positions: np.ndarray,
+                          filters: Dict = None,
+                          indexed_only: bool = False) -> np.ndarray:
+        """
+        Mask of Shape positions matching `filters`, keys in the attribute index
+        are array lookups and the other keys (or Shapes the index does not
+        cover) are checked on the record with `apply_shape_filters`.  With
+        `indexed_only` the record checks are skipped, so the mask may keep
+        Shapes that do not match.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if filters is None:
+            return np.ones(len(positions), dtype=bool)
+        indexed, remaining = self.attribute_index.split_filters(filters)
+        mask = self.attribute_index.mask(positions, indexed)
+        if indexed_only:
+            return mask
+
+        covered = self.attribute_index.covered(positions)
+        for index in np.flatnonzero(mask & ~covered if remaining is None else mask).tolist():
+            position = positions[index]
+            record = self.geo_shape_dict.get(self.shape_reference_codes[position], {})
+            if not apply_shape_filters(value=record, filters=remaining if covered[index] else filters):
+                mask[index] = False
+        return mask
+
+    def cached_query(self, key: tuple, compute: Callable, trace: QueryTrace = None):
+        """Result of `compute`, through the query cache when it is enabled"""
+        if self.query_cache is None:
+            return compute()
+        if trace is not None:
+            trace.cache_hit = True
+            compute_miss = compute
+
+            def compute():
+                trace.cache_hit = False
+                return compute_miss()
+        return self.query_cache.get_or_compute((self.dataset.generation,) + key, compute)
+
+    def traced(self, operation: str, run: Callable, result_count: Optional[Callable] = len, **params):
+        """
+        Result of `run(trace)`, the finished trace is passed to the
+        instrumentation hook.  Only called with instrumentation enabled,
+        `result_count` maps the result to the `results` count.
+        """
+        hook = self.instrumentation
+        trace = QueryTrace(operation, params)
+        result = run(trace)
+        trace.finish(None if result_count is None else result_count(result))
+        try:
+            hook(trace)
+        except Exception as exc:
+            logger.warning(f'[GeoManager] Instrumentation hook failed on {operation}, {exc!r}')
+        return result
+
+    @pin_dataset
+    def get_partition(self, partition=None) -> Optional[Partition]:
+        """
+        Indexes of `partition`, an empty partition if it is not loaded, None
+        for queries over every loaded Shape (no partition or unpartitioned data)
+        """
+        if not self.partitioned or partition is None:
+            return None
+        return self.partition_index.lookup(partition)
+
+    @pin_dataset
+    def get_spatial_index(self, partition=None) -> SpatialIndex:
+        """Spatial index of `partition`, the full index without one"""
+        partition_obj = self.get_partition(partition)
+        return self.spatial_index if partition_obj is None else partition_obj.spatial_index
+
+    @pin_dataset
+    def get_ngram_index(self, partition=None) -> NgramIndex:
+        """N-gram index of `partition`, the full index without one"""
+        partition_obj = self.get_partition(partition)
+        return self.ngram_index if partition_obj is None else partition_obj.ngram_index
+
+    @pin_dataset
     def get_quote_location_by_id(self, shape_id):
         shape = self.get_shape_by_id(shape_id=shape_id) or {}
         ref_data = shape.get('ref_data') or {}
@@ -115,6 +276,7 @@ class ShapeManager(object):
                 'country_code': ref_data.get('country'),
             }
 
+    @pin_dataset
     def get_quote_location_by_reference_code(self, reference_code):
         shape = self.get_shape_by_ref_code(reference_code=reference_code)
         ref_data = shape.get('ref_data') or {}
@@ -125,6 +287,7 @@ class ShapeManager(object):
             'country_code': ref_data.get('country'),
         }
 
+    @pin_dataset
     def get_shape_display_by_id(self, shape_id: int, long_desc: bool = True, user_friendly: bool = False):
         """
         Helper function to get Shape Display from Shape ID
@@ -134,6 +297,7 @@ class ShapeManager(object):
             reference_code=reference_code, long_desc=long_desc, user_friendly=user_friendly
         )
 
+    @pin_dataset
     def get_shape_display_by_ref_code(self, reference_code, long_desc: bool = True, user_friendly: bool = False):
         """
         Helper function to get Shape Object from Shape Reference Code
@@ -148,6 +312,7 @@ class ShapeManager(object):
             return (shape_obj or {}).get('long_display', None)
         return (shape_obj or {}).get('short_display', None)
 
+    @pin_dataset
     def get_shape_time_by_ref_code(self, reference_code):
         """
         Get Current Time for Shape by Reference Code
@@ -157,6 +322,7 @@ class ShapeManager(object):
             return datetime.now()
         return datetime.now().astimezone(tz=pytz.timezone(shape_obj.get('primary_timezone')))
 
+    @pin_dataset
     def get_shape_time_by_id(self, shape_id):
         """
         Get Current Time for Shape by Shape ID
@@ -166,23 +332,96 @@ class ShapeManager(object):
 
 
 class RadiusSearchShape(object):
-    def __init__(self, shape_obj):
-        self.pk = shape_obj['id']
-        self.is_aggregate = shape_obj.get('is_aggregate', False)
-        self.latitude = float(shape_obj['latitude'])
-        self.longitude = float(shape_obj['longitude'])
-        self.area = shape_obj['area']
-        self.short_display = shape_obj['short_display']
-        self.reference_code = shape_obj['reference_code']
-        self.shape_extra = shape_obj
-
-        # Set Bounding Box for Aggregates
-        if self.is_aggregate:
-            for key, value in shape_obj['bbox'].items():
-                setattr(self, key, float(value or 0))
+    """
+    Radius Search view of the Shape at `position`, coordinates, bounding box,
+    aggregate flag and country/geo type codes are read from the shared
+    `ShapeColumns` arrays.  Views are built on access and hold no data of
+    their own, the Shape record is only read for `shape_extra`,
+    `short_display` and `reference_code`.
+    """
+    __slots__ = ('columns', 'position', 'record_at')
+
+    def __init__(self, columns: ShapeColumns, position: int, record_at: Callable[[int], Dict]):
+        self.columns = columns
+        self.position = position
+        self.record_at = record_at
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, RadiusSearchShape) and
+            self.columns is other.columns and self.position == other.position
+        )
+
+    def __hash__(self):
+        return hash((id(self.columns), self.position))
+
+    def __repr__(self):
+        return f'RadiusSearchShape(position={self.position}, pk={self.pk!r})'
+
+    @property
+    def pk(self):
+        return self.columns.pk.item(self.position)
+
+    @property
+    def is_aggregate(self) -> bool:
+        return self.columns.is_aggregate.item(self.position)
+
+    @property
+    def latitude(self) -> float:
+        return self.columns.latitude.item(self.position)
+
+    @property
+    def longitude(self) -> float:
+        return self.columns.longitude.item(self.position)
+
+    @property
+    def area(self) -> float:
+        return self.columns.area.item(self.position)
+
+    @property
+    def ll_latitude(self) -> float:
+        return self.columns.ll_latitude.item(self.position)
+
+    @property
+    def ll_longitude(self) -> float:
+        return self.columns.ll_longitude.item(self.position)
+
+    @property
+    def ur_latitude(self) -> float:
+        return self.columns.ur_latitude.item(self.position)
+
+    @property
+    def ur_longitude(self) -> float:
+        return self.columns.ur_longitude.item(self.position)
+
+    @property
+    def country(self) -> Optional[str]:
+        return self.columns.country_values[self.columns.country.item(self.position)]
+
+    @property
+    def geo_type(self) -> Optional[str]:
+        return self.columns.geo_type_values[self.columns.geo_type.item(self.position)]
+
+    @property
+    def shape_extra(self) -> Dict:
+        return self.record_at(self.position)
+
+    @property
+    def short_display(self) -> str:
+        return self.shape_extra['short_display']
+
+    @property
+    def reference_code(self) -> str:
+        return self.shape_extra['reference_code']
+
+    def country_match(self, country_filter: str = None) -> bool:
+        return (
+            country_filter is None or
+            self.columns.country.item(self.position) == self.columns.country_code(country_filter)
+        )
 
     def radius_match(self, latitude, longitude, lat_delta, lng_delta, country_filter: str = None):
-        if self.is_aggregate:
+        if self.columns.is_aggregate.item(self.position):
             return self.radius_check_contains(latitude, longitude, lat_delta, lng_delta, country_filter)
         else:
             return self.radius_check_dist(latitude, longitude, lat_delta, lng_delta, country_filter)
@@ -190,33 +429,27 @@ class RadiusSearchShape(object):
     def radius_check_dist(self, latitude, longitude, lat_delta, lng_delta, country_filter: str = None):
         # This is approximate distance.  It performs well for small radii, but will not be accurate for larger radii.
         # We can use lat_lng_dist instead - more computation, but is more accurate.
-        if country_filter is not None:
-            if country_filter != self.shape_extra.get('ref_data', {}).get('country') != country_filter:
-                return False
+        if not self.country_match(country_filter):
+            return False
 
         return (((((latitude - self.latitude) / lat_delta)**2) +
                  (((longitude - self.longitude) / lng_delta)**2))
                 < 1)
 
     def radius_check_contains(self, latitude, longitude, lat_delta, lng_delta, country_filter: str = None):
-        try:
-            if country_filter is not None:
-                if country_filter != self.shape_extra.get('ref_data', {}).get('country') != country_filter:
-                    return False
-
-            return (
-                (self.ur_latitude >= latitude >= self.ll_latitude) &
-                (self.ur_longitude >= longitude >= self.ll_longitude)
-            )
-        except Exception:
-            logger.error(
-                f"Error with Radius check: shape_id={self.pk}", exc_info=True
-            )
+        if not self.country_match(country_filter):
             return False
 
+        # Missing bounding box values are NaN and never match
+        return (
+            (self.ur_latitude >= latitude >= self.ll_latitude) and
+            (self.ur_longitude >= longitude >= self.ll_longitude)
+        )
+
 
 class RadiusSearchManager(object):
 
+    @pin_dataset
     def get_radius_shape_by_ref_code(self, reference_code):
         """
         Helper function specific to Radius Search to get Radius Shape Object via Reference Code
@@ -225,6 +458,7 @@ class RadiusSearchManager(object):
         """
         return self.radius_search_map.get(reference_code)
 
+    @pin_dataset
     def get_radius_shape_by_id(self, shape_id):
         """
         Helper function specific to Radius Search to get Radius Shape Object via Shape ID
@@ -234,12 +468,23 @@ class RadiusSearchManager(object):
         reference_code = self.get_shape_ref_code(shape_id)
         return self.radius_search_map.get(reference_code)
 
+    @pin_dataset
+    def get_radius_shapes_by_position(self, positions) -> List[RadiusSearchShape]:
+        """
+        Radius Shape Objects by position in `radius_search_map`, positions are
+        returned by the spatial index and follow the map's insertion order
+        """
+        radius_shape_ls = self.radius_shape_ls
+        return [radius_shape_ls[position] for position in positions]
+
+    @pin_dataset
     def radius_search(self,
                       reference_code,
                       radius,
                       country_exact: bool = False,
                       full_results: bool = False, 
-                      filters: Dict = None) -> List[Union[int, Dict]]:
+                      filters: Dict = None,
+                      partition: str = None) -> List[Union[int, Dict]]:
         """
         Perform Radius Search by Reference Code
         
@@ -255,6 +500,8 @@ class RadiusSearchManager(object):
             full_results bool
                 Full results, default False to return simply list of Shape IDs 
                 or list of Shape Objects
+            partition str optional
+                Partition to search, only its Shapes are looked up
         
         Returns 
         -----------
@@ -262,6 +509,25 @@ class RadiusSearchManager(object):
                 Results returned are either a list of Shape IDs or List of Shape 
                 Objects 
         """
+        if self.instrumentation is not None:
+            return self.traced(
+                'radius_search',
+                lambda trace: self._radius_search(
+                    reference_code, radius, country_exact, full_results, filters, partition, trace=trace
+                ),
+                reference_code=reference_code, radius=radius, country_exact=country_exact,
+                full_results=full_results, filters=filters, partition=partition
+            )
+        return self._radius_search(reference_code, radius, country_exact, full_results, filters, partition)
+
+    def _radius_search(self,
+                       reference_code,
+                       radius,
+                       country_exact: bool = False,
+                       full_results: bool = False,
+                       filters: Dict = None,
+                       partition: str = None,
+                       trace: QueryTrace = None) -> List[Union[int, Dict]]:
         shape_obj = self.get_shape_by_ref_code(reference_code=reference_code)
         if shape_obj is None:
             return []
@@ -269,17 +535,22 @@ class RadiusSearchManager(object):
         country_filter = None
         if country_exact:
             country_filter = shape_obj.get('ref_data', {}).get('country')
+        if trace is not None:
+            trace.mark('origin')
 
-        return self.radius_search_lat_lng(
+        return self._cached_radius_search_lat_lng(
             latitude=shape_obj['latitude'],
             longitude=shape_obj['longitude'],
             radius=radius,
             reference_code=reference_code,
             country_filter=country_filter,
             full_results=full_results,
-            filters=filters
+            filters=filters,
+            partition=partition,
+            trace=trace
         )
 
+    @pin_dataset
     def radius_search_lat_lng(self,
                               latitude: float,
                               longitude: float,
@@ -287,144 +558,454 @@ class RadiusSearchManager(object):
                               reference_code: str = None,
                               country_filter: str = None,
                               full_results: bool = False,
-                              filters: Dict = None) -> List[Union[int, Dict]]:
+                              filters: Dict = None,
+                              partition: str = None) -> List[Union[int, Dict]]:
+        return self._cached_radius_search_lat_lng(
+            latitude, longitude, radius, reference_code, country_filter, full_results, filters, partition
+        )
+
+    def _cached_radius_search_lat_lng(self,
+                                      latitude: float,
+                                      longitude: float,
+                                      radius,
+                                      reference_code: str = None,
+                                      country_filter: str = None,
+                                      full_results: bool = False,
+                                      filters: Dict = None,
+                                      partition: str = None,
+                                      trace: QueryTrace = None) -> List[Union[int, Dict]]:
+        return self.cached_query(
+            (
+                'radius_search_lat_lng', latitude, longitude, radius, reference_code,
+                country_filter, full_results, filters_cache_key(filters), partition
+            ),
+            lambda: self._radius_search_lat_lng(
+                latitude, longitude, radius, reference_code, country_filter, full_results, filters, partition,
+                trace=trace
+            ),
+            trace=trace
+        )
+
+    def _radius_search_lat_lng(self,
+                               latitude: float,
+                               longitude: float,
+                               radius,
+                               reference_code: str = None,
+                               country_filter: str = None,
+                               full_results: bool = False,
+                               filters: Dict = None,
+                               partition: str = None,
+                               trace: QueryTrace = None) -> List[Union[int, Dict]]:
         shape_id_ls = self.get_radius_lat_lng_shape_ids(
             latitude=latitude,
             longitude=longitude,
             radius=radius,
             country_filter=country_filter,
-            filters=filters
+            filters=filters,
+            partition=partition,
+            trace=trace
         )
 
         # Return full results if parameter specified
         if full_results:
-            shape_obj_ls = [
-                self.get_shape_by_id(shape_id) for shape_id in shape_id_ls
-            ]
-
-            # Add Distance
-            for shape_obj in shape_obj_ls:
-                if reference_code:
-                    shape_obj.update({
-                        "distance": self.get_shape_pair_distance(reference_code, shape_obj["reference_code"])
-                    })
-                else:
-                    raw_distance = round(lat_lng_dist(
-                        lat_lng_1=(latitude, longitude),
-                        lat_lng_2=(shape_obj["latitude"], shape_obj["longitude"]),
-                    ), 4)
-                    distance = {
-                        "distance": raw_distance,
-                        "normalized_distance": raw_distance,
-                        "aggregate": True
-                    }
-                    shape_obj.update({"distance": distance})
-
+            shape_obj_ls = self.get_radius_full_results(
+                shape_id_ls=shape_id_ls,
+                latitude=latitude,
+                longitude=longitude,
+                reference_code=reference_code
+            )
+            if trace is not None:
+                trace.mark('full_results')
             return shape_obj_ls
 
         return shape_id_ls
 
+    @pin_dataset
+    def get_radius_full_results(self,
+                                shape_id_ls: List[int],
+                                latitude: float,
+                                longitude: float,
+                                reference_code: str = None) -> List[Dict]:
+        """
+        Shape Objects for Radius Search results with distance to the origin,
+        copies so the stored Shapes are left unchanged
+        """
+        shape_obj_ls = []
+        for shape_id in shape_id_ls:
+            shape_obj = self.get_shape_by_id(shape_id)
+            if reference_code:
+                distance = self.get_shape_pair_distance(reference_code, shape_obj["reference_code"])
+            else:
+                raw_distance = round(lat_lng_dist(
+                    lat_lng_1=(latitude, longitude),
+                    lat_lng_2=(shape_obj["latitude"], shape_obj["longitude"]),
+                ), 4)
+                distance = {
+                    "distance": raw_distance,
+                    "normalized_distance": raw_distance,
+                    "aggregate": True
+                }
+            shape_obj_ls.append(dict(shape_obj, distance=distance))
+
+        return shape_obj_ls
+
+    @pin_dataset
+    def radius_search_many(self,
+                           reference_codes: List[str],
+                           radius,
+                           country_exact: bool = False,
+                           full_results: bool = False,
+                           filters: Dict = None,
+                           partition: str = None) -> List[List[Union[int, Dict]]]:
+        """
+        Perform Radius Search for many Reference Codes in one call, origins in
+        the same spatial cell share candidate lookups and filter evaluation
+
+        Parameters
+        -----------
+            reference_codes List[str]
+                Geo Reference Codes, example `["us__tn__nashville", "us__60606"]`
+            radius int
+                Radius around each reference code in miles to return results
+            country_exact bool
+                Country exact, default False to return only Geo Shapes within the
+                same country as each requested reference code
+            full_results bool
+                Full results, default False to return simply list of Shape IDs
+                or list of Shape Objects
+            filters Dict
+                Filters applied to every result, same as `radius_search`
+            partition str optional
+                Partition to search, same as `radius_search`
+
+        Returns
+        -----------
+            results List[List[Union[int, Dict]]]
+                One result list per reference code in input order, each the same
+                as `radius_search` would return
+        """
+        shape_obj_ls = [
+            self.get_shape_by_ref_code(reference_code=reference_code)
+            for reference_code in reference_codes
+        ]
+        found = [index for index, shape_obj in enumerate(shape_obj_ls) if shape_obj is not None]
+
+        found_results = self.radius_search_lat_lng_many(
+            latitudes=[shape_obj_ls[index]['latitude'] for index in found],
+            longitudes=[shape_obj_ls[index]['longitude'] for index in found],
+            radius=radius,
+            reference_codes=[reference_codes[index] for index in found],
+            country_filters=[
+                shape_obj_ls[index].get('ref_data', {}).get('country') if country_exact else None
+                for index in found
+            ],
+            full_results=full_results,
+            filters=filters,
+            partition=partition
+        )
+
+        results = [[] for _ in shape_obj_ls]
+        for index, result in zip(found, found_results):
+            results[index] = result
+        return results
+
+    @pin_dataset
+    def radius_search_lat_lng_many(self,
+                                   latitudes: List[float],
+                                   longitudes: List[float],
+                                   radius,
+                                   reference_codes: List[str] = None,
+                                   country_filters: List[str] = None,
+                                   full_results: bool = False,
+                                   filters: Dict = None,
+                                   partition: str = None) -> List[List[Union[int, Dict]]]:
+        """
+        Batch version of `radius_search_lat_lng`, one result list per origin
+        """
+        shape_id_lss = self.get_radius_lat_lng_shape_ids_many(
+            latitudes=latitudes,
+            longitudes=longitudes,
+            radius=radius,
+            country_filters=country_filters,
+            filters=filters,
+            partition=partition
+        )
+
+        # Return full results if parameter specified
+        if full_results:
+            if reference_codes is None:
+                reference_codes = [None] * len(shape_id_lss)
+            return [
+                self.get_radius_full_results(
+                    shape_id_ls=shape_id_ls,
+                    latitude=latitude,
+                    longitude=longitude,
+                    reference_code=reference_code
+                )
+                for shape_id_ls, latitude, longitude, reference_code in zip(
+                    shape_id_lss, latitudes, longitudes, reference_codes
+                )
+            ]
+
+        return shape_id_lss
+
+    @pin_dataset
     def get_radius_lat_lng_shape_ids(self,
                                      latitude,
                                      longitude,
                                      radius,
                                      country_filter: str = None,
-                                     filters: Dict = None):
+                                     filters: Dict = None,
+                                     partition: str = None,
+                                     trace: QueryTrace = None):
         lng_delta = longitude_delta_from_miles(lat=latitude, miles=radius)
         lat_delta = latitude_delta_from_miles(miles=radius)
-        res = [
-            radius_shape.pk for radius_shape in self.radius_search_map.values()
-            if radius_shape.radius_match(
-                latitude=latitude,
-                longitude=longitude,
-                lat_delta=lat_delta,
-                lng_delta=lng_delta,
-                country_filter=country_filter
-            )
-            and apply_shape_filters(
-                value=radius_shape.shape_extra, filters=filters
-            )
-        ]
-        return res
+        positions = self.get_spatial_index(partition).candidates(
+            latitude=latitude, longitude=longitude, lat_delta=lat_delta, lng_delta=lng_delta
+        )
+        if trace is not None:
+            trace.count('candidates', len(positions))
+            trace.mark('spatial')
+        positions = positions[self.shape_columns.radius_mask(
+            positions,
+            latitude=latitude,
+            longitude=longitude,
+            lat_delta=lat_delta,
+            lng_delta=lng_delta,
+            country_filter=country_filter
+        )]
+        if trace is not None:
+            trace.count('radius_matches', len(positions))
+            trace.mark('radius_mask')
+        if filters is not None:
+            positions = positions[self.shape_filter_mask(positions, filters)]
+            if trace is not None:
+                trace.count('filtered_candidates', len(positions))
+                trace.mark('filter')
+        return self.shape_columns.pk[positions].tolist()
+
+    @pin_dataset
+    def get_radius_lat_lng_shape_ids_many(self,
+                                          latitudes: List[float],
+                                          longitudes: List[float],
+                                          radius,
+                                          country_filters: List[str] = None,
+                                          filters: Dict = None,
+                                          partition: str = None) -> List[List[int]]:
+        """
+        Batch version of `get_radius_lat_lng_shape_ids`, origins are grouped by
+        spatial cell so each group does one candidate lookup and one filter pass
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if country_filters is None:
+            country_filters = [None] * len(latitudes)
+        lat_delta = latitude_delta_from_miles(miles=radius)
+        lng_deltas = longitude_delta_from_miles(lat=latitudes, miles=radius)
+
+        results = [[] for _ in range(len(latitudes))]
+        for group, positions in self.get_spatial_index(partition).group_candidates(
+            latitudes=latitudes, longitudes=longitudes, lat_delta=lat_delta, lng_deltas=lng_deltas
+        ):
+            if filters is not None:
+                positions = positions[self.shape_filter_mask(positions, filters)]
+            for index in group:
+                mask = self.shape_columns.radius_mask(
+                    positions,
+                    latitude=latitudes[index],
+                    longitude=longitudes[index],
+                    lat_delta=lat_delta,
+                    lng_delta=lng_deltas[index],
+                    country_filter=country_filters[index]
+                )
+                results[index] = self.shape_columns.pk[positions[mask]].tolist()
+        return results
 
-    def radius_lat_lng_search(self, latitude, longitude, radius, filters: Dict = None):
+    @pin_dataset
+    def radius_lat_lng_search(self, latitude, longitude, radius, filters: Dict = None, partition: str = None):
         lng_delta = longitude_delta_from_miles(lat=latitude, miles=radius)
         lat_delta = latitude_delta_from_miles(miles=radius)
-        res = [
-            radius_shape for radius_shape in self.radius_search_map.values()
-            if radius_shape.radius_match(
-                latitude=latitude,
-                longitude=longitude,
-                lat_delta=lat_delta,
-                lng_delta=lng_delta
-            )
-            and not radius_shape.is_aggregate
-            and apply_shape_filters(
-                value=radius_shape.shape_extra, filters=filters
+        positions = np.sort(self.get_spatial_index(partition).point_candidates(
+            latitude=latitude, longitude=longitude, lat_delta=lat_delta, lng_delta=lng_delta
+        ))
+        positions = positions[self.shape_columns.radius_mask(
+            positions,
+            latitude=latitude,
+            longitude=longitude,
+            lat_delta=lat_delta,
+            lng_delta=lng_delta
+        )]
+        if filters is not None:
+            positions = positions[self.shape_filter_mask(positions, filters)]
+        return self.get_radius_shapes_by_position(positions)
+
+    @pin_dataset
+    def nearest(self,
+                latitude: float,
+                longitude: float,
+                k: int = 1,
+                filters: Dict = None,
+                partition: str = None) -> List[Dict]:
+        """
+        Nearest Shapes to a latitude/longitude, reverse geocode style search
+        backed by the spatial index rather than growing radius searches
+
+        Parameters
+        -----------
+            latitude float
+                Origin latitude
+            longitude float
+                Origin longitude
+            k int
+                Number of Shapes to return, default 1
+            filters Dict
+                Filters applied to candidate Shapes, example `{"geo_type": "City"}`
+            partition str optional
+                Partition to search, only its Shapes are candidates
+
+        Returns
+        -----------
+            results List[Dict]
+                Up to `k` Shape Objects ordered by `lat_lng_dist` to the origin,
+                each with a `distance` payload as `get_shape_pair_distance`
+                produces for a point origin
+        """
+        keep = None
+        if filters is not None:
+            def keep(positions):
+                return self.shape_filter_mask(positions, filters)
+
+        positions, distances = self.get_spatial_index(partition).nearest(
+            latitude=latitude, longitude=longitude, k=k, keep=keep
+        )
+        return [
+            dict(
+                self.geo_shape_dict[self.shape_reference_codes[position]],
+                distance=shape_distance_payload(
+                    distance=round(float(distance), 4),
+                    orig_is_aggregate=False,
+                    orig_area=0.0,
+                    dest_is_aggregate=bool(self.shape_columns.is_aggregate[position]),
+                    dest_area=float(self.shape_columns.area[position])
+                )
             )
+            for position, distance in zip(positions, distances)
         ]
-        return res
 
+    @pin_dataset
     def get_shape_pair_distance(self, orig_shape_ref, dest_shape_ref) -> Dict:
         """
         Get the distance between two Radius Shape object via `reference_code`
         """
-        orig_shape = self.get_radius_shape_by_ref_code(reference_code=orig_shape_ref)
-        dest_shape = self.get_radius_shape_by_ref_code(reference_code=dest_shape_ref)
-        if orig_shape is None or dest_shape is None:
+        columns = self.shape_columns
+        orig_position = self.shape_position_map.get(orig_shape_ref)
+        dest_position = self.shape_position_map.get(dest_shape_ref)
+        # Entities added after loading have no Radius Shape
+        if (
+            orig_position is None or dest_position is None or
+            orig_position >= len(columns) or dest_position >= len(columns)
+        ):
             logger.warning(
                 f"[RadiusSearchManager] Unable to find orig/dest shape ref=`{orig_shape_ref}/{dest_shape_ref}"
             )
             return {'distance': 999, 'normalized_distance': 999, 'aggregate': False}
 
         distance = round(lat_lng_dist(
-                lat_lng_1 = (orig_shape.latitude, orig_shape.longitude),
-                lat_lng_2 = (dest_shape.latitude, dest_shape.longitude),
+                lat_lng_1 = (columns.latitude.item(orig_position), columns.longitude.item(orig_position)),
+                lat_lng_2 = (columns.latitude.item(dest_position), columns.longitude.item(dest_position)),
             ), 4)
+        return shape_distance_payload(
+            distance=distance,
+            orig_is_aggregate=columns.is_aggregate.item(orig_position),
+            orig_area=columns.area.item(orig_position),
+            dest_is_aggregate=columns.is_aggregate.item(dest_position),
+            dest_area=columns.area.item(dest_position)
+        )
 
-        # Point to Point Distance
-        if not orig_shape.is_aggregate and not dest_shape.is_aggregate:
-            return {'distance': distance, 'normalized_distance': distance, 'aggregate': False}
-
-        # Aggregate Location distance
-        if orig_shape.is_aggregate:
-            if orig_shape.area < 10:
-                return {
-                    'distance': distance,
-                    'normalized_distance': distance,
-                    'aggregate': True
-                }
-            return {
-                'distance': distance,
-                'normalized_distance': distance / log(max(orig_shape.area, 1)),
-                'aggregate': True
-            }
-        elif dest_shape.is_aggregate:
-            if dest_shape.area < 10:
-                return {
-                    'distance': distance,
-                    'normalized_distance': distance,
-                    'aggregate': True
-                }
-            return {
-                'distance': distance,
-                'normalized_distance': distance / log(max(dest_shape.area, 1)),
-                'aggregate': True
-            }
-        else:
-            # Both Areas Aggregates
-            if orig_shape.area < 10 or dest_shape.area < 10:
-                return {
-                    'distance': distance,
-                    'normalized_distance': distance,
-                    'aggregate': True
-                }
-            return {
-                'distance': distance,
-                'normalized_distance': distance / log(max(mean(orig_shape.area, dest_shape.area), 1)),
-                'aggregate': True
-            }
+    @pin_dataset
+    def get_shape_positions(self, reference_codes: List[str]) -> np.ndarray:
+        """Shape positions for Reference Codes, -1 where not found"""
+        return np.array([
+            self.shape_position_map.get(reference_code, -1) for reference_code in reference_codes
+        ], dtype=np.int64)
+
+    def _shape_distance_arrays(self, orig_positions: np.ndarray, dest_positions: np.ndarray) -> Dict[str, np.ndarray]:
+        columns = self.shape_columns
+        distance = np.round(lat_lng_dist_array(
+            columns.latitude[orig_positions], columns.longitude[orig_positions],
+            columns.latitude[dest_positions], columns.longitude[dest_positions],
+        ), 4)
+        result = shape_distance_arrays(
+            distance=distance,
+            orig_is_aggregate=columns.is_aggregate[orig_positions],
+            orig_area=columns.area[orig_positions],
+            dest_is_aggregate=columns.is_aggregate[dest_positions],
+            dest_area=columns.area[dest_positions]
+        )
+
+        # Unknown Shapes, same default as `get_shape_pair_distance`
+        missing = (orig_positions < 0) | (dest_positions < 0)
+        if missing.any():
+            logger.warning(
+                f"[RadiusSearchManager] Unable to find {missing.sum()} orig/dest shape pairs"
+            )
+            result['distance'] = np.where(missing, 999, result['distance'])
+            result['normalized_distance'] = np.where(missing, 999, result['normalized_distance'])
+            result['aggregate'] = np.where(missing, False, result['aggregate'])
+        return result
+
+    @pin_dataset
+    def distance_matrix(self, orig_refs: List[str], dest_refs: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Distances between every origin and every destination via `reference_code`
+        in one vectorized pass, the array version of `get_shape_pair_distance`
+
+        Parameters
+        -----------
+            orig_refs List[str]
+                Origin Geo Reference Codes
+            dest_refs List[str]
+                Destination Geo Reference Codes
+
+        Returns
+        -----------
+            result Dict[str, numpy.ndarray]
+                `distance`, `normalized_distance` and `aggregate` arrays of shape
+                `(len(orig_refs), len(dest_refs))`
+        """
+        orig_positions = self.get_shape_positions(orig_refs)[:, np.newaxis]
+        dest_positions = self.get_shape_positions(dest_refs)[np.newaxis, :]
+        orig_positions, dest_positions = np.broadcast_arrays(orig_positions, dest_positions)
+        return self._shape_distance_arrays(orig_positions, dest_positions)
+
+    @pin_dataset
+    def distances(self, orig_refs: List[str], dest_refs: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Distances between paired origins and destinations via `reference_code`
+        in one vectorized pass, the array version of `get_shape_pair_distance`
+
+        Parameters
+        -----------
+            orig_refs List[str]
+                Origin Geo Reference Codes
+            dest_refs List[str]
+                Destination Geo Reference Codes, same length as `orig_refs`
+
+        Returns
+        -----------
+            result Dict[str, numpy.ndarray]
+                `distance`, `normalized_distance` and `aggregate` arrays, one
+                element per pair
+        """
+        if len(orig_refs) != len(dest_refs):
+            raise ValueError(
+                f"orig_refs and dest_refs lengths differ ({len(orig_refs)} != {len(dest_refs)})"
+            )
+        return self._shape_distance_arrays(
+            self.get_shape_positions(orig_refs), self.get_shape_positions(dest_refs)
+        )
 
+    @pin_dataset
     def get_shape_pair_distance_id(self, shape_ref, shape_id):
         """
         Wrapper function for `get_shape_pair_distance` where `id` over `reference_code`s
@@ -448,9 +1029,11 @@ class NgramSearchManager(object):
         else:
             return re.sub('[^0-9a-zA-Z ]+', '', val)
 
+    @pin_dataset
     def add_entity(self, entity, entity_id, partition=None, extra_entity=None):
         """
-        Add Shape Entity to the Fuzzy Search Index
+        Add Shape Entity to the Fuzzy Search Index, with partitioned data it
+        goes to `partition` or the partition of its `partition_key` value
         """
         entity = self.clean_entity(entity)
         entity_ngram_ls = ngrams(entity, 3)
@@ -461,19 +1044,29 @@ class NgramSearchManager(object):
             entity.update(extra_entity)
 
         if self.partitioned:
-            self.geo_shape_dict[partition].update({entity_id : entity})
+            if partition is None:
+                partition = get_key(entity, self.partition_key)
+            if self.partitions is not None and partition not in self.partitions:
+                raise ValueError(f'Partition={partition} is not loaded, partitions={sorted(self.partitions, key=str)}')
+
+        self.geo_shape_dict.update({entity_id : entity})
+
+        # Dense position for the entity, new entities are appended
+        position = self.shape_position_map.get(entity_id)
+        if position is None:
+            position = len(self.shape_reference_codes)
+            self.shape_reference_codes.append(entity_id)
+            self.shape_clean_values.append(entity['clean_value'].lower())
+            self.shape_position_map[entity_id] = position
         else:
-            self.geo_shape_dict.update({entity_id : entity})
+            self.shape_clean_values[position] = entity['clean_value'].lower()
+            self.attribute_index.stale.add(position)
 
-        for ngram in entity_ngram_ls:
-            if self.partitioned:
-                ngram_obs = self.search_dict[partition].get(ngram, []).copy()
-                ngram_obs.append(entity_id)
-                self.search_dict[partition].update({ngram : ngram_obs})
-            else:
-                ngram_obs = self.search_dict.get(ngram, []).copy()
-                ngram_obs.append(entity_id)
-                self.search_dict.update({ngram : ngram_obs})
+        self.ngram_index.add_shape(position, entity_ngram_ls)
+        if self.partitioned:
+            self.partition_index.add_shape(partition, position, entity_ngram_ls)
+        self.prefix_index.add(position, entity['clean_value'].lower(), to_float(entity.get('population') or 0))
+        self.clear_query_cache()
 
     def _ngram_similarity(self, search_ngram_ls, source_str):
         source_ngram_ls = ngrams(source_str, 3)
@@ -488,6 +1081,27 @@ class NgramSearchManager(object):
         fuzzy_score += (source_str.startswith(search_str) * (fuzzy_score * 0.15))
         return fuzzy_score
 
+    def entity_fuzzy_score_from_counts(self,
+                                       search_str: str,
+                                       source_str: str,
+                                       num_search_ngrams: int,
+                                       num_source_ngrams: int,
+                                       num_shared_ngrams: int) -> float:
+        """
+        `entity_fuzzy_score` with the Tversky index from distinct n-gram counts
+        rather than n-gram sets of both strings
+        """
+        fuzzy_score = tversky_index_from_counts(num_shared_ngrams, num_search_ngrams, num_source_ngrams, .85, .15)
+
+        # Add to Fuzzy Score if starts with same substring
+        fuzzy_score += (source_str.startswith(search_str) * (fuzzy_score * 0.15))
+        return fuzzy_score
+
+    def geo_population_score(self, fuzzy_score: float, population: int) -> float:
+        if population <= 0 or fuzzy_score <= 0.65:
+            return fuzzy_score * .9
+        return (fuzzy_score * .9) + (log(population) * .1)
+
     def geo_search_score(self, search_str: str, source_str: str, population: int) -> float:
         # Postal Code
         if search_str.isnumeric():
@@ -495,11 +1109,67 @@ class NgramSearchManager(object):
             fuzzy_score = self.entity_fuzzy_score(search_str, source_str.split(' ')[0])
         else:
             fuzzy_score = self.entity_fuzzy_score(search_str, source_str)
+        return self.geo_population_score(fuzzy_score, population)
+
+    @pin_dataset
+    def candidate_fuzzy_scores(self,
+                               search_entity: str,
+                               search_ngram_ls: List[str],
+                               positions: np.ndarray,
+                               hits: np.ndarray,
+                               populations: List[int]) -> List[tuple]:
+        """
+        `(ngram_similarity, score)` of candidate shape positions, from the
+        distinct n-gram hits of the posting lists and per shape n-gram counts.
+        Numeric searches (postal codes) score against the base string and
+        shapes without a known n-gram count fall back to string scoring.
+        """
+        num_search_ngrams = len(set(search_ngram_ls))
+        source_ngram_counts = self.ngram_index.ngram_counts_at(positions)
+        string_scoring = search_entity.isnumeric()
+        scores = []
+        for position, num_shared_ngrams, num_source_ngrams, population in zip(
+                positions.tolist(), hits.tolist(), source_ngram_counts.tolist(), populations):
+            clean_value = self.shape_clean_values[position]
+            if string_scoring or num_source_ngrams < 0:
+                scores.append((
+                    self.entity_fuzzy_score(search_entity, clean_value),
+                    self.geo_search_score(search_entity, clean_value, population)
+                ))
+                continue
+            fuzzy_score = self.entity_fuzzy_score_from_counts(
+                search_entity, clean_value, num_search_ngrams, num_source_ngrams, num_shared_ngrams
+            )
+            scores.append((fuzzy_score, self.geo_population_score(fuzzy_score, population)))
+        return scores
 
-        if population <= 0 or fuzzy_score <= 0.65:
-            return fuzzy_score * .9
-        return (fuzzy_score * .9) + (log(population) * .1)
+    def start_autocomplete(self,
+                           num_results: int = 50,
+                           filters: Dict = None,
+                           partition: str = None) -> AutocompleteSession:
+        """
+        Start a type-ahead session, each `session.extend(text)` returns the
+        `fuzzy_search` results for the text typed so far and only merges the
+        posting lists of new n-grams
+
+        Parameters
+        -----------
+            num_results int
+                Number of results per keystroke, default 50
+            filters Dict
+                Filters applied to results, as for `fuzzy_search`
+            partition str optional
+                Partition to search, as for `fuzzy_search`
+
+        Returns
+        -----------
+            session AutocompleteSession
+                Session with `extend(text)` to append typed text and
+                `update(text)` to set the whole text (edits start over)
+        """
+        return AutocompleteSession(self, num_results=num_results, filters=filters, partition=partition)
 
+    @pin_dataset
     def best_fuzzy_search(self,
                           search_entity: str,
                           partition: str = None,
@@ -509,9 +1179,24 @@ class NgramSearchManager(object):
         Wrapper around fuzzy_search to fetch the best result above a predefined
         threshold.  Intended to be a Best Result Search
         """
-        res_ls = self.fuzzy_search(
+        if self.instrumentation is not None:
+            return self.traced(
+                'best_fuzzy_search',
+                lambda trace: self._best_fuzzy_search(search_entity, partition, score_threshold, filters, trace=trace),
+                result_count=lambda res: int(res is not None),
+                search_entity=search_entity, partition=partition, score_threshold=score_threshold, filters=filters
+            )
+        return self._best_fuzzy_search(search_entity, partition, score_threshold, filters)
+
+    def _best_fuzzy_search(self,
+                           search_entity: str,
+                           partition: str = None,
+                           score_threshold: float = .90,
+                           filters: Dict = None,
+                           trace: QueryTrace = None) -> Optional[Dict]:
+        res_ls = self._cached_fuzzy_search(
             search_entity=search_entity, partition=partition, num_results=1,
-            filters=filters
+            filters=filters, trace=trace
         )
 
         # Return Best Result if above threshold
@@ -522,6 +1207,51 @@ class NgramSearchManager(object):
             return res
         return None
 
+    def best_fuzzy_search_many(self,
+                               search_entities: Iterable[str],
+                               partition: str = None,
+                               score_threshold: float = .90,
+                               filters: Dict = None,
+                               workers: int = None,
+                               chunk_size: int = 256,
+                               start_method: str = None,
+                               dedup_size: int = 10000) -> Iterator[Optional[Dict]]:
+        """
+        Bulk `best_fuzzy_search`, a generator of results in input order.
+        Unique searches are spread over a process pool, workers inherit the
+        loaded indexes on fork or memory-map a temporary snapshot otherwise.
+
+        Parameters
+        -----------
+            search_entities Iterable[str]
+                Search strings, read lazily in batches
+            partition str optional
+                Partition, as for `best_fuzzy_search`
+            score_threshold float
+                Minimum score of a result, default .90
+            filters Dict
+                Filters applied to results, as for `fuzzy_search`
+            workers int optional
+                Worker processes, default `os.cpu_count()`, 1 searches in process
+            chunk_size int
+                Searches per worker task, default 256
+            start_method str optional
+                Multiprocessing start method, default `fork` where available
+            dedup_size int
+                Results of earlier batches kept for duplicate entities, default 10000
+
+        Returns
+        -----------
+            results Iterator[Optional[Dict]]
+                Best result or None for every search entity
+        """
+        return best_fuzzy_search_many(
+            self, search_entities, partition=partition, score_threshold=score_threshold,
+            filters=filters, workers=workers, chunk_size=chunk_size, start_method=start_method,
+            dedup_size=dedup_size
+        )
+
+    @pin_dataset
     def fuzzy_search(self,
                      search_entity: str,
                      partition: str = None,
@@ -538,120 +1268,271 @@ class NgramSearchManager(object):
             "is_three_digit_zip_code": false
         }
         """
+        if self.instrumentation is not None:
+            return self.traced(
+                'fuzzy_search',
+                lambda trace: self._cached_fuzzy_search(search_entity, partition, num_results, filters, trace=trace),
+                search_entity=search_entity, partition=partition, num_results=num_results, filters=filters
+            )
+        return self._cached_fuzzy_search(search_entity, partition, num_results, filters)
+
+    def _cached_fuzzy_search(self,
+                             search_entity: str,
+                             partition: str = None,
+                             num_results: int = 50,
+                             filters: Dict = None,
+                             trace: QueryTrace = None):
+        return self.cached_query(
+            ('fuzzy_search', self.clean_entity(search_entity), partition, num_results, filters_cache_key(filters)),
+            lambda: self._fuzzy_search(search_entity, partition, num_results, filters, trace=trace),
+            trace=trace
+        )
+
+    def _fuzzy_search(self,
+                      search_entity: str,
+                      partition: str = None,
+                      num_results: int = 50,
+                      filters: Dict = None,
+                      trace: QueryTrace = None):
         search_entity = self.clean_entity(search_entity)
         search_ngram_ls = ngrams(search_entity, 3)
 
-        if self.partitioned:
-            ## Return Nothing if Partition Does not Exists
-            if partition not in self.partitions:
-                return []
-            search_res = {
-                ngram : self.search_dict[partition].get(ngram, '')
-                for ngram in search_ngram_ls
-            }
-            # Larger Search Radius to Address Post Result Filtering
-            top_search_res = dict(
-                Counter([y for x in search_res.values() for y in x]).most_common(max(num_results, 500))
-            )
-            results = {
-                self.geo_shape_dict[partition].get(key, {}).get('clean_value') : {
-                    'value': self.geo_shape_dict.get(key, {}).get('value'),
-                    'clean_value': self.geo_shape_dict[partition].get(key, {}).get('clean_value'),
-                    'distance': geo_damerau_levenshtein_distance(
-                        search_entity, self.geo_shape_dict[partition].get(key, {}).get('clean_value', '').lower()
-                    ),
-                    'ngram_similarity': self.entity_fuzzy_score(
-                        search_entity,
-                        self.geo_shape_dict[partition].get(key, {}).get('clean_value', '').lower()
-                    ),
-                    'score': self.geo_search_score(
-                        search_entity,
-                        self.geo_shape_dict[partition].get(key, {}).get('clean_value', '').lower(),
-                        self.geo_shape_dict.get(key, {}).get('population', 0)
-                    ),
-                    'id': key,
-                    'extra': self.geo_shape_dict[partition].get(key, None)
-                }
-                for key in top_search_res.keys()
-                if apply_shape_filters(
-                    value=self.geo_shape_dict[partition].get(key, {}),
-                    filters=filters
-                )
+        # Short searches have few or no n-grams, most populated prefix matches instead
+        if len(search_entity) <= self.prefix_search_length:
+            res_ls = self.prefix_search(search_entity, num_results=num_results, filters=filters, partition=partition)
+            if trace is not None:
+                trace.mark('prefix_search')
+            return res_ls
+        if trace is not None:
+            trace.mark('clean')
+
+        # Larger Search Radius to Address Post Result Filtering
+        # Indexed filters apply before the cutoff, other filter keys after it
+        top_positions, _, top_hits = self.get_ngram_index(partition).top_candidates(
+            search_ngram_ls, max(num_results, 500), keep=self.indexed_filter_keep(filters), trace=trace
+        )
+        return self.fuzzy_candidate_results(
+            search_entity, search_ngram_ls, top_positions, top_hits, num_results, filters, trace=trace
+        )
+
+    @pin_dataset
+    def prefix_search(self,
+                      search_entity: str,
+                      num_results: int = 50,
+                      filters: Dict = None,
+                      partition: str = None) -> List[Dict]:
+        """
+        Shapes whose clean value starts with the cleaned `search_entity`, most
+        populated first with one result per clean value.  Results have the
+        `fuzzy_search` fields, `fuzzy_search` uses this for searches up to
+        `prefix_search_length` characters.
+
+        Parameters
+        -----------
+            search_entity str
+                Search prefix, at most `PREFIX_KEY_LENGTH` characters once cleaned
+            num_results int
+                Number of results, default 50
+            filters Dict
+                Filters applied to results, as for `fuzzy_search`
+            partition str optional
+                Partition to search, as for `fuzzy_search`
+
+        Returns
+        -----------
+            results List[Dict]
+                Results ordered by population, not by `score`
+        """
+        search_entity = self.clean_entity(search_entity)
+        if not search_entity:
+            return []
+        positions = self.prefix_index.top(
+            search_entity, limit=max(num_results, 500),
+            keep=self.indexed_filter_keep(filters, partition=self.get_partition(partition))
+        )
+        positions = positions[self.shape_filter_mask(positions, filters)]
+
+        # One result per clean value, the most populated one
+        top_positions = {}
+        for position in positions.tolist():
+            if len(top_positions) >= num_results:
+                break
+            top_positions.setdefault(self.shape_clean_values[position], position)
+
+        results = []
+        for clean_value, position in top_positions.items():
+            shape = self.geo_shape_dict[self.shape_reference_codes[position]]
+            results.append({
+                'value': shape.get('value'),
+                'clean_value': shape.get('clean_value'),
+                'distance': geo_damerau_levenshtein_distance(search_entity, clean_value),
+                'ngram_similarity': self.entity_fuzzy_score(search_entity, clean_value),
+                'score': self.geo_search_score(search_entity, clean_value, shape.get('population', 0)),
+                'id': self.shape_reference_codes[position],
+                'extra': shape
+            })
+        return results
+
+    def indexed_filter_keep(self, filters: Dict = None, partition: Partition = None) -> Optional[Callable]:
+        """
+        Candidate `keep` mask for the indexed `filters` and membership of
+        `partition`, None without either
+        """
+        if filters is None and partition is None:
+            return None
+
+        def keep(positions):
+            mask = self.shape_filter_mask(positions, filters, indexed_only=True)
+            if partition is not None:
+                mask &= partition.contains(positions)
+            return mask
+        return keep
+
+    @pin_dataset
+    def fuzzy_candidate_results(self,
+                                search_entity: str,
+                                search_ngram_ls: List[str],
+                                top_positions: np.ndarray,
+                                top_hits: np.ndarray,
+                                num_results: int,
+                                filters: Dict = None,
+                                trace: QueryTrace = None) -> List[Dict]:
+        """
+        Fuzzy Search results from ranked candidate positions and their distinct
+        n-gram hits, applies `filters` and scores, ranks and builds the
+        top `num_results` results
+        """
+        if trace is not None:
+            trace.count('top_candidates', len(top_positions))
+        keep = self.shape_filter_mask(top_positions, filters)
+        top_positions, top_hits = top_positions[keep], top_hits[keep]
+        if trace is not None:
+            trace.count('filtered_candidates', len(top_positions))
+            trace.mark('filter')
+        top_shapes = [
+            (position, self.geo_shape_dict[self.shape_reference_codes[position]])
+            for position in top_positions.tolist()
+        ]
+        scores = self.candidate_fuzzy_scores(
+            search_entity, search_ngram_ls, top_positions, top_hits,
+            [shape.get('population', 0) for _, shape in top_shapes]
+        )
+        # One result per clean value, the last candidate wins at the first one's rank
+        ranked = {
+            shape.get('clean_value'): (score, ngram_similarity, position, shape)
+            for (position, shape), (ngram_similarity, score) in zip(top_shapes, scores)
+        }
+        if trace is not None:
+            trace.mark('score')
+
+        # Top-k on score (stable like `sorted`), result fields are only built for returned rows
+        res_ls = [
+            {
+                'value': shape.get('value'),
+                'clean_value': shape.get('clean_value'),
+                'distance': geo_damerau_levenshtein_distance(
+                    search_entity, self.shape_clean_values[position]
+                ),
+                'ngram_similarity': ngram_similarity,
+                'score': score,
+                'id': self.shape_reference_codes[position],
+                'extra': shape
             }
-        else:
-            search_res = {ngram : self.search_dict.get(ngram, '') for ngram in search_ngram_ls}
-            # Larger Search Radius to Address Post Result Filtering
-            top_search_res = dict(
-                Counter([y for x in search_res.values() for y in x]).most_common(max(num_results, 500))
+            for score, ngram_similarity, position, shape in heapq.nsmallest(
+                max(num_results, 0), ranked.values(), key=lambda candidate: -candidate[0]
             )
-            results = {
-                self.geo_shape_dict.get(key, {}).get('clean_value') : {
-                    'value': self.geo_shape_dict.get(key, {}).get('value'),
-                    'clean_value': self.geo_shape_dict.get(key, {}).get('clean_value'),
-                    'distance': geo_damerau_levenshtein_distance(
-                        search_entity,
-                        self.geo_shape_dict.get(key, {}).get('clean_value', '').lower()
-                    ),
-                    'ngram_similarity': self.entity_fuzzy_score(
-                        search_entity,
-                        self.geo_shape_dict.get(key, {}).get('clean_value', '').lower(),
-                    ),
-                    'score': self.geo_search_score(
-                        search_entity,
-                        self.geo_shape_dict.get(key, {}).get('clean_value', '').lower(),
-                        self.geo_shape_dict.get(key, {}).get('population', 0)
-                    ),
-                    'id': key,
-                    'extra': self.geo_shape_dict.get(key, None)
-                }
-                for key in top_search_res.keys()
-                if apply_shape_filters(
-                    value=self.geo_shape_dict.get(key, {}),
-                    filters=filters
-                )
-            }
-
-        return [
-            result for result in
-            sorted(
-                results.values(), key=lambda result: result['score'],
-                reverse=True
-            )][0:num_results]
+        ]
+        if trace is not None:
+            trace.mark('format')
+        return res_ls
 
 
 class GeoManager(ShapeManager, RadiusSearchManager, NgramSearchManager):
     def __init__(self,
                  partitions: Union[List, Set] = None,
                  lower_only: bool = True,
-                 data_dir: str = os.path.join("temp", "data")):
-
+                 data_dir: str = os.path.join("temp", "data"),
+                 query_cache_size: int = None,
+                 prefix_search_length: int = 2,
+                 partition_key: str = None,
+                 instrumentation: Callable[[QueryTrace], None] = None):
+        """
+        Parameters
+        ------------
+            partitions List|Set optional
+                Partition values to load (for example `["US"]`), other Shapes
+                are skipped at load, default is every value of `partition_key`
+            lower_only bool true
+                Indication if all stored items are lower case
+            data_dir str
+                Directory of the local cache
+            query_cache_size int optional
+                Size of the LRU cache of search results, default is no cache
+            prefix_search_length int 2
+                Cleaned searches up to this length use the prefix index
+            partition_key str optional
+                Filter key the indexes are partitioned by, for example
+                `ref_data.country` (the default with `partitions`) or `geo_type`
+            instrumentation Callable optional
+                Hook called with the `QueryTrace` (stage timings and counts) of
+                every search and load, for example a `QueryStats`, default none
+        """
         self.lower_only = lower_only  # Indication if all stored items are lower case
+        # Loaded data and indexes, swapped as a whole on (re)load and pinned per query thread
+        self._pinned_dataset = threading.local()
+        self._dataset = GeoDataset()
+        self._reload_lock = threading.Lock()
+        self._reload_executor = None
+        self._auto_reload = None
+        self.shared_dataset_path = None
+        # Opt-in LRU cache of search results, cleared whenever data is (re)loaded
+        self.query_cache = QueryCache(query_cache_size) if query_cache_size else None
+        # Opt-in per call traces, searches skip all timing when None
+        self.instrumentation = instrumentation
+        # Cleaned searches up to this length use the population ranked prefix index
+        if prefix_search_length > PREFIX_KEY_LENGTH:
+            raise ValueError(f'prefix_search_length must be at most {PREFIX_KEY_LENGTH}')
+        self.prefix_search_length = prefix_search_length
+        # N-gram and spatial indexes split by the `partition_key` value of every Shape
         self.partitions = set(partitions) if partitions is not None else None
-        self.partitioned = self.partitions is not None
+        if partition_key is None and self.partitions is not None:
+            partition_key = 'ref_data.country'
+        self.partition_key = partition_key
+        self.partitioned = partition_key is not None
         self.data_dir = data_dir
 
         assert self.lower_only, "Currently only supports lower_only=True"
-        assert not self.partitioned, "Currently only supports unpartitioned data"
 
-        if self.partitioned:
-            self.geo_shape_dict = {}
-            self.search_dict = {}
-            for partition in self.partitions:
-                self.geo_shape_dict[partition] = {}
-                self.search_dict[partition] = {}
-        else:
-            self.geo_shape_dict = {}
-            self.search_dict = {}
+        self.geo_shape_dict = {}
+        self.search_dict = {}
         
         # Radius Search
         self._generate_maps()
 
-    def _generate_maps(self):
+    def _generate_maps(self, ngram_index: NgramIndex = None):
+        """Rebuild every lookup and index from `geo_shape_dict` and `search_dict`"""
+        self._swap_dataset(self._build_dataset(
+            self.geo_shape_dict, search_dict=self.search_dict, ngram_index=ngram_index,
+            data_version=self.data_version, cache_checksums=self.cache_checksums
+        ))
+
+    def _build_dataset(self,
+                       geo_shape_dict: Dict,
+                       search_dict: Dict = None,
+                       ngram_index: NgramIndex = None,
+                       data_version: str = None,
+                       cache_checksums: Dict[str, str] = None,
+                       started: float = None) -> GeoDataset:
+        """
+        Dataset of `geo_shape_dict` with every lookup and index, built off to
+        the side, n-gram postings come from `ngram_index` or `search_dict`
+        """
+        started = time.perf_counter() if started is None else started
         # Map Between IDs and Refence
-        self.id_reference_code_map = {
-            record['id']: record['reference_code'] for record in self.geo_shape_dict.values()
+        id_reference_code_map = {
+            record['id']: record['reference_code'] for record in geo_shape_dict.values()
         }
-        for value in self.geo_shape_dict.values():
+        for value in geo_shape_dict.values():
             try:
                 value.update({
                     'latitude': float(value['latitude']),
@@ -660,10 +1541,236 @@ class GeoManager(ShapeManager, RadiusSearchManager, NgramSearchManager):
             except KeyError:
                 logger.error(f'[GeoManager] `_generate_maps` key error', exc_info=True)
 
-        self.radius_search_map = {
-            ref_code: RadiusSearchShape(record) for ref_code, record in self.geo_shape_dict.items()
+        # Spatial Index and Radius Shapes over positions in `geo_shape_dict`
+        shape_reference_codes = list(geo_shape_dict)
+        shape_position_map = {
+            ref_code: position for position, ref_code in enumerate(shape_reference_codes)
         }
 
+        # N-gram posting lists over Shape positions, replaces the lists of reference codes
+        if ngram_index is None:
+            ngram_index = NgramIndex.from_search_dict(
+                search_dict or {}, shape_position_map, len(shape_reference_codes)
+            )
+        shape_clean_values = [
+            (record.get('clean_value') or '').lower() for record in geo_shape_dict.values()
+        ]
+        shape_columns = ShapeColumns(geo_shape_dict.values())
+        # The partition key is indexed too, so snapshots hold its codes
+        attribute_keys = ATTRIBUTE_INDEX_KEYS
+        if self.partitioned and self.partition_key not in attribute_keys:
+            attribute_keys += (self.partition_key,)
+        attribute_index = AttributeIndex.from_records(geo_shape_dict.values(), keys=attribute_keys)
+
+        # Radius Shapes are views over `shape_columns` built on access
+        def record_at(position: int) -> Dict:
+            return geo_shape_dict[shape_reference_codes[position]]
+
+        radius_shape_ls = PositionSequence(
+            len(shape_columns), lambda position: RadiusSearchShape(shape_columns, position, record_at)
+        )
+        return GeoDataset(
+            geo_shape_dict=geo_shape_dict,
+            search_dict=SearchDictView(ngram_index, shape_reference_codes),
+            id_reference_code_map=id_reference_code_map,
+            radius_search_map=PositionMap(shape_position_map, radius_shape_ls.__getitem__, len(shape_columns)),
+            shape_reference_codes=shape_reference_codes,
+            radius_shape_ls=radius_shape_ls,
+            shape_position_map=shape_position_map,
+            ngram_index=ngram_index,
+            shape_clean_values=shape_clean_values,
+            shape_columns=shape_columns,
+            spatial_index=SpatialIndex.from_columns(shape_columns),
+            attribute_index=attribute_index,
+            prefix_index=PrefixIndex.from_values(
+                shape_clean_values,
+                [to_float(record.get('population') or 0) for record in geo_shape_dict.values()]
+            ),
+            partition_index=self.build_partition_index(
+                geo_shape_dict.values(), ngram_index, shape_columns, attribute_index
+            ),
+            data_version=data_version,
+            cache_checksums=cache_checksums,
+            built_at=datetime.now(timezone.utc),
+            build_seconds=time.perf_counter() - started,
+        )
+
+    def build_partition_index(self,
+                              records: Iterable[Dict],
+                              ngram_index: NgramIndex,
+                              shape_columns: ShapeColumns,
+                              attribute_index: AttributeIndex) -> Optional[PartitionIndex]:
+        """Built indexes split by `partition_key`, None for unpartitioned data"""
+        if not self.partitioned:
+            return None
+        return PartitionIndex.build(
+            self.partition_key, records, ngram_index, shape_columns,
+            attribute_index=attribute_index, values=self.partitions
+        )
+
+    def _swap_dataset(self, dataset: GeoDataset):
+        """Make `dataset` current, running queries keep the dataset they pinned"""
+        self._dataset = dataset
+        self.clear_query_cache()
+
+    @property
+    def dataset(self) -> GeoDataset:
+        """Current dataset, or the one pinned by the running query"""
+        dataset = getattr(self._pinned_dataset, 'dataset', None)
+        return self._dataset if dataset is None else dataset
+
+    @contextmanager
+    def pinned(self) -> Iterator[GeoDataset]:
+        """Block whose queries all see the dataset current on entry"""
+        pinned = self._pinned_dataset
+        if getattr(pinned, 'dataset', None) is not None:
+            yield pinned.dataset
+            return
+        pinned.dataset = self._dataset
+        try:
+            yield pinned.dataset
+        finally:
+            pinned.dataset = None
+
+    def dataset_info(self) -> Dict:
+        """Data version, build time (`built_at`, `build_seconds`) and size of the current dataset"""
+        return self.dataset.info()
+
+    def memory_report(self, largest_postings: int = 10, shared: bool = False, compare_to: Dict = None) -> Dict:
+        """
+        Memory used by the loaded structures.  Every object is counted once,
+        in the first structure (in build order) that references it, so the
+        structure bytes add up to `total_bytes`.  Memory-mapped array data
+        (snapshots, shared datasets) is reported apart as `mapped_bytes`.
+        Walks every loaded object, expect a few seconds per 100k Shapes.
+
+        Parameters
+        ------------
+            largest_postings int 10
+                Number of longest n-gram posting lists to report
+            shared bool false
+                Also report `shared_bytes` per structure, the bytes it
+                references that an earlier structure holds (walks every
+                structure a second time)
+            compare_to Dict optional
+                Earlier report (for example saved as JSON before a change),
+                adds the `comparison` of both reports
+
+        Returns
+        ------------
+            report Dict
+                `structures` bytes and `mapped_bytes` per dataset field,
+                `geo_types` and `partitions` shape counts and bytes (shape
+                records and radius search shapes per geo type) and the
+                `largest_posting_lists`
+        """
+        report = dataset_memory_report(self.dataset, largest_postings=largest_postings, shared=shared)
+        if compare_to is not None:
+            report['comparison'] = compare_memory_reports(compare_to, report)
+        return report
+
+    def reload(self,
+               version: str = None,
+               force_db_fetch: bool = True,
+               cache_local: bool = True,
+               compressed: bool = False,
+               build_ngrams: bool = False) -> Dict:
+        """
+        Load data while queries keep running.  The new dataset is built off to
+        the side and swapped in with one assignment, queries already running
+        finish on the dataset they started with.  Concurrent reloads run one
+        at a time, unchanged remote files (conditional requests) keep the
+        current dataset.
+
+        Parameters
+        ------------
+            version str optional
+                Version of Geo Database Dump
+            force_db_fetch bool true
+                Fetch from the store rather than the local cache
+            cache_local bool true
+                Cache files locally, default is true
+            compressed bool false
+                To be depreciated for always true, fetch compressed files
+            build_ngrams bool false
+                Build the n-gram index from the shape records, the search file is not downloaded
+
+        Returns
+        ------------
+            info dict
+                `dataset_info` of the dataset in use after the reload
+        """
+        with self._reload_lock:
+            self.load_data(
+                version=version, force_db_fetch=force_db_fetch, cache_local=cache_local, compressed=compressed,
+                build_ngrams=build_ngrams
+            )
+            return self.dataset_info()
+
+    def reload_async(self, version: str = None, **kwargs) -> Future:
+        """`reload` in a background thread, the Future resolves to `dataset_info`"""
+        with self._reload_lock:
+            if self._reload_executor is None:
+                self._reload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='yat_geo_db_reload')
+        return self._reload_executor.submit(self.reload, version=version, **kwargs)
+
+    def start_auto_reload(self, interval: float, version: str = None, **kwargs):
+        """
+        Reload every `interval` seconds in a daemon thread until
+        `stop_auto_reload`, failed reloads are logged and keep the current
+        dataset
+
+        Parameters
+        ------------
+            interval float
+                Seconds between reloads
+            version str optional
+                Version of Geo Database Dump
+            kwargs
+                `reload` arguments
+        """
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+        self.stop_auto_reload()
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.reload(version=version, **kwargs)
+                except Exception:
+                    logger.error(f'[GeoManager] Auto reload failed, keeping data_version={self.data_version}', exc_info=True)
+
+        thread = threading.Thread(target=run, name='yat_geo_db_auto_reload', daemon=True)
+        self._auto_reload = (thread, stop)
+        thread.start()
+
+    def stop_auto_reload(self, timeout: float = None):
+        """Stop reloads started by `start_auto_reload`, waits for a running reload"""
+        if self._auto_reload is None:
+            return
+        thread, stop = self._auto_reload
+        self._auto_reload = None
+        stop.set()
+        thread.join(timeout)
+
+    def clear_query_cache(self):
+        """Drop cached search results, called when the loaded data changes"""
+        if self.query_cache is not None:
+            self.query_cache.clear()
+
+    def query_cache_stats(self) -> Optional[Dict[str, int]]:
+        """Query cache hits, misses, size and max_size, None if not enabled"""
+        if self.query_cache is None:
+            return None
+        return self.query_cache.stats()
+
+    def query_stats(self) -> Optional[Dict[str, Dict]]:
+        """Rolling percentiles per operation of a `QueryStats` instrumentation hook, None otherwise"""
+        if not isinstance(self.instrumentation, QueryStats):
+            return None
+        return self.instrumentation.summary()
+
     @property
     def num_shapes(self):
         return len(list(self.geo_shape_dict.keys()))
@@ -678,10 +1785,16 @@ class GeoManager(ShapeManager, RadiusSearchManager, NgramSearchManager):
                   version: str = None,
                   force_db_fetch: bool = False,
                   cache_local: bool = True,
-                  compressed: bool = False):
+                  compressed: bool = False,
+                  build_ngrams: bool = False):
         """
-        Load Data
-        
+        Load Data, files are streamed (chunked reads, streaming gzip inflate
+        and incremental JSON parsing) and n-gram postings go straight into
+        the index, keeping peak memory close to the loaded size.  The local
+        cache is gzip compressed and checksummed, a forced fetch sends
+        conditional requests and skips the download of unchanged files (and
+        the rebuild when the loaded data is unchanged).
+
         Parameters
         ------------
             version str optional
@@ -692,72 +1805,447 @@ class GeoManager(ShapeManager, RadiusSearchManager, NgramSearchManager):
                 Cache files locally, default is true
             compressed bool false
                 To be depreciated for always true, fetch compressed files
+            build_ngrams bool false
+                Build the n-gram index from the shape records (`clean_value`)
+                in one pass rather than downloading and parsing the search file
         """
-        search_file_name = 'geo_manager_ngram_search.json'
-        geo_shape_file_name = 'geo_manager_shape.json'
-
-        fetch_search_file_name = search_file_name
-        fetch_geo_shape_file_name = geo_shape_file_name
-        if compressed:
-            fetch_search_file_name += ".gz"
-            fetch_geo_shape_file_name += ".gz"
-
-        
+        if self.instrumentation is not None:
+            return self.traced(
+                'load_data',
+                lambda trace: self._load_data(
+                    version, force_db_fetch, cache_local, compressed, build_ngrams=build_ngrams, trace=trace
+                ),
+                result_count=None,
+                version=version, force_db_fetch=force_db_fetch, cache_local=cache_local, compressed=compressed,
+                build_ngrams=build_ngrams
+            )
+        return self._load_data(version, force_db_fetch, cache_local, compressed, build_ngrams=build_ngrams)
+
+    def _load_data(self,
+                   version: str = None,
+                   force_db_fetch: bool = False,
+                   cache_local: bool = True,
+                   compressed: bool = False,
+                   build_ngrams: bool = False,
+                   trace: QueryTrace = None):
+        started = time.perf_counter()
         # Load Local
-        local_path = os.path.join(self.data_dir, "geo_db", version or "current")
+        local_path = self.get_local_path(version=version)
         if os.path.exists(local_path) and not force_db_fetch:
             logger.info("Starting Loading Data from Local")
-            with open(os.path.join(local_path, search_file_name), 'r') as f:
-                self.search_dict = json.load(f)
-
-            with open(os.path.join(local_path, geo_shape_file_name), 'r') as f:
-                self.geo_shape_dict = json.load(f)
-
-            # Radius Search
-            self._generate_maps()
+            self._load_local_cache(
+                local_path, version=version, started=started, build_ngrams=build_ngrams, trace=trace
+            )
             logger.info("Completed Loading Data from Local")
 
             return
 
-        # Load Search File
         logger.info("Starting Loading Data from Remote")
-        response = requests.get(
-            f'{self.get_base_url(version=version)}{fetch_search_file_name}'
-        )
-        if response.status_code == 200:
-            if compressed:
-                self.search_dict = json.loads(
-                    gzip.decompress(response.content).decode("utf-8")
-                )
-            else:
-                self.search_dict = response.json()
-        else:
-            raise ValueError(f"Unable to load search file reason={response.text}")
-
-        # Load Shape File
-        response = requests.get(f'{self.get_base_url(version=version)}{fetch_geo_shape_file_name}')
-        if response.status_code == 200: 
-            if compressed:
-                self.geo_shape_dict = json.loads(
-                    gzip.decompress(response.content).decode("utf-8")
-                )
+        if not cache_local:
+            # Load Shape File
+            with self.open_data_file(GEO_SHAPE_FILE_NAME, 'shape', version=version, compressed=compressed) as chunks:
+                geo_shape_dict = self.load_shape_records(chunks)
+            if trace is not None:
+                trace.mark('read_shapes')
+
+            # Load Search File, or build the n-gram index from the shapes
+            if build_ngrams:
+                ngram_index = self.build_ngram_index_from_records(geo_shape_dict)
+                if trace is not None:
+                    trace.mark('build_ngrams')
             else:
-                self.geo_shape_dict = response.json()
-        else:
-            raise ValueError(
-                f"Unable to load shape file reason={response.text}"
-            )
+                with self.open_data_file(SEARCH_FILE_NAME, 'search', version=version, compressed=compressed) as chunks:
+                    ngram_index = self.build_ngram_index(chunks, geo_shape_dict)
+                if trace is not None:
+                    trace.mark('read_search')
 
-        # Cache Files to Local Disk
-        if cache_local:
-            Path(local_path).mkdir(parents=True, exist_ok=True)
-            # Write to local
-            with open(os.path.join(local_path, search_file_name), 'w') as f:
-                json.dump(self.search_dict, f)
+            self._set_data(geo_shape_dict, ngram_index, version=version, started=started, trace=trace)
+            logger.info("Completed Loading Data from Remote")
+            return
 
-            with open(os.path.join(local_path, geo_shape_file_name), 'w') as f:
-                json.dump(self.geo_shape_dict, f)
+        cache = LocalCache(local_path)
+        with cache.stage():
+            modified = [
+                self.download_data_file(cache, file_name, label, version=version, compressed=compressed)
+                for file_name, label in self.data_files(build_ngrams)
+            ]
+            if trace is not None:
+                trace.count('downloaded_files', sum(modified))
+                trace.mark('download')
+            if self._is_loaded_cache(cache, modified, version):
+                logger.info("Completed Loading Data from Remote, data unchanged")
+                return
+            geo_shape_dict, ngram_index = self.read_local_cache(cache, build_ngrams=build_ngrams, trace=trace)
+
+        self._set_data(
+            geo_shape_dict, ngram_index, version=version, cache_checksums=cache.checksums(), started=started,
+            trace=trace
+        )
+        logger.info("Completed Loading Data from Remote")
 
-        # Radius Search
-        self._generate_maps()
+    def data_files(self, build_ngrams: bool = False) -> List[Tuple[str, str]]:
+        """`(file_name, label)` of the Geo Database Dump files to download"""
+        if build_ngrams:
+            return [(GEO_SHAPE_FILE_NAME, 'shape')]
+        return [(GEO_SHAPE_FILE_NAME, 'shape'), (SEARCH_FILE_NAME, 'search')]
+
+    def get_local_path(self, version: str = None) -> str:
+        return os.path.join(self.data_dir, "geo_db", version or "current")
+
+    @contextmanager
+    def open_data_file(self,
+                       file_name: str,
+                       label: str,
+                       version: str = None,
+                       compressed: bool = False) -> Iterator[Iterator[bytes]]:
+        """Stream one Geo Database Dump file, yields an iterator of uncompressed chunks"""
+        remote_file_name = f"{file_name}.gz" if compressed else file_name
+        with requests.get(f'{self.get_base_url(version=version)}{remote_file_name}', stream=True) as response:
+            if response.status_code != 200:
+                raise ValueError(f"Unable to load {label} file reason={response.text}")
+            chunks = response.iter_content(STREAM_CHUNK_SIZE)
+            yield inflate_chunks(chunks) if compressed else chunks
+
+    def fetch_data_file(self, file_name: str, label: str, version: str = None, compressed: bool = False) -> Dict:
+        """Download and parse one Geo Database Dump file"""
+        with self.open_data_file(file_name, label, version=version, compressed=compressed) as chunks:
+            return load_json_object(chunks)
+
+    def download_data_file(self,
+                           cache: LocalCache,
+                           file_name: str,
+                           label: str,
+                           version: str = None,
+                           compressed: bool = False) -> bool:
+        """
+        Download one Geo Database Dump file into a staging `cache`, with a
+        conditional request when it is cached.  False if it is unchanged.
+        """
+        remote_file_name = f"{file_name}.gz" if compressed else file_name
+        headers = cache.conditional_headers(file_name, remote_file_name)
+        with requests.get(f'{self.get_base_url(version=version)}{remote_file_name}',
+                          headers=headers, stream=True) as response:
+            if response.status_code == 304:
+                return False
+            if response.status_code != 200:
+                raise ValueError(f"Unable to load {label} file reason={response.text}")
+            with cache.write(file_name, remote_file_name, compressed, response.headers) as writer:
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    writer.write(chunk)
+        return True
+
+    def _is_loaded_cache(self, cache: LocalCache, modified: List[bool], version: str = None) -> bool:
+        """Whether nothing was downloaded and the loaded data is the cached data"""
+        return (not any(modified) and self.data_version == (version or "current")
+                and self.cache_checksums is not None and self.cache_checksums == cache.checksums())
+
+    def read_local_cache(self, cache: LocalCache, build_ngrams: bool = False, trace: QueryTrace = None):
+        """
+        Shape dict and n-gram index from the files of a local cache, the
+        n-gram index is built from the shapes with `build_ngrams` or when the
+        search file is not cached
+        """
+        with cache.read(GEO_SHAPE_FILE_NAME) as chunks:
+            geo_shape_dict = self.load_shape_records(chunks)
+        if trace is not None:
+            trace.mark('read_shapes')
+
+        if build_ngrams or not cache.contains(SEARCH_FILE_NAME):
+            ngram_index = self.build_ngram_index_from_records(geo_shape_dict)
+            if trace is not None:
+                trace.mark('build_ngrams')
+            return geo_shape_dict, ngram_index
+
+        with cache.read(SEARCH_FILE_NAME) as chunks:
+            ngram_index = self.build_ngram_index(chunks, geo_shape_dict)
+        if trace is not None:
+            trace.mark('read_search')
+        return geo_shape_dict, ngram_index
+
+    def _load_local_cache(self,
+                          local_path: str,
+                          version: str = None,
+                          started: float = None,
+                          build_ngrams: bool = False,
+                          trace: QueryTrace = None):
+        for attempt in range(2):
+            cache = LocalCache(local_path)
+            try:
+                geo_shape_dict, ngram_index = self.read_local_cache(cache, build_ngrams=build_ngrams, trace=trace)
+                break
+            except CacheChecksumError:
+                # Files replaced by a concurrent refresh while reading
+                if attempt:
+                    raise
+                logger.warning(f'[GeoManager] Local cache changed while loading, retrying')
+        self._set_data(
+            geo_shape_dict, ngram_index, version=version, cache_checksums=cache.checksums(), started=started,
+            trace=trace
+        )
+
+    def load_shape_records(self, chunks: Iterable[bytes]) -> Dict:
+        """Shape records from a streamed shape file, only those of the loaded `partitions`"""
+        items = iter_json_object_items(chunks)
+        if self.partitions is None:
+            return dict(items)
+        return {
+            reference_code: record for reference_code, record in items
+            if get_key(record, self.partition_key) in self.partitions
+        }
+
+    def build_ngram_index(self, chunks: Iterable[bytes], geo_shape_dict: Dict) -> NgramIndex:
+        """N-gram index over `geo_shape_dict` positions from a streamed search file"""
+        position_map = {reference_code: position for position, reference_code in enumerate(geo_shape_dict)}
+        return NgramIndex.from_items(
+            iter_json_object_items(chunks), position_map, len(position_map), missing_ok=self.partitions is not None
+        )
+
+    def build_ngram_index_from_records(self, geo_shape_dict: Dict) -> NgramIndex:
+        """
+        N-gram index over `geo_shape_dict` positions built from the shapes'
+        `clean_value`, the same postings as the search file holds
+        """
+        return NgramIndex.from_values([
+            (record.get('clean_value') or '').lower() for record in geo_shape_dict.values()
+        ])
+
+    def _set_data(self,
+                  geo_shape_dict: Dict,
+                  ngram_index: NgramIndex,
+                  version: str = None,
+                  cache_checksums: Dict[str, str] = None,
+                  started: float = None,
+                  trace: QueryTrace = None):
+        """Build the dataset of loaded data and swap it in, `cache_checksums` identify the cached files read"""
+        dataset = self._build_dataset(
+            geo_shape_dict, ngram_index=ngram_index, data_version=version or "current",
+            cache_checksums=cache_checksums, started=started
+        )
+        if trace is not None:
+            trace.count('shapes', len(geo_shape_dict))
+            trace.count('ngrams', len(ngram_index))
+            trace.mark('build')
+        self._swap_dataset(dataset)
+        if trace is not None:
+            trace.mark('swap')
+
+    async def aload_data(self,
+                         version: str = None,
+                         force_db_fetch: bool = False,
+                         cache_local: bool = True,
+                         compressed: bool = False,
+                         build_ngrams: bool = False,
+                         executor: Executor = None):
+        """
+        `load_data` for asyncio, both files download concurrently and all
+        blocking work (requests, JSON parsing, index builds) runs in executor
+        threads
+
+        Parameters
+        ------------
+            version str optional
+                Version of Geo Database Dump
+            force_db_fetch bool false
+                Force database refresh/fetch
+            cache_local bool true
+                Cache files locally, default is true
+            compressed bool false
+                To be depreciated for always true, fetch compressed files
+            build_ngrams bool false
+                Build the n-gram index from the shape records, the search file is not downloaded
+            executor Executor optional
+                Executor for blocking work, default is the loop's executor
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        local_path = self.get_local_path(version=version)
+        if os.path.exists(local_path) and not force_db_fetch:
+            await loop.run_in_executor(executor, partial(self.load_data, version=version, build_ngrams=build_ngrams))
+            return
+
+        logger.info("Starting Loading Data from Remote")
+        with tempfile.TemporaryDirectory(prefix='yat_geo_db_') as temp_dir:
+            # Without local caching, downloads go through a throwaway cache
+            cache = LocalCache(local_path if cache_local else os.path.join(temp_dir, 'cache'))
+            with cache.stage():
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(executor, partial(
+                        self.download_data_file, cache, file_name, label, version=version, compressed=compressed
+                    ))
+                    for file_name, label in self.data_files(build_ngrams)
+                ], return_exceptions=True)
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                if self._is_loaded_cache(cache, results, version):
+                    logger.info("Completed Loading Data from Remote, data unchanged")
+                    return
+                geo_shape_dict, ngram_index = await loop.run_in_executor(executor, partial(
+                    self.read_local_cache, cache, build_ngrams=build_ngrams
+                ))
+        await loop.run_in_executor(executor, partial(
+            self._set_data, geo_shape_dict, ngram_index, version=version,
+            cache_checksums=cache.checksums() if cache_local else None, started=started
+        ))
         logger.info("Completed Loading Data from Remote")
+
+    @pin_dataset
+    def save_snapshot(self, path: str):
+        """
+        Save loaded data as a binary snapshot directory that `load_snapshot`
+        can memory-map on the next start.  Entities added with `add_entity`
+        after loading are not included.
+
+        Parameters
+        ------------
+            path str
+                Snapshot directory, replaced if it exists
+        """
+        records = [self.geo_shape_dict[reference_code] for reference_code in self.shape_reference_codes]
+        arrays = {
+            f'columns.{name}': array for name, array in self.shape_columns.to_arrays().items()
+        }
+        arrays.update({
+            f'spatial.{name}': array for name, array in self.spatial_index.to_arrays().items()
+        })
+        arrays.update({
+            f'ngram.{name}': array for name, array in self.ngram_index.to_arrays().items()
+        })
+        arrays.update({
+            f'prefix.{name}': array for name, array in self.prefix_index.to_arrays().items()
+        })
+        arrays.update({
+            f'attributes.{name}': array for name, array in self.attribute_index.to_arrays().items()
+        })
+        arrays.update({
+            f'clean_values.{name}': array
+            for name, array in StringTable.from_strings(self.shape_clean_values).to_arrays().items()
+        })
+        write_snapshot(
+            path=path,
+            reference_codes=list(self.shape_reference_codes),
+            records=records,
+            arrays=arrays,
+            meta={
+                'data_version': self.data_version,
+                'country_values': self.shape_columns.country_values,
+                'geo_type_values': self.shape_columns.geo_type_values,
+                'attribute_values': self.attribute_index.values,
+            }
+        )
+
+    def share_dataset(self, path: str = None) -> str:
+        """
+        Move the loaded data into a memory-mapped snapshot that other processes
+        attach to with `GeoManager.attach_dataset`.  The manager reloads from
+        the snapshot itself, so workers forked afterwards share its pages
+        rather than copying Python objects.
+
+        Parameters
+        ------------
+            path str optional
+                Snapshot directory, default under `/dev/shm` where available
+
+        Returns
+        ------------
+            path str
+                Snapshot directory to pass to `attach_dataset`
+        """
+        path = path or default_shared_path(self.data_version)
+        self.save_snapshot(path)
+        self.load_snapshot(path, mmap=True)
+        self.shared_dataset_path = path
+        return path
+
+    @classmethod
+    def attach_dataset(cls, path: str, **kwargs) -> 'GeoManager':
+        """
+        GeoManager reading a dataset shared with `share_dataset`, read-only
+        memory maps of the same files in every process
+
+        Parameters
+        ------------
+            path str
+                Snapshot directory returned by `share_dataset`
+            kwargs
+                GeoManager arguments, for example `query_cache_size`
+        """
+        geo_manager = cls(**kwargs)
+        geo_manager.load_snapshot(path, mmap=True)
+        return geo_manager
+
+    def remove_shared_dataset(self):
+        """
+        Delete the files of a dataset shared with `share_dataset`, processes
+        that already attached keep their mappings
+        """
+        if self.shared_dataset_path is not None:
+            shutil.rmtree(self.shared_dataset_path, ignore_errors=True)
+            self.shared_dataset_path = None
+
+    def load_snapshot(self, path: str, mmap: bool = True):
+        """
+        Load data from a binary snapshot written by `save_snapshot`
+
+        Parameters
+        ------------
+            path str
+                Snapshot directory
+            mmap bool true
+                Memory-map the snapshot arrays read-only rather than reading them
+                into memory, pages are shared by processes mapping the same files
+        """
+        logger.info("Starting Loading Data from Snapshot")
+        started = time.perf_counter()
+        snapshot = Snapshot(path, mmap=mmap)
+        shape_reference_codes = ExtendedSequence(snapshot.reference_codes)
+        ngram_index = NgramIndex.from_arrays(snapshot.prefixed_arrays('ngram'))
+        clean_values = snapshot.prefixed_arrays('clean_values')
+        shape_columns = ShapeColumns.from_arrays(
+            snapshot.prefixed_arrays('columns'),
+            snapshot.meta['country_values'],
+            snapshot.meta['geo_type_values']
+        )
+
+        attribute_index = AttributeIndex.from_arrays(
+            snapshot.prefixed_arrays('attributes'), snapshot.meta['attribute_values']
+        )
+
+        # Radius Shapes are views over `shape_columns` built on access
+        geo_shape_dict = snapshot.geo_shape_dict
+        radius_shape_ls = PositionSequence(
+            len(shape_columns),
+            lambda position: RadiusSearchShape(shape_columns, position, geo_shape_dict.record_at)
+        )
+        self._swap_dataset(GeoDataset(
+            geo_shape_dict=geo_shape_dict,
+            search_dict=SearchDictView(ngram_index, shape_reference_codes),
+            id_reference_code_map=snapshot.id_reference_code_map,
+            radius_search_map=PositionMap(snapshot.shape_position_map, radius_shape_ls.__getitem__),
+            shape_reference_codes=shape_reference_codes,
+            radius_shape_ls=radius_shape_ls,
+            shape_position_map=ChainMap({}, snapshot.shape_position_map),
+            ngram_index=ngram_index,
+            shape_clean_values=ExtendedSequence(StringTable(clean_values['offsets'], clean_values['data'])),
+            shape_columns=shape_columns,
+            spatial_index=SpatialIndex.from_arrays(
+                snapshot.prefixed_arrays('spatial'),
+                latitude=shape_columns.latitude,
+                longitude=shape_columns.longitude
+            ),
+            attribute_index=attribute_index,
+            prefix_index=PrefixIndex.from_arrays(snapshot.prefixed_arrays('prefix')),
+            partition_index=self.build_partition_index(
+                geo_shape_dict.values(), ngram_index, shape_columns, attribute_index
+            ),
+            data_version=snapshot.meta.get('data_version'),
+            built_at=datetime.now(timezone.utc),
+            build_seconds=time.perf_counter() - started,
+        ))
+        logger.info("Completed Loading Data from Snapshot")
+
+
+# Data attributes of the manager read the pinned or current dataset
+for _name in DATASET_FIELDS:
+    setattr(GeoManager, _name, dataset_property(_name))
+del _name
@@ -34,6 +34,40 @@ def lat_lng_dist(lat_lng_1: Tuple[float, float],
 	return 2 * EARTH_RADIUS_MILES * np.arctan(a ** .5 / (1-a) ** .5)
 
 
+def lat_lng_dist_array(latitude_1, longitude_1, latitude_2, longitude_2) -> np.ndarray:
+	"""
+	Description
+	-----------
+		Vectorized `lat_lng_dist`, distance as the crow flies between arrays of coordinates, assuming the earth is a sphere.  Inputs are broadcast against each other.
+
+	Parameters
+	-----------
+		latitude_1: array-like of float
+			Origin latitudes
+		longitude_1: array-like of float
+			Origin longitudes
+		latitude_2: array-like of float
+			Destination latitudes
+		longitude_2: array-like of float
+			Destination longitudes
+
+	Returns
+	-----------
+		numpy.ndarray
+			Distances in miles, same as `lat_lng_dist` element by element up to floating point rounding.
+	"""
+	lat1_rad = np.asarray(latitude_1, dtype=np.float64) * np.pi / 180
+	lng1_rad = np.asarray(longitude_1, dtype=np.float64) * np.pi / 180
+	lat2_rad = np.asarray(latitude_2, dtype=np.float64) * np.pi / 180
+	lng2_rad = np.asarray(longitude_2, dtype=np.float64) * np.pi / 180
+	dlat = lat2_rad - lat1_rad
+	dlng = lng2_rad - lng1_rad
+	a = np.sin(dlat/2) ** 2 + np.cos(lat1_rad) * \
+            np.cos(lat2_rad) * np.sin(dlng/2) ** 2
+	with np.errstate(divide='ignore', invalid='ignore'):
+		return 2 * EARTH_RADIUS_MILES * np.arctan(a ** .5 / (1-a) ** .5)
+
+
 def latitude_delta_from_miles(miles):
 	"""
 	Description
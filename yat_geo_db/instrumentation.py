@@ -0,0 +1,154 @@
+"""
+Opt-in per query instrumentation, stage timings and counts of every call
+"""
+from collections import defaultdict, deque
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+PERCENTILES = (50, 90, 99)
+
+
+class QueryTrace(object):
+    """
+    Timings and counts of one instrumented call, passed to the instrumentation
+    hook when the call returns.
+
+    `stages` holds the seconds spent per stage (consecutive `mark` calls),
+    `counts` candidate, posting and result counts (stage and count names
+    are distinct), `posting_sizes` the length
+    of every posting list touched and `cache_hit` whether the query cache
+    answered (None without a query cache).
+    """
+    __slots__ = ('operation', 'params', 'stages', 'counts', 'posting_sizes', 'cache_hit', 'seconds', '_started', '_last')
+
+    def __init__(self, operation: str, params: Dict[str, Any] = None):
+        self.operation = operation
+        self.params = params or {}
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.posting_sizes: List[int] = []
+        self.cache_hit: Optional[bool] = None
+        self.seconds: Optional[float] = None
+        self._started = self._last = time.perf_counter()
+
+    def mark(self, stage: str):
+        """Close `stage`, the time since the previous mark (or the start) is added to it"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def count(self, name: str, value: int):
+        self.counts[name] = int(value)
+
+    def finish(self, num_results: int = None):
+        self.seconds = time.perf_counter() - self._started
+        if num_results is not None:
+            self.counts['results'] = int(num_results)
+
+    def as_dict(self) -> Dict:
+        return {
+            'operation': self.operation,
+            'params': self.params,
+            'seconds': self.seconds,
+            'stages': dict(self.stages),
+            'counts': dict(self.counts),
+            'posting_sizes': list(self.posting_sizes),
+            'cache_hit': self.cache_hit,
+        }
+
+
+def percentile_summary(values: Iterable[float], percentiles: Iterable[int] = PERCENTILES) -> Dict[str, float]:
+    """`{'p50': ..., 'max': ...}` of `values`, empty without values"""
+    values = np.fromiter(values, dtype=np.float64)
+    if not len(values):
+        return {}
+    summary = {f'p{percentile}': float(np.percentile(values, percentile)) for percentile in percentiles}
+    summary['max'] = float(values.max())
+    return summary
+
+
+class QueryStats(object):
+    """
+    Instrumentation hook aggregating traces, keeps the last `window` traces
+    of every operation for rolling percentiles of the call time, every stage
+    and every count.
+
+        stats = QueryStats(window=1000)
+        geo_manager = GeoManager(instrumentation=stats)
+        ...
+        stats.summary()['fuzzy_search']['stages']['merge']['p99']
+    """
+    def __init__(self, window: int = 1000):
+        if window <= 0:
+            raise ValueError(f'Query stats window must be positive, window={window}')
+        self.window = window
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._traces: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+
+    def __call__(self, trace: QueryTrace):
+        with self._lock:
+            self.calls[trace.operation] += 1
+            self._traces[trace.operation].append(trace)
+
+    def traces(self, operation: str) -> List[QueryTrace]:
+        """Traces of `operation` in the window, oldest first"""
+        with self._lock:
+            return list(self._traces.get(operation, ()))
+
+    def percentiles(self,
+                    operation: str,
+                    metric: str = 'seconds',
+                    percentiles: Iterable[int] = PERCENTILES) -> Dict[str, float]:
+        """
+        Rolling percentiles of `operation` for `metric`, `seconds` (call
+        time), a stage name (seconds) or a count name.  Traces without the
+        stage or count are skipped.
+        """
+        traces = self.traces(operation)
+        if metric == 'seconds':
+            values = (trace.seconds for trace in traces)
+        else:
+            values = (
+                trace.stages[metric] if metric in trace.stages else trace.counts[metric]
+                for trace in traces if metric in trace.stages or metric in trace.counts
+            )
+        return percentile_summary(values, percentiles)
+
+    def summary(self, percentiles: Iterable[int] = PERCENTILES) -> Dict[str, Dict]:
+        """Calls, cache hits and rolling percentiles of the call time, stages and counts per operation"""
+        with self._lock:
+            operations = {operation: list(traces) for operation, traces in self._traces.items()}
+            calls = dict(self.calls)
+        summary = {}
+        for operation, traces in operations.items():
+            stages = sorted({stage for trace in traces for stage in trace.stages})
+            counts = sorted({name for trace in traces for name in trace.counts})
+            summary[operation] = {
+                'calls': calls[operation],
+                'window': len(traces),
+                'cache_hits': sum(1 for trace in traces if trace.cache_hit),
+                'seconds': percentile_summary((trace.seconds for trace in traces), percentiles),
+                'stages': {
+                    stage: percentile_summary(
+                        (trace.stages[stage] for trace in traces if stage in trace.stages), percentiles
+                    )
+                    for stage in stages
+                },
+                'counts': {
+                    name: percentile_summary(
+                        (trace.counts[name] for trace in traces if name in trace.counts), percentiles
+                    )
+                    for name in counts
+                },
+            }
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self._traces.clear()
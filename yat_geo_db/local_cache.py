@@ -0,0 +1,202 @@
+"""
+Local cache of Geo Database Dump files
+
+Files are stored gzip compressed next to `cache_meta.json`, which records for
+every file the ETag and Last-Modified validators of its download and a sha256
+of the stored bytes.  Downloads are written to a staging directory and moved
+into place with `os.replace` (meta last), so readers never see a partially
+written file, and reads verify the checksum.  Caches written by earlier
+versions (plain JSON, no meta) are still read.
+"""
+from .stream import GZIP_WBITS, inflate_chunks, iter_file_chunks
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import zlib
+from typing import BinaryIO, Dict, Iterator, Mapping, Optional
+
+CACHE_META_FILE_NAME = 'cache_meta.json'
+CACHE_COMPRESS_LEVEL = 6
+
+
+class CacheChecksumError(ValueError):
+    """Cached file does not match the checksum recorded in the cache meta"""
+
+
+def verified_chunks(f: BinaryIO, sha256: str, file_name: str) -> Iterator[bytes]:
+    """Chunks of `f`, raises `CacheChecksumError` at the end on a checksum mismatch"""
+    digest = hashlib.sha256()
+    for chunk in iter_file_chunks(f):
+        digest.update(chunk)
+        yield chunk
+    if digest.hexdigest() != sha256:
+        raise CacheChecksumError(f'Checksum mismatch for cached file={file_name}')
+
+
+class CacheFileWriter(object):
+    """Gzip file written from downloaded chunks, compressing them unless already compressed"""
+    def __init__(self, path: str, compressed: bool):
+        self.f = open(path, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self._compressor = None if compressed else zlib.compressobj(CACHE_COMPRESS_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+
+    def _write(self, data: bytes):
+        if data:
+            self.f.write(data)
+            self.digest.update(data)
+            self.size += len(data)
+
+    def write(self, chunk: bytes):
+        self._write(chunk if self._compressor is None else self._compressor.compress(chunk))
+
+    def close(self):
+        if self._compressor is not None:
+            self._write(self._compressor.flush())
+            self._compressor = None
+        self.f.close()
+
+
+class LocalCache(object):
+    """Cache of one Geo Database Dump version in the directory `path`"""
+    def __init__(self, path: str):
+        self.path = path
+        self.meta = self._read_meta()
+        self.staging_path = None
+        self._staged: Dict[str, Dict] = {}
+
+    def _read_meta(self) -> Dict:
+        try:
+            with open(os.path.join(self.path, CACHE_META_FILE_NAME), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {'files': {}}
+        if not isinstance(meta.get('files'), dict):
+            return {'files': {}}
+        return meta
+
+    def entry(self, file_name: str) -> Optional[Dict]:
+        """Meta of a cached file, None when it is not cached with meta"""
+        entry = self.meta['files'].get(file_name)
+        if entry is not None and os.path.exists(os.path.join(self.path, entry['cache_file'])):
+            return entry
+        return None
+
+    def contains(self, file_name: str) -> bool:
+        """Whether a file is staged or cached, with meta or as plain JSON of earlier versions"""
+        return (
+            file_name in self._staged or self.entry(file_name) is not None or
+            os.path.exists(os.path.join(self.path, file_name))
+        )
+
+    def checksums(self) -> Optional[Dict[str, str]]:
+        """Checksum of every cached file, None for caches without meta"""
+        checksums = {file_name: entry['sha256'] for file_name, entry in self.meta['files'].items()}
+        return checksums or None
+
+    def conditional_headers(self, file_name: str, remote_file_name: str) -> Dict[str, str]:
+        """Request headers that let the store answer 304 Not Modified for a cached file"""
+        entry = self.entry(file_name)
+        if entry is None or entry.get('remote_file') != remote_file_name:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @contextmanager
+    def stage(self) -> Iterator['LocalCache']:
+        """
+        Staging directory for `write`, staged files are moved into the cache
+        once the block completes and dropped if it raises
+        """
+        parent_path = os.path.dirname(self.path)
+        Path(parent_path).mkdir(parents=True, exist_ok=True)
+        self.staging_path = tempfile.mkdtemp(prefix='.staging-', dir=parent_path)
+        try:
+            yield self
+            self._commit()
+        finally:
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+            self.staging_path = None
+            self._staged = {}
+
+    def _commit(self):
+        if not self._staged:
+            return
+        Path(self.path).mkdir(parents=True, exist_ok=True)
+        for file_name, entry in self._staged.items():
+            os.replace(os.path.join(self.staging_path, entry['cache_file']), os.path.join(self.path, entry['cache_file']))
+            # Uncompressed copy from an earlier version
+            legacy_path = os.path.join(self.path, file_name)
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+        self.meta['files'].update(self._staged)
+        self.meta['updated_at'] = datetime.now(timezone.utc).isoformat()
+        meta_path = os.path.join(self.staging_path, CACHE_META_FILE_NAME)
+        with open(meta_path, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(meta_path, os.path.join(self.path, CACHE_META_FILE_NAME))
+
+    @contextmanager
+    def write(self,
+              file_name: str,
+              remote_file_name: str,
+              compressed: bool,
+              response_headers: Mapping[str, str]) -> Iterator[CacheFileWriter]:
+        """Writer for a downloaded file, staged once the block completes"""
+        if self.staging_path is None:
+            raise ValueError('LocalCache.write is only available within `stage`')
+        cache_file = f'{file_name}.gz'
+        writer = CacheFileWriter(os.path.join(self.staging_path, cache_file), compressed)
+        try:
+            yield writer
+        finally:
+            writer.close()
+        self._staged[file_name] = {
+            'cache_file': cache_file,
+            'remote_file': remote_file_name,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'sha256': writer.digest.hexdigest(),
+            'size': writer.size,
+            'fetched_at': datetime.now(timezone.utc).isoformat(),
+        }
+
+    @contextmanager
+    def read(self, file_name: str) -> Iterator[Iterator[bytes]]:
+        """
+        Uncompressed chunks of a cached file, a staged download takes
+        precedence, the checksum is verified once the file is read
+        """
+        entry = self._staged.get(file_name)
+        directory = self.staging_path
+        if entry is None:
+            entry = self.entry(file_name)
+            directory = self.path
+        if entry is None:
+            # Plain JSON cache written by earlier versions
+            with open(os.path.join(self.path, file_name), 'rb') as f:
+                yield iter_file_chunks(f)
+            return
+        with open(os.path.join(directory, entry['cache_file']), 'rb') as f:
+            chunks = verified_chunks(f, entry['sha256'], file_name)
+            try:
+                yield inflate_chunks(chunks)
+            except CacheChecksumError:
+                raise
+            except Exception:
+                # A corrupted file usually fails to inflate or parse first, report the checksum
+                for _ in chunks:
+                    pass
+                raise
+            for _ in chunks:
+                pass
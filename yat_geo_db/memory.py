@@ -0,0 +1,237 @@
+"""
+Memory accounting of loaded structures
+"""
+from .snapshot import SnapshotShapeDict
+
+from array import array
+from collections import defaultdict, deque
+import mmap
+import numpy as np
+import sys
+import types
+from typing import Dict, List, Tuple
+
+
+# Counted without walking their references, as are callables (bound methods and
+# lru_cache wrappers lead back to their owner)
+LEAF_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), array, mmap.mmap, types.ModuleType)
+EXACT_LEAF_TYPES = frozenset(LEAF_TYPES)
+# Dataset fields in walk order, structures built over others (views, partitions)
+# come after them so shared objects are counted where they are owned
+STRUCTURE_FIELDS = (
+    'geo_shape_dict',
+    'shape_reference_codes',
+    'shape_position_map',
+    'id_reference_code_map',
+    'radius_search_map',
+    'radius_shape_ls',
+    'shape_clean_values',
+    'ngram_index',
+    'search_dict',
+    'shape_columns',
+    'spatial_index',
+    'attribute_index',
+    'prefix_index',
+    'partition_index',
+)
+# Shape keyed dicts whose entries are attributed to the geo type of the shape
+PER_SHAPE_FIELDS = ('geo_shape_dict',)
+
+
+class MemoryWalker(object):
+    """
+    Deep size of objects, every object is counted once across all calls so
+    a structure only reports bytes no earlier structure reached.  Numpy
+    arrays count their data once per base array, data of memory-mapped
+    arrays is reported as `mapped` (shared page cache) rather than heap.
+    """
+    def __init__(self):
+        self.seen = set()
+
+    def size(self, obj) -> Tuple[int, int]:
+        """`(heap_bytes, mapped_bytes)` of `obj` and everything it references not counted yet"""
+        heap = mapped = 0
+        stack = [obj]
+        seen = self.seen
+        getsizeof = sys.getsizeof
+        while stack:
+            obj = stack.pop()
+            obj_id = id(obj)
+            if obj_id in seen:
+                continue
+            seen.add(obj_id)
+            # Exact type checks first, shape records are mostly dicts of strings and numbers
+            obj_type = type(obj)
+            if obj_type in EXACT_LEAF_TYPES:
+                heap += getsizeof(obj)
+            elif obj_type is dict:
+                heap += getsizeof(obj)
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, LEAF_TYPES) or callable(obj):
+                heap += getsizeof(obj)
+            elif isinstance(obj, np.ndarray):
+                obj_heap, obj_mapped = self.array_size(obj)
+                heap += obj_heap
+                mapped += obj_mapped
+                if obj.dtype == object:
+                    stack.extend(obj.ravel().tolist())
+            elif isinstance(obj, dict):
+                heap += sys.getsizeof(obj)
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+                heap += sys.getsizeof(obj)
+                stack.extend(obj)
+            else:
+                heap += sys.getsizeof(obj)
+                stack.extend(attribute_values(obj))
+        return heap, mapped
+
+    def array_size(self, values: np.ndarray) -> Tuple[int, int]:
+        """Header of `values` plus the data of its base array if not counted yet"""
+        root = base_array(values)
+        header = sys.getsizeof(values) if root is not values or root.base is not None else 0
+        if root is not values:
+            if id(root) in self.seen:
+                return header, 0
+            self.seen.add(id(root))
+        if is_mapped(root):
+            return header, root.nbytes
+        if root.base is not None:
+            # Wraps a buffer owned by another object (bytes, array)
+            return header + root.nbytes, 0
+        return header + sys.getsizeof(root), 0
+
+
+def attribute_values(obj) -> list:
+    """Instance `__dict__` and values of `__slots__`"""
+    values = [obj.__dict__] if hasattr(obj, '__dict__') else []
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if slot not in ('__dict__', '__weakref__') and hasattr(obj, slot):
+                values.append(getattr(obj, slot))
+    return values
+
+
+def base_array(values: np.ndarray) -> np.ndarray:
+    """Array owning the data `values` views"""
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
+def is_mapped(values: np.ndarray) -> bool:
+    """Whether the data of `values` is a memory-mapped file"""
+    root = base_array(values)
+    return isinstance(root, np.memmap) or isinstance(root.base, mmap.mmap)
+
+
+def shape_geo_types(dataset) -> List:
+    """Geo type of every shape position, from the attribute index where it covers the shape"""
+    geo_types = []
+    attribute_index = dataset.attribute_index
+    if attribute_index is not None and 'geo_type' in attribute_index.codes:
+        values = attribute_index.values['geo_type']
+        geo_types = [values[code] for code in attribute_index.codes['geo_type'].tolist()]
+    reference_codes = dataset.shape_reference_codes or []
+    for position in range(len(geo_types), len(reference_codes)):
+        geo_types.append((dataset.geo_shape_dict.get(reference_codes[position]) or {}).get('geo_type'))
+    return geo_types
+
+
+def dataset_memory_report(dataset, largest_postings: int = 10, shared: bool = False) -> Dict:
+    """
+    Bytes of every structure of a loaded dataset, see `GeoManager.memory_report`
+    """
+    walker = MemoryWalker()
+    geo_types = shape_geo_types(dataset)
+    position_map = dataset.shape_position_map or {}
+    geo_type_bytes = defaultdict(lambda: {'shapes': 0, 'bytes': 0, 'mapped_bytes': 0})
+    for geo_type in geo_types:
+        geo_type_bytes[str(geo_type)]['shapes'] += 1
+
+    structures = {}
+    partitions = {}
+    for name in STRUCTURE_FIELDS:
+        value = getattr(dataset, name)
+        if value is None:
+            continue
+        heap = mapped = 0
+        if name in PER_SHAPE_FIELDS and isinstance(value, dict):
+            heap += sys.getsizeof(value)
+            walker.seen.add(id(value))
+            for reference_code, item in value.items():
+                key_heap, key_mapped = walker.size(reference_code)
+                item_heap, item_mapped = walker.size(item)
+                position = position_map.get(reference_code)
+                entry = geo_type_bytes[str(geo_types[position] if position is not None else None)]
+                entry['bytes'] += key_heap + item_heap
+                entry['mapped_bytes'] += key_mapped + item_mapped
+                heap += key_heap + item_heap
+                mapped += key_mapped + item_mapped
+        elif name == 'geo_shape_dict' and isinstance(value, SnapshotShapeDict):
+            # Encoded records, decoded on access
+            record_sizes = np.diff(value.records.offsets).tolist()
+            key = 'mapped_bytes' if is_mapped(value.records.data) else 'bytes'
+            for geo_type, record_size in zip(geo_types, record_sizes):
+                geo_type_bytes[str(geo_type)][key] += record_size
+        elif name == 'partition_index':
+            for partition_value, partition in value.items():
+                partition_heap, partition_mapped = walker.size(partition)
+                partitions[str(partition_value)] = {
+                    'shapes': len(partition.all_positions()),
+                    'bytes': partition_heap,
+                    'mapped_bytes': partition_mapped,
+                }
+                heap += partition_heap
+                mapped += partition_mapped
+        value_heap, value_mapped = walker.size(value)
+        structures[name] = {'bytes': heap + value_heap, 'mapped_bytes': mapped + value_mapped}
+        if shared:
+            # Also reached through structures counted earlier, for example the
+            # position lookup read by the radius search map
+            structures[name]['shared_bytes'] = sum(MemoryWalker().size(value)) - sum(structures[name].values())
+
+    ngram_index = dataset.ngram_index
+    postings = []
+    if ngram_index is not None and largest_postings:
+        itemsize = ngram_index.postings.dtype.itemsize
+        postings = [
+            {'ngram': ngram, 'postings': size, 'bytes': size * itemsize}
+            for ngram, size in ngram_index.largest_postings(largest_postings)
+        ]
+    return {
+        'data_version': dataset.data_version,
+        'num_shapes': len(dataset.shape_reference_codes or ()),
+        'total_bytes': sum(structure['bytes'] for structure in structures.values()),
+        'mapped_bytes': sum(structure['mapped_bytes'] for structure in structures.values()),
+        'structures': structures,
+        'geo_types': dict(geo_type_bytes),
+        'partitions': partitions,
+        'largest_posting_lists': postings,
+    }
+
+
+def compare_memory_reports(before: Dict, after: Dict) -> Dict:
+    """
+    Change between two `memory_report` results, `before`, `after` and
+    `change` bytes of the totals and of every structure, geo type and
+    partition in either report
+    """
+    def change(before_bytes: int, after_bytes: int) -> Dict[str, int]:
+        return {'before': before_bytes, 'after': after_bytes, 'change': after_bytes - before_bytes}
+
+    comparison = {
+        'total_bytes': change(before['total_bytes'], after['total_bytes']),
+        'mapped_bytes': change(before['mapped_bytes'], after['mapped_bytes']),
+    }
+    for section in ('structures', 'geo_types', 'partitions'):
+        before_section, after_section = before.get(section) or {}, after.get(section) or {}
+        comparison[section] = {
+            name: change(
+                before_section.get(name, {}).get('bytes', 0), after_section.get(name, {}).get('bytes', 0)
+            )
+            for name in list(before_section) + [name for name in after_section if name not in before_section]
+        }
+    return comparison
@@ -0,0 +1,364 @@
+"""
+Compact n-gram posting lists for Fuzzy Search
+"""
+from .instrumentation import QueryTrace
+from .tables import SortedLookup
+
+from array import array
+from collections.abc import Mapping
+from itertools import repeat
+import logging
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Postings converted to positions per array while building from a search file
+POSITION_BATCH_SIZE = 1 << 16
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """
+    Sorted distinct values, `np.unique` without the return options hashes
+    (numpy 2) which is many times slower than a sort on large int arrays
+    """
+    values = np.sort(values)
+    if len(values):
+        values = values[np.concatenate([[True], values[1:] != values[:-1]])]
+    return values
+
+
+def rank_candidates(positions: np.ndarray,
+                    first_index: np.ndarray,
+                    counts: np.ndarray,
+                    hits: np.ndarray,
+                    limit: int,
+                    keep: Callable[[np.ndarray], np.ndarray] = None,
+                    trace: QueryTrace = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Candidates by descending posting count, ties by first posting index, up to
+    `limit` of the candidates `keep` allows
+    """
+    order = np.lexsort((first_index, -counts))
+    if trace is not None:
+        trace.mark('rank')
+    if keep is not None:
+        order = order[keep(positions[order])]
+        if trace is not None:
+            trace.count('indexed_candidates', len(order))
+            trace.mark('indexed_filter')
+    order = order[:limit]
+    return positions[order], counts[order], hits[order]
+
+
+class NgramIndex(object):
+    """
+    Posting lists of dense shape positions per n-gram, stored as one int32
+    array with int64 offsets (CSR).  N-grams are interned to integer ids.
+    Postings keep their source order so ties in candidate ranking resolve
+    as `Counter.most_common` did over the original lists.  Postings added
+    after the build go to per n-gram `array('i')` buffers, so inserts are
+    amortized O(1), every insert bumps `version`.
+
+    `ngram_counts` holds the number of distinct n-grams posted for every
+    shape, which together with the distinct hits of a query gives the Tversky
+    index without rebuilding n-gram sets.  A count of -1 marks a shape whose
+    postings no longer describe a single value (re-added entity).
+    """
+    def __init__(self,
+                 ngram_ids: Mapping,
+                 offsets: np.ndarray,
+                 postings: np.ndarray,
+                 ngram_counts: np.ndarray,
+                 has_duplicates: bool):
+        self.ngram_ids = ngram_ids
+        self.offsets = offsets
+        self.postings = postings
+        self.ngram_counts = ngram_counts
+        self.has_duplicates = has_duplicates
+        self._added_ngram_ids: Dict[str, int] = {}
+        self._added: Dict[int, array] = {}
+        self._added_counts: Dict[int, int] = {}
+        # Bumped by every added posting, incremental readers compare it
+        self.version = 0
+
+    @classmethod
+    def from_search_dict(cls, search_dict: Mapping, position_map: Mapping, num_shapes: int):
+        """
+        Build from `{ngram: [reference_code, ...]}`, postings without a shape
+        position are dropped
+        """
+        return cls.from_items(search_dict.items(), position_map, num_shapes)
+
+    @classmethod
+    def from_items(cls,
+                   items: Iterable[Tuple[str, List[str]]],
+                   position_map: Mapping,
+                   num_shapes: int,
+                   missing_ok: bool = False):
+        """
+        Build from `(ngram, [reference_code, ...])` pairs, for example streamed
+        from a search file, lists are converted to positions in batches as
+        they arrive.
+        Postings without a shape position are dropped, with a warning unless
+        `missing_ok` (only some shapes were loaded).
+        """
+        ngram_ids = {}
+        lengths = []
+        chunks = []
+        buffer = []
+        missing = repeat(-1)
+        for ngram, reference_codes in items:
+            ngram_ids[ngram] = len(lengths)
+            lengths.append(len(reference_codes))
+            buffer.extend(map(position_map.get, reference_codes, missing))
+            if len(buffer) >= POSITION_BATCH_SIZE:
+                chunks.append(np.array(buffer, dtype=np.int32))
+                buffer = []
+        chunks.append(np.array(buffer, dtype=np.int32))
+        postings = np.concatenate(chunks)
+
+        lengths = np.array(lengths, dtype=np.int64)
+        found = postings >= 0
+        if not found.all():
+            dropped = int((~found).sum())
+            ngram_of = np.repeat(np.arange(len(lengths)), lengths)
+            lengths = np.bincount(ngram_of[found], minlength=len(lengths))
+            postings = postings[found]
+            if not missing_ok:
+                logger.warning(f'[NgramIndex] Dropped {dropped} postings without a shape record')
+
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        ngram_counts, has_duplicates = cls.count_ngrams(offsets, postings, num_shapes)
+        return cls(
+            ngram_ids=ngram_ids, offsets=offsets, postings=postings.astype(np.int32),
+            ngram_counts=ngram_counts, has_duplicates=has_duplicates
+        )
+
+    @classmethod
+    def from_values(cls, values: Sequence[str], n: int = 3):
+        """
+        Build from the clean value of every shape position in one sort based
+        pass, the postings the search file holds (every n-gram occurrence in
+        position order, n-grams numbered by first occurrence) without reading it
+        """
+        if not 0 < n <= 3:
+            raise ValueError(f'N-gram keys hold up to 3 characters, n={n}')
+        num_shapes = len(values)
+        lengths = np.fromiter((len(value) for value in values), dtype=np.int64, count=num_shapes)
+        text = ''.join(values)
+        # Code points, an n-gram key packs n 21 bit code points into an int64
+        chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+
+        ngram_nums = np.maximum(lengths - n + 1, 0)
+        total = int(ngram_nums.sum())
+        value_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if num_shapes else lengths
+        ngram_starts = np.cumsum(ngram_nums) - ngram_nums
+        positions = np.repeat(np.arange(num_shapes, dtype=np.int32), ngram_nums)
+        starts = np.repeat(value_starts - ngram_starts, ngram_nums) + np.arange(total, dtype=np.int64)
+        keys = np.zeros(total, dtype=np.int64)
+        for offset in range(n):
+            keys = (keys << 21) | chars[starts + offset]
+
+        # N-gram ids by first occurrence, postings grouped by id in occurrence order
+        unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        id_of_key = np.empty(len(unique_keys), dtype=np.int64)
+        id_of_key[np.argsort(first_index, kind='stable')] = np.arange(len(unique_keys))
+        ids = id_of_key[inverse.reshape(-1)]
+        postings = positions[np.argsort(ids, kind='stable')]
+        offsets = np.zeros(len(unique_keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ids, minlength=len(unique_keys)), out=offsets[1:])
+
+        ngram_ids = {}
+        for start in starts[np.sort(first_index)].tolist():
+            ngram_ids[text[start:start + n]] = len(ngram_ids)
+        ngram_counts, has_duplicates = cls.count_ngrams(offsets, postings, num_shapes)
+        return cls(
+            ngram_ids=ngram_ids, offsets=offsets, postings=postings,
+            ngram_counts=ngram_counts, has_duplicates=has_duplicates
+        )
+
+    @staticmethod
+    def count_ngrams(offsets: np.ndarray, postings: np.ndarray, num_shapes: int) -> Tuple[np.ndarray, bool]:
+        """
+        Distinct n-grams per shape position and whether any posting list
+        repeats a position
+        """
+        ngram_of = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+        pairs = sorted_unique(ngram_of * max(num_shapes, 1) + postings)
+        ngram_counts = np.bincount(pairs % max(num_shapes, 1), minlength=num_shapes).astype(np.int32)
+        return ngram_counts, len(pairs) != len(postings)
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]):
+        """Rebuild from `to_arrays` output, arrays may be memory-mapped"""
+        return cls(
+            ngram_ids=SortedLookup(arrays['ngram_keys'], arrays['ngram_ids']),
+            offsets=arrays['offsets'],
+            postings=arrays['postings'],
+            ngram_counts=arrays['ngram_counts'],
+            has_duplicates=bool(arrays['has_duplicates'][0]),
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Index as named arrays, with added postings merged in"""
+        ngram_ls = list(self)
+        chunks = [self.get_postings(ngram) for ngram in ngram_ls]
+        offsets = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in chunks], out=offsets[1:])
+        lookup = SortedLookup.from_keys(ngram_ls)
+        ngram_counts = self.ngram_counts
+        if self._added_counts:
+            size = max(len(ngram_counts), max(self._added_counts) + 1)
+            ngram_counts = np.concatenate([ngram_counts, np.zeros(size - len(ngram_counts), dtype=np.int32)])
+            for position, count in self._added_counts.items():
+                ngram_counts[position] = count
+        return {
+            'ngram_keys': lookup.keys_array,
+            'ngram_ids': lookup.positions,
+            'offsets': offsets,
+            'postings': np.concatenate(chunks).astype(np.int32) if chunks else np.empty(0, dtype=np.int32),
+            'ngram_counts': ngram_counts,
+            'has_duplicates': np.array([self.has_duplicates]),
+        }
+
+    def __iter__(self):
+        yield from self.ngram_ids
+        yield from self._added_ngram_ids
+
+    def __len__(self):
+        return len(self.ngram_ids) + len(self._added_ngram_ids)
+
+    def __contains__(self, ngram):
+        return self.ngram_id(ngram) is not None
+
+    def ngram_id(self, ngram: str) -> Optional[int]:
+        ngram_id = self.ngram_ids.get(ngram)
+        if ngram_id is None:
+            ngram_id = self._added_ngram_ids.get(ngram)
+        return ngram_id
+
+    def get_postings(self, ngram: str) -> np.ndarray:
+        """Shape positions for an n-gram, empty if unknown"""
+        ngram_id = self.ngram_id(ngram)
+        if ngram_id is None:
+            return np.empty(0, dtype=np.int32)
+        if ngram_id < len(self.offsets) - 1:
+            postings = self.postings[self.offsets[ngram_id]:self.offsets[ngram_id + 1]]
+        else:
+            postings = np.empty(0, dtype=np.int32)
+        added = self._added.get(ngram_id)
+        if added:
+            postings = np.concatenate([postings, np.frombuffer(added, dtype=np.int32)])
+        return postings
+
+    def add(self, ngram: str, position: int):
+        """Append a shape position to an n-gram's posting list"""
+        ngram_id = self.ngram_id(ngram)
+        if ngram_id is None:
+            ngram_id = len(self)
+            self._added_ngram_ids[ngram] = ngram_id
+        self._added.setdefault(ngram_id, array('i')).append(position)
+        self.version += 1
+
+    def add_shape(self, position: int, ngram_ls: Sequence[str]):
+        """
+        Post every n-gram of a shape value, repeated n-grams are posted once
+        per occurrence
+        """
+        readded = position < len(self.ngram_counts) or position in self._added_counts
+        for ngram in ngram_ls:
+            self.add(ngram, position)
+        if readded or len(set(ngram_ls)) != len(ngram_ls):
+            self.has_duplicates = True
+        self._added_counts[position] = -1 if readded else len(set(ngram_ls))
+
+    def ngram_counts_at(self, positions: np.ndarray) -> np.ndarray:
+        """Distinct n-grams per shape position, -1 where unknown"""
+        positions = np.asarray(positions, dtype=np.int64)
+        in_base = positions < len(self.ngram_counts)
+        counts = np.full(len(positions), -1, dtype=np.int64)
+        counts[in_base] = self.ngram_counts[positions[in_base]]
+        if self._added_counts:
+            for index, position in enumerate(positions.tolist()):
+                if position in self._added_counts:
+                    counts[index] = self._added_counts[position]
+        return counts
+
+    def largest_postings(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """The `limit` longest posting lists as `(ngram, size)`, longest first"""
+        sizes = np.zeros(len(self), dtype=np.int64)
+        base_sizes = np.diff(self.offsets)
+        sizes[:len(base_sizes)] = base_sizes
+        for ngram_id, added in self._added.items():
+            sizes[ngram_id] += len(added)
+        top_ids = np.argsort(-sizes, kind='stable')[:limit].tolist()
+        wanted = set(top_ids)
+        ngram_of = {
+            ngram_id: ngram
+            for ngram_ids in (self.ngram_ids, self._added_ngram_ids) for ngram, ngram_id in ngram_ids.items()
+            if ngram_id in wanted
+        }
+        return [(ngram_of[ngram_id], int(sizes[ngram_id])) for ngram_id in top_ids]
+
+    def top_candidates(self,
+                       ngram_ls: Sequence[str],
+                       limit: int,
+                       keep: Callable[[np.ndarray], np.ndarray] = None,
+                       trace: QueryTrace = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Shape positions hit most often by the distinct n-grams, up to `limit`,
+        ordered like `Counter(<flattened postings>).most_common(limit)`.
+        `keep` maps positions to a mask of positions eligible as candidates.
+        A `trace` records the posting lists touched, candidate counts and the
+        time of the postings, merge, rank and indexed filter stages.
+
+        Returns `(positions, counts, hits)`, `hits` is the number of distinct
+        query n-grams posted for each position
+        """
+        chunks = [self.get_postings(ngram) for ngram in dict.fromkeys(ngram_ls)]
+        chunks = [chunk for chunk in chunks if len(chunk)]
+        if trace is not None:
+            trace.posting_sizes = [len(chunk) for chunk in chunks]
+            trace.count('posting_lists', len(chunks))
+            trace.count('postings', sum(trace.posting_sizes))
+            trace.mark('postings')
+        if not chunks:
+            empty = np.empty(0, dtype=np.int64)
+            return np.empty(0, dtype=np.int32), empty, empty
+        positions, first_index, inverse, counts = np.unique(
+            np.concatenate(chunks), return_index=True, return_inverse=True, return_counts=True
+        )
+        if self.has_duplicates:
+            chunk_of = np.repeat(np.arange(len(chunks)), [len(chunk) for chunk in chunks])
+            pairs = sorted_unique(inverse.astype(np.int64) * len(chunks) + chunk_of)
+            hits = np.bincount(pairs // len(chunks), minlength=len(positions))
+        else:
+            hits = counts
+        if trace is not None:
+            trace.count('candidates', len(positions))
+            trace.mark('merge')
+        return rank_candidates(positions, first_index, counts, hits, limit, keep, trace=trace)
+
+
+class SearchDictView(Mapping):
+    """
+    Read-only `{ngram: [reference_code, ...]}` view of an `NgramIndex`, keeps
+    `search_dict` available without holding Python lists of strings
+    """
+    def __init__(self, ngram_index: NgramIndex, reference_codes: Sequence[str]):
+        self.ngram_index = ngram_index
+        self.reference_codes = reference_codes
+
+    def __getitem__(self, ngram) -> List[str]:
+        if ngram not in self.ngram_index:
+            raise KeyError(ngram)
+        return [self.reference_codes[position] for position in self.ngram_index.get_postings(ngram)]
+
+    def __iter__(self):
+        return iter(self.ngram_index)
+
+    def __len__(self):
+        return len(self.ngram_index)
@@ -0,0 +1,169 @@
+"""
+Per partition indexes, shapes split by the value of one filter key
+
+Every partition (a country, a geo type, ...) has its own n-gram posting lists
+and spatial index.  Both hold the global shape positions of the partition's
+shapes and share the n-gram ids, n-gram counts and coordinate columns of the
+full indexes, so a query routed to a partition reads only that partition's
+postings and grid cells and is scored exactly as an unpartitioned query.
+"""
+from .attributes import AttributeIndex
+from .ngram_index import NgramIndex
+from .spatial import SpatialIndex
+
+from array import array
+from collections.abc import Mapping
+import numpy as np
+from typing import Any, Dict, Iterable, Sequence
+
+
+class Partition(object):
+    """Shape positions of one partition value with their n-gram and spatial indexes"""
+    def __init__(self, value: Any, positions: np.ndarray, ngram_index: NgramIndex, spatial_index: SpatialIndex):
+        self.value = value
+        self.positions = positions
+        self.ngram_index = ngram_index
+        self.spatial_index = spatial_index
+        # Positions of entities added after the build, not in the spatial index
+        self._added = array('q')
+        self._added_set = set()
+
+    def __len__(self):
+        return len(self.positions) + len(self._added)
+
+    def all_positions(self) -> np.ndarray:
+        """Sorted positions of the partition, added entities included"""
+        if not self._added:
+            return self.positions
+        return np.union1d(self.positions, np.frombuffer(self._added, dtype=np.int64))
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        """Mask of `positions` in the partition"""
+        return np.isin(np.asarray(positions, dtype=np.int64), self.all_positions())
+
+    def add_shape(self, position: int, ngram_ls: Sequence[str]):
+        """Post an added entity's n-grams, as `NgramIndex.add_shape`"""
+        index = int(np.searchsorted(self.positions, position))
+        built = index < len(self.positions) and self.positions[index] == position
+        if not built and position not in self._added_set:
+            self._added.append(position)
+            self._added_set.add(position)
+        self.ngram_index.add_shape(position, ngram_ls)
+
+
+def split_postings(ngram_index: NgramIndex, codes: np.ndarray, num_codes: int) -> Dict[int, NgramIndex]:
+    """
+    N-gram index per code of `codes` (one code per shape position) from the
+    built postings of `ngram_index`, postings keep their source order
+    """
+    postings = ngram_index.postings
+    num_ngrams = len(ngram_index.offsets) - 1
+    ngram_of = np.repeat(np.arange(num_ngrams, dtype=np.int64), np.diff(ngram_index.offsets))
+    posting_codes = codes[postings]
+    order = np.argsort(posting_codes, kind='stable')
+    bounds = np.searchsorted(posting_codes[order], np.arange(num_codes + 1))
+    indexes = {}
+    for code in range(num_codes):
+        selected = order[bounds[code]:bounds[code + 1]]
+        offsets = np.zeros(num_ngrams + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ngram_of[selected], minlength=num_ngrams), out=offsets[1:])
+        indexes[code] = NgramIndex(
+            ngram_ids=ngram_index.ngram_ids,
+            offsets=offsets,
+            postings=postings[selected],
+            ngram_counts=ngram_index.ngram_counts,
+            has_duplicates=ngram_index.has_duplicates,
+        )
+    return indexes
+
+
+class PartitionIndex(Mapping):
+    """
+    Partitions by value of the filter key `key` (`get_key` syntax, for
+    example `ref_data.country` or `geo_type`).  Looking up a value that was
+    not loaded gives an empty partition, so queries on it return nothing.
+    """
+    def __init__(self, key: str, partitions: Dict[Any, Partition], ngram_index: NgramIndex, shape_columns):
+        self.key = key
+        self.partitions = partitions
+        self._ngram_index = ngram_index
+        self._shape_columns = shape_columns
+        self._empty = None
+
+    @classmethod
+    def build(cls,
+              key: str,
+              records: Iterable[Dict],
+              ngram_index: NgramIndex,
+              shape_columns,
+              attribute_index: AttributeIndex = None,
+              values: Iterable = None):
+        """
+        Split the built indexes by partition value, `values` limits the
+        partitions built.  Partition values come from the attribute index
+        when it covers `key`, from `records` otherwise.
+        """
+        if attribute_index is None or key not in attribute_index:
+            attribute_index = AttributeIndex.from_records(records, keys=(key,))
+            if key not in attribute_index:
+                raise ValueError(f'Partition key={key} has values that can not be indexed')
+        codes = attribute_index.codes[key].astype(np.int64)
+        key_values = attribute_index.values[key]
+        values = None if values is None else set(values)
+
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(key_values) + 1))
+        ngram_indexes = split_postings(ngram_index, codes, len(key_values))
+        partitions = {}
+        for code, value in enumerate(key_values):
+            if values is not None and value not in values:
+                continue
+            positions = order[bounds[code]:bounds[code + 1]]
+            partitions[value] = Partition(
+                value=value,
+                positions=positions,
+                ngram_index=ngram_indexes[code],
+                spatial_index=SpatialIndex.from_columns(shape_columns, positions=positions),
+            )
+        return cls(key, partitions, ngram_index, shape_columns)
+
+    def _new_partition(self, value: Any) -> Partition:
+        num_ngrams = len(self._ngram_index.offsets) - 1
+        positions = np.empty(0, dtype=np.int64)
+        return Partition(
+            value=value,
+            positions=positions,
+            ngram_index=NgramIndex(
+                ngram_ids=self._ngram_index.ngram_ids,
+                offsets=np.zeros(num_ngrams + 1, dtype=np.int64),
+                postings=np.empty(0, dtype=np.int32),
+                ngram_counts=self._ngram_index.ngram_counts,
+                has_duplicates=self._ngram_index.has_duplicates,
+            ),
+            spatial_index=SpatialIndex.from_columns(self._shape_columns, positions=positions),
+        )
+
+    def __getitem__(self, value) -> Partition:
+        return self.partitions[value]
+
+    def __iter__(self):
+        return iter(self.partitions)
+
+    def __len__(self):
+        return len(self.partitions)
+
+    def lookup(self, value) -> Partition:
+        """Partition of `value`, an empty partition if it was not loaded"""
+        partition = self.partitions.get(value)
+        if partition is not None:
+            return partition
+        if self._empty is None:
+            self._empty = self._new_partition(None)
+        return self._empty
+
+    def add_shape(self, value: Any, position: int, ngram_ls: Sequence[str]):
+        """Add an entity to the partition of `value`, created if it is new"""
+        partition = self.partitions.get(value)
+        if partition is None:
+            partition = self.partitions[value] = self._new_partition(value)
+        partition.add_shape(position, ngram_ls)
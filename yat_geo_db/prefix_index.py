@@ -0,0 +1,136 @@
+"""
+Population ranked prefix index over clean values, serves queries too short
+to have n-grams
+"""
+import numpy as np
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+PREFIX_KEY_LENGTH = 8  # Bytes of each clean value kept, longest prefix served
+PREFIX_TOP_LENGTH = 2  # Prefixes up to this length have their top shapes precomputed
+PREFIX_TOP_N = 500
+
+
+class PrefixIndex(object):
+    """
+    Shape positions sorted by the first `PREFIX_KEY_LENGTH` bytes of their
+    lowercase clean value, the shapes starting with a prefix are one
+    `searchsorted` range.  Matches rank by descending population then
+    position.  The top `PREFIX_TOP_N` matches of every prefix up to
+    `PREFIX_TOP_LENGTH` bytes are precomputed.  Shapes added or replaced
+    after the build are kept in memory and merged into every lookup.
+    """
+    def __init__(self,
+                 keys: np.ndarray,
+                 positions: np.ndarray,
+                 populations: np.ndarray,
+                 top_keys: np.ndarray,
+                 top_offsets: np.ndarray,
+                 top_positions: np.ndarray):
+        self.keys = keys
+        self.positions = positions
+        self.populations = populations
+        self.top_keys = top_keys
+        self.top_offsets = top_offsets
+        self.top_positions = top_positions
+        self._added: Dict[int, Tuple[bytes, float]] = {}
+
+    @classmethod
+    def from_values(cls, clean_values: Sequence[str], populations: Sequence[float]):
+        """Build from lowercase clean values and populations by shape position"""
+        keys = np.array(
+            [value.encode('utf-8')[:PREFIX_KEY_LENGTH] for value in clean_values],
+            dtype=f'S{PREFIX_KEY_LENGTH}'
+        )
+        populations = np.nan_to_num(np.asarray(populations, dtype=np.float64))
+        positions = np.argsort(keys, kind='stable').astype(np.int32)
+        keys = keys[positions]
+
+        top_keys = []
+        top_chunks = []
+        for length in range(1, PREFIX_TOP_LENGTH + 1):
+            prefixes = keys.astype(f'S{length}')
+            group_keys, starts = np.unique(prefixes, return_index=True)
+            ends = np.append(starts[1:], len(prefixes))
+            for group_key, start, end in zip(group_keys, starts, ends):
+                if len(group_key) < length:
+                    continue
+                group = positions[start:end]
+                order = np.lexsort((group, -populations[group]))[:PREFIX_TOP_N]
+                top_keys.append(group_key)
+                top_chunks.append(group[order])
+
+        top_keys = np.array(top_keys, dtype=f'S{PREFIX_TOP_LENGTH}')
+        order = np.argsort(top_keys, kind='stable')
+        top_chunks = [top_chunks[index] for index in order]
+        top_offsets = np.zeros(len(top_chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in top_chunks], out=top_offsets[1:])
+        return cls(
+            keys=keys,
+            positions=positions,
+            populations=populations,
+            top_keys=top_keys[order],
+            top_offsets=top_offsets,
+            top_positions=np.concatenate(top_chunks).astype(np.int32) if top_chunks else np.empty(0, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]):
+        """Rebuild from `to_arrays` output, arrays may be memory-mapped"""
+        return cls(**arrays)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Index as named arrays, shapes added after the build are not included"""
+        return {
+            'keys': self.keys,
+            'positions': self.positions,
+            'populations': self.populations,
+            'top_keys': self.top_keys,
+            'top_offsets': self.top_offsets,
+            'top_positions': self.top_positions,
+        }
+
+    def add(self, position: int, clean_value: str, population: float):
+        """Add or replace the shape at a position"""
+        self._added[position] = (clean_value.encode('utf-8')[:PREFIX_KEY_LENGTH], float(population or 0))
+
+    def top(self, prefix: str, limit: int, keep: Callable[[np.ndarray], np.ndarray] = None) -> np.ndarray:
+        """
+        Positions of up to `limit` shapes starting with `prefix`, most
+        populated first, among the positions `keep` allows
+        """
+        encoded = prefix.encode('utf-8')
+        if len(encoded) > PREFIX_KEY_LENGTH:
+            raise ValueError(f'Prefix longer than {PREFIX_KEY_LENGTH} bytes, prefix={prefix}')
+
+        if keep is None and not self._added and 0 < len(encoded) <= PREFIX_TOP_LENGTH and limit <= PREFIX_TOP_N:
+            index = int(np.searchsorted(self.top_keys, encoded))
+            if index < len(self.top_keys) and self.top_keys[index] == encoded:
+                return self.top_positions[self.top_offsets[index]:self.top_offsets[index + 1]][:limit]
+            return np.empty(0, dtype=np.int32)
+
+        start = int(np.searchsorted(self.keys, encoded, side='left'))
+        if len(encoded) < PREFIX_KEY_LENGTH:
+            end = int(np.searchsorted(self.keys, encoded + b'\xff', side='left'))
+        else:
+            end = int(np.searchsorted(self.keys, encoded, side='right'))
+        positions = self.positions[start:end].astype(np.int64)
+        populations = self.populations[positions]
+        if self._added:
+            positions, populations = self._merge_added(encoded, positions, populations)
+        if keep is not None:
+            kept = keep(positions)
+            positions, populations = positions[kept], populations[kept]
+        order = np.lexsort((positions, -populations))[:limit]
+        return positions[order]
+
+    def _merge_added(self, encoded: bytes, positions: np.ndarray, populations: np.ndarray):
+        replaced = np.isin(positions, list(self._added))
+        added: List[Tuple[int, float]] = [
+            (position, population) for position, (key, population) in self._added.items()
+            if key.startswith(encoded)
+        ]
+        return (
+            np.concatenate([positions[~replaced], np.array([position for position, _ in added], dtype=np.int64)]),
+            np.concatenate([populations[~replaced], np.array([population for _, population in added], dtype=np.float64)]),
+        )
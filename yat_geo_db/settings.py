@@ -2,4 +2,7 @@
 Localized settings for package
 """
 
-BASE_STORE_URL="https://yat-geo-db.sfo3.digitaloceanspaces.com"
\ No newline at end of file
+BASE_STORE_URL="https://yat-geo-db.sfo3.digitaloceanspaces.com"
+
+SEARCH_FILE_NAME="geo_manager_ngram_search.json"
+GEO_SHAPE_FILE_NAME="geo_manager_shape.json"
@@ -0,0 +1,172 @@
+"""
+Binary, memory-mappable snapshot of a loaded Geo DB
+
+A snapshot is a directory of `.npy` arrays plus `meta.json`.  Strings are
+stored as tables (utf-8 bytes with offsets), lookups by reference code and id
+are sorted arrays searched with `numpy.searchsorted`, shape records are compact
+JSON decoded on access, and index structures (columns, spatial index, n-gram
+posting lists) are stored as the arrays they are built from.  Loading with `mmap=True` maps the arrays
+read-only, so start up does no parsing and the OS page cache is shared by
+every process reading the same snapshot.
+"""
+from .tables import PositionMap, SortedLookup, StringTable
+
+from collections.abc import MutableMapping
+from datetime import datetime, timezone
+from functools import lru_cache
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from typing import Dict, List
+
+SNAPSHOT_FORMAT = 'yat_geo_db.snapshot'
+SNAPSHOT_FORMAT_VERSION = 2
+META_FILE_NAME = 'meta.json'
+RECORD_CACHE_SIZE = 8192
+
+
+class SnapshotShapeDict(MutableMapping):
+    """
+    `geo_shape_dict` backed by snapshot tables, records are decoded on access.
+    Entries added after load (`add_entity`) are kept in memory on top.
+    """
+    def __init__(self, reference_codes: StringTable, records: StringTable, positions: SortedLookup):
+        self.reference_codes = reference_codes
+        self.records = records
+        self.positions = positions
+        self._added = {}
+        self.record_at = lru_cache(maxsize=RECORD_CACHE_SIZE)(self._decode_record)
+
+    def _decode_record(self, position: int) -> Dict:
+        return json.loads(self.records[position])
+
+    def __getitem__(self, key) -> Dict:
+        if key in self._added:
+            return self._added[key]
+        return self.record_at(self.positions[key])
+
+    def __setitem__(self, key, value):
+        self._added[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._added:
+            raise TypeError('Snapshot shapes are read-only')
+        del self._added[key]
+
+    def __iter__(self):
+        for reference_code in self.reference_codes:
+            if reference_code not in self._added:
+                yield reference_code
+        yield from self._added
+
+    def __len__(self):
+        return len(self.reference_codes) + sum(
+            1 for key in self._added if key not in self.positions
+        )
+
+
+def write_snapshot(path: str,
+                   reference_codes: List[str],
+                   records: List[Dict],
+                   arrays: Dict[str, np.ndarray],
+                   meta: Dict) -> None:
+    """
+    Write snapshot directory, written to a temporary directory first and
+    renamed into place so readers never see a partial snapshot
+    """
+    ids = [record.get('id') for record in records]
+    if not all(isinstance(shape_id, int) and not isinstance(shape_id, bool) for shape_id in ids):
+        raise ValueError('Snapshots require integer shape ids')
+
+    tables = {
+        'reference_codes': StringTable.from_strings(reference_codes).to_arrays(),
+        'records': StringTable.from_strings(
+            json.dumps(record, separators=(',', ':')) for record in records
+        ).to_arrays(),
+        'reference_code_lookup': SortedLookup.from_keys(reference_codes).to_arrays(),
+        'id_lookup': SortedLookup.from_keys(ids).to_arrays(),
+    }
+    all_arrays = {
+        f'{table}.{name}': array for table, table_arrays in tables.items()
+        for name, array in table_arrays.items()
+    }
+    all_arrays.update(arrays)
+
+    meta = dict(
+        meta,
+        format=SNAPSHOT_FORMAT,
+        format_version=SNAPSHOT_FORMAT_VERSION,
+        num_shapes=len(reference_codes),
+        created=datetime.now(timezone.utc).isoformat(),
+        arrays=sorted(all_arrays),
+    )
+
+    path = os.path.abspath(path)
+    temp_path = f'{path}.tmp-{os.getpid()}'
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    for name, array in all_arrays.items():
+        np.save(os.path.join(temp_path, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(temp_path, META_FILE_NAME), 'w') as f:
+        json.dump(meta, f)
+
+    if os.path.exists(path):
+        old_path = f'{path}.old-{os.getpid()}'
+        os.rename(path, old_path)
+        os.rename(temp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.rename(temp_path, path)
+
+
+def default_shared_path(data_version: str = None) -> str:
+    """
+    Snapshot path for a shared dataset, in `/dev/shm` (memory backed) where
+    available
+    """
+    shared_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(shared_dir, f"yat_geo_db-{data_version or 'current'}-{os.getpid()}")
+
+
+class Snapshot(object):
+    """Arrays and lazy mappings read from a snapshot directory"""
+    def __init__(self, path: str, mmap: bool = True):
+        with open(os.path.join(path, META_FILE_NAME), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f'Not a Geo DB snapshot path={path}')
+        if self.meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format_version={self.meta.get('format_version')} path={path}"
+            )
+
+        mmap_mode = 'r' if mmap else None
+        self.arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in self.meta['arrays']
+        }
+
+        self.reference_codes = StringTable(
+            self.arrays['reference_codes.offsets'], self.arrays['reference_codes.data']
+        )
+        self.shape_position_map = SortedLookup(
+            self.arrays['reference_code_lookup.keys'], self.arrays['reference_code_lookup.positions']
+        )
+        self.geo_shape_dict = SnapshotShapeDict(
+            reference_codes=self.reference_codes,
+            records=StringTable(self.arrays['records.offsets'], self.arrays['records.data']),
+            positions=self.shape_position_map,
+        )
+        self.id_reference_code_map = PositionMap(
+            SortedLookup(self.arrays['id_lookup.keys'], self.arrays['id_lookup.positions']),
+            self.reference_codes.__getitem__
+        )
+
+    def prefixed_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """Arrays stored under `<prefix>.<name>`, keyed by name"""
+        return {
+            name[len(prefix) + 1:]: array for name, array in self.arrays.items()
+            if name.startswith(f'{prefix}.')
+        }
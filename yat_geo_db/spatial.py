@@ -0,0 +1,328 @@
+"""
+Spatial index over Geo Shape positions used to narrow Radius Search candidates
+"""
+from .geometry import EARTH_RADIUS_MILES, lat_lng_dist_array
+
+import numpy as np
+from typing import Callable, Iterator, Optional, Tuple
+
+
+GRID_CELL_DEGREES = 0.5
+# Aggregates whose bounding box spans more cells are checked on every query
+MAX_BOX_CELLS = 256
+# Cell coordinates are clipped to +/- CELL_LIMIT so keys of a row stay contiguous
+CELL_LIMIT = 1 << 20
+# Padding (degrees) on query ranges to absorb floating point error at cell edges
+CELL_EPSILON = 1e-9
+
+
+def cell_coord(value, cell_size: float = GRID_CELL_DEGREES):
+    """Grid row/column of a latitude/longitude (scalar or array)"""
+    cell = np.floor(np.asarray(value, dtype=np.float64) / cell_size)
+    return np.clip(cell, -CELL_LIMIT, CELL_LIMIT - 1).astype(np.int64)
+
+
+def cell_key(row, col):
+    """Single sortable key for a grid cell, contiguous along a row"""
+    return (np.asarray(row, dtype=np.int64) + CELL_LIMIT) * (2 * CELL_LIMIT) + \
+        (np.asarray(col, dtype=np.int64) + CELL_LIMIT)
+
+
+class CellIndex(object):
+    """
+    Positions grouped by grid cell, stored as one sorted key array and a
+    parallel array of positions (CSR style) so lookups are `searchsorted` calls
+    """
+    def __init__(self, keys: np.ndarray, positions: np.ndarray):
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.positions = positions[order].astype(np.int64)
+
+    @classmethod
+    def from_arrays(cls, keys: np.ndarray, positions: np.ndarray):
+        """Rebuild from already sorted keys/positions, arrays may be memory-mapped"""
+        cell_index = cls.__new__(cls)
+        cell_index.keys = keys
+        cell_index.positions = positions
+        return cell_index
+
+    def __len__(self):
+        return len(self.positions)
+
+    def lookup(self, row_lo: int, row_hi: int, col_lo: int, col_hi: int) -> np.ndarray:
+        """Positions stored in the inclusive block of cells"""
+        if len(self.keys) == 0 or row_hi < row_lo or col_hi < col_lo:
+            return np.empty(0, dtype=np.int64)
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        starts = np.searchsorted(self.keys, cell_key(rows, col_lo), side='left')
+        ends = np.searchsorted(self.keys, cell_key(rows, col_hi), side='right')
+        slices = [self.positions[s:e] for s, e in zip(starts, ends) if e > s]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(slices)
+
+
+class SpatialIndex(object):
+    """
+    Uniform lat/lng grid for point shapes and a cell-registered bounding box
+    structure for aggregate shapes.  Lookups return candidate positions only,
+    exact radius checks are still applied by the caller.
+    """
+    def __init__(self,
+                 latitude: np.ndarray,
+                 longitude: np.ndarray,
+                 is_aggregate: np.ndarray,
+                 ll_latitude: np.ndarray,
+                 ll_longitude: np.ndarray,
+                 ur_latitude: np.ndarray,
+                 ur_longitude: np.ndarray,
+                 cell_size: float = GRID_CELL_DEGREES,
+                 positions: np.ndarray = None):
+        self.cell_size = cell_size
+        self.latitude = latitude
+        self.longitude = longitude
+        is_aggregate = np.asarray(is_aggregate, dtype=bool)
+        if positions is None:
+            positions = np.arange(len(is_aggregate), dtype=np.int64)
+        else:
+            # Index only these positions, columns stay full length
+            positions = np.asarray(positions, dtype=np.int64)
+            latitude, longitude, is_aggregate = latitude[positions], longitude[positions], is_aggregate[positions]
+            ll_latitude, ll_longitude = ll_latitude[positions], ll_longitude[positions]
+            ur_latitude, ur_longitude = ur_latitude[positions], ur_longitude[positions]
+
+        # Centroids of every Shape, for nearest neighbour search
+        centroid_ok = np.isfinite(latitude) & np.isfinite(longitude)
+        centroid_rows = cell_coord(latitude[centroid_ok], cell_size)
+        centroid_cols = cell_coord(longitude[centroid_ok], cell_size)
+        self.centroid_cells = CellIndex(cell_key(centroid_rows, centroid_cols), positions[centroid_ok])
+        self.centroid_row_range = self._coord_range(centroid_rows)
+        self.centroid_col_range = self._coord_range(centroid_cols)
+
+        # Point Shapes, one cell each
+        point_ok = ~is_aggregate & np.isfinite(latitude) & np.isfinite(longitude)
+        point_pos = positions[point_ok]
+        point_rows = cell_coord(latitude[point_ok], cell_size)
+        point_cols = cell_coord(longitude[point_ok], cell_size)
+        self.point_cells = CellIndex(cell_key(point_rows, point_cols), point_pos)
+        self.point_row_range = self._coord_range(point_rows)
+        self.point_col_range = self._coord_range(point_cols)
+
+        # Aggregate Shapes, registered in every cell their bounding box overlaps
+        box_ok = (
+            is_aggregate &
+            np.isfinite(ll_latitude) & np.isfinite(ur_latitude) &
+            np.isfinite(ll_longitude) & np.isfinite(ur_longitude) &
+            (ll_latitude <= ur_latitude) & (ll_longitude <= ur_longitude)
+        )
+        box_pos = positions[box_ok]
+        row_lo = cell_coord(ll_latitude[box_ok], cell_size)
+        row_hi = cell_coord(ur_latitude[box_ok], cell_size)
+        col_lo = cell_coord(ll_longitude[box_ok], cell_size)
+        col_hi = cell_coord(ur_longitude[box_ok], cell_size)
+        width = col_hi - col_lo + 1
+        num_cells = (row_hi - row_lo + 1) * width
+
+        large = num_cells > MAX_BOX_CELLS
+        self.box_overflow = box_pos[large]
+
+        small = ~large
+        box_pos, row_lo, col_lo = box_pos[small], row_lo[small], col_lo[small]
+        width, num_cells = width[small], num_cells[small]
+        owner = np.repeat(np.arange(len(box_pos)), num_cells)
+        offset = np.arange(num_cells.sum()) - np.repeat(np.cumsum(num_cells) - num_cells, num_cells)
+        rows = row_lo[owner] + offset // width[owner]
+        cols = col_lo[owner] + offset % width[owner]
+        self.box_cells = CellIndex(cell_key(rows, cols), box_pos[owner])
+
+    @staticmethod
+    def _coord_range(coords: np.ndarray):
+        if len(coords) == 0:
+            return (0, -1)
+        return (int(coords.min()), int(coords.max()))
+
+    @classmethod
+    def from_columns(cls, columns, cell_size: float = GRID_CELL_DEGREES, positions: np.ndarray = None):
+        """Build index from a `ShapeColumns` store, over every shape or only `positions`"""
+        return cls(
+            latitude=columns.latitude,
+            longitude=columns.longitude,
+            is_aggregate=columns.is_aggregate,
+            ll_latitude=columns.ll_latitude,
+            ll_longitude=columns.ll_longitude,
+            ur_latitude=columns.ur_latitude,
+            ur_longitude=columns.ur_longitude,
+            cell_size=cell_size,
+            positions=positions,
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays, latitude: np.ndarray, longitude: np.ndarray):
+        """Rebuild index from `to_arrays` output and the coordinate columns"""
+        index = cls.__new__(cls)
+        index.cell_size = float(arrays['cell_size'][0])
+        index.latitude = latitude
+        index.longitude = longitude
+        for name in ('centroid', 'point', 'box'):
+            setattr(index, f'{name}_cells', CellIndex.from_arrays(
+                arrays[f'{name}_keys'], arrays[f'{name}_positions']
+            ))
+        index.box_overflow = arrays['box_overflow']
+        ranges = [int(value) for value in arrays['ranges']]
+        index.centroid_row_range, index.centroid_col_range = tuple(ranges[0:2]), tuple(ranges[2:4])
+        index.point_row_range, index.point_col_range = tuple(ranges[4:6]), tuple(ranges[6:8])
+        return index
+
+    def to_arrays(self):
+        """Index state as named arrays, coordinate columns are not included"""
+        arrays = {
+            'cell_size': np.array([self.cell_size], dtype=np.float64),
+            'box_overflow': self.box_overflow,
+            'ranges': np.array(
+                self.centroid_row_range + self.centroid_col_range +
+                self.point_row_range + self.point_col_range,
+                dtype=np.int64
+            ),
+        }
+        for name in ('centroid', 'point', 'box'):
+            cell_index = getattr(self, f'{name}_cells')
+            arrays[f'{name}_keys'] = cell_index.keys
+            arrays[f'{name}_positions'] = cell_index.positions
+        return arrays
+
+    def point_candidates(self, latitude: float, longitude: float, lat_delta: float, lng_delta: float) -> np.ndarray:
+        """Positions of point shapes inside the lat/lng box around the origin"""
+        lat_delta = abs(lat_delta)
+        lng_delta = abs(lng_delta)
+        return self.point_candidates_in(
+            latitude - lat_delta, latitude + lat_delta, longitude - lng_delta, longitude + lng_delta
+        )
+
+    def point_candidates_in(self, lat_lo: float, lat_hi: float, lng_lo: float, lng_hi: float) -> np.ndarray:
+        """Positions of point shapes inside a lat/lng box"""
+        row_lo = max(int(cell_coord(lat_lo - CELL_EPSILON, self.cell_size)), self.point_row_range[0])
+        row_hi = min(int(cell_coord(lat_hi + CELL_EPSILON, self.cell_size)), self.point_row_range[1])
+        col_lo = max(int(cell_coord(lng_lo - CELL_EPSILON, self.cell_size)), self.point_col_range[0])
+        col_hi = min(int(cell_coord(lng_hi + CELL_EPSILON, self.cell_size)), self.point_col_range[1])
+        return self.point_cells.lookup(row_lo, row_hi, col_lo, col_hi)
+
+    def aggregate_candidates(self, latitude: float, longitude: float) -> np.ndarray:
+        """Positions of aggregate shapes whose bounding box may contain the origin"""
+        row = int(cell_coord(latitude, self.cell_size))
+        col = int(cell_coord(longitude, self.cell_size))
+        return np.concatenate([
+            self.box_cells.lookup(row, row, col, col), self.box_overflow
+        ])
+
+    def candidates(self, latitude: float, longitude: float, lat_delta: float, lng_delta: float) -> np.ndarray:
+        """Sorted positions of all shapes that may match a radius query"""
+        if not (np.isfinite(latitude) and np.isfinite(longitude)):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([
+            self.point_candidates(latitude, longitude, lat_delta, lng_delta),
+            self.aggregate_candidates(latitude, longitude),
+        ]))
+
+    def group_candidates(self,
+                         latitudes: np.ndarray,
+                         longitudes: np.ndarray,
+                         lat_delta: float,
+                         lng_deltas: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Group origins by grid cell and yield `(origin_indices, positions)`
+        with the sorted candidate positions shared by every origin in the group
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        lat_delta = abs(lat_delta)
+        lng_deltas = np.abs(np.broadcast_to(lng_deltas, latitudes.shape))
+
+        valid = np.flatnonzero(np.isfinite(latitudes) & np.isfinite(longitudes))
+        keys = cell_key(
+            cell_coord(latitudes[valid], self.cell_size),
+            cell_coord(longitudes[valid], self.cell_size)
+        )
+        _, group_ids = np.unique(keys, return_inverse=True)
+        order = np.argsort(group_ids, kind='stable')
+        bounds = np.flatnonzero(np.diff(group_ids[order])) + 1
+        for group in np.split(valid[order], bounds):
+            if len(group) == 0:
+                continue
+            group_lat = latitudes[group]
+            group_lng = longitudes[group]
+            max_lng_delta = lng_deltas[group].max()
+            yield group, np.sort(np.concatenate([
+                self.point_candidates_in(
+                    group_lat.min() - lat_delta, group_lat.max() + lat_delta,
+                    group_lng.min() - max_lng_delta, group_lng.max() + max_lng_delta
+                ),
+                self.aggregate_candidates(group_lat[0], group_lng[0]),
+            ]))
+
+    def _outside_block_distance(self, latitude: float, longitude: float,
+                                row_lo: int, row_hi: int, col_lo: int, col_hi: int) -> float:
+        """
+        Lower bound (miles) on the distance from the origin to any centroid
+        outside a block of cells, infinite once the block covers every centroid
+        """
+        bounds = [np.inf]
+        lat_lo, lat_hi = row_lo * self.cell_size, (row_hi + 1) * self.cell_size
+        if row_lo > self.centroid_row_range[0]:
+            bounds.append(np.radians(latitude - lat_lo) * EARTH_RADIUS_MILES)
+        if row_hi < self.centroid_row_range[1]:
+            bounds.append(np.radians(lat_hi - latitude) * EARTH_RADIUS_MILES)
+        # Longitude gaps to centroids west and east of the block, wrapped at +-180:
+        # the gap to the farthest centroid column on a side bounds the way around
+        lng_gaps = []
+        if col_lo > self.centroid_col_range[0]:
+            near_gap = longitude - col_lo * self.cell_size
+            far_gap = longitude - self.centroid_col_range[0] * self.cell_size
+            lng_gaps.append(min(near_gap, 360 - far_gap))
+        if col_hi < self.centroid_col_range[1]:
+            near_gap = (col_hi + 1) * self.cell_size - longitude
+            far_gap = (self.centroid_col_range[1] + 1) * self.cell_size - longitude
+            lng_gaps.append(min(near_gap, 360 - far_gap))
+        if lng_gaps:
+            # Haversine with the smallest longitude gap and widest latitude in the block
+            lng_gap = max(min(lng_gaps), 0.0)
+            min_cos = min(np.cos(np.radians(np.clip(value, -90, 90))) for value in (lat_lo, lat_hi))
+            hav = np.cos(np.radians(latitude)) * max(min_cos, 0.0) * np.sin(np.radians(min(lng_gap, 180)) / 2) ** 2
+            bounds.append(2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(min(max(hav, 0.0), 1.0))))
+        return max(min(bounds), 0.0)
+
+    def nearest(self,
+                latitude: float,
+                longitude: float,
+                k: int = 1,
+                keep: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The `k` centroids closest to the origin by `lat_lng_dist`, searching a
+        growing block of grid cells until no unvisited cell can hold a closer
+        centroid.  `keep` optionally maps positions to a boolean mask.
+
+        Returns sorted `(positions, distances)`, nearest first
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        if k <= 0 or len(self.centroid_cells) == 0 or not (np.isfinite(latitude) and np.isfinite(longitude)):
+            return empty
+
+        row = int(cell_coord(latitude, self.cell_size))
+        col = int(cell_coord(longitude, self.cell_size))
+        reach = 1
+        while True:
+            row_lo, row_hi = row - reach, row + reach
+            col_lo, col_hi = col - reach, col + reach
+            positions = self.centroid_cells.lookup(
+                max(row_lo, self.centroid_row_range[0]), min(row_hi, self.centroid_row_range[1]),
+                max(col_lo, self.centroid_col_range[0]), min(col_hi, self.centroid_col_range[1]),
+            )
+            if keep is not None and len(positions):
+                positions = positions[keep(positions)]
+            distances = lat_lng_dist_array(
+                latitude, longitude, self.latitude[positions], self.longitude[positions]
+            )
+            bound = self._outside_block_distance(latitude, longitude, row_lo, row_hi, col_lo, col_hi)
+            if bound == np.inf or (len(positions) >= k and np.partition(distances, k - 1)[k - 1] <= bound):
+                order = np.lexsort((positions, distances))[:k]
+                return positions[order], distances[order]
+            reach *= 2
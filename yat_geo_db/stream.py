@@ -0,0 +1,227 @@
+"""
+Streaming reads of Geo Database Dump files
+
+Files are read in chunks, gzip payloads are inflated by a streaming decoder
+and the top level JSON object is parsed one member at a time, so loading
+holds the parsed structures plus about one chunk of text rather than the
+compressed bytes, the inflated bytes and the decoded text of a whole file.
+"""
+import codecs
+import json
+from json.decoder import WHITESPACE
+import re
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+STREAM_CHUNK_SIZE = 1 << 16
+GZIP_WBITS = zlib.MAX_WBITS | 16
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+JSON_WHITESPACE = frozenset(' \t\n\r')
+MEMBER_KEY = re.compile(r'[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*:')
+MEMBER_END = re.compile(r'[ \t\n\r]*([,}])')
+# Comma and key of an object or array member, following a closed container
+MEMBER_BOUNDARY = re.compile(r'[ \t\n\r]*(,)[ \t\n\r]*"([^"\\\x00-\x1f]*)"[ \t\n\r]*:[ \t\n\r]*[{\[]')
+
+
+def iter_file_chunks(f: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a binary file in chunks"""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def inflate_chunks(chunks: Iterable[bytes], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Inflate gzip compressed chunks, output chunks are at most `chunk_size` bytes"""
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    for data in chunks:
+        while data:
+            if decompressor.eof:
+                # Concatenated gzip members
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+            inflated = decompressor.decompress(data, chunk_size)
+            data = decompressor.unconsumed_tail or decompressor.unused_data
+            if inflated:
+                yield inflated
+    inflated = decompressor.flush()
+    if inflated:
+        yield inflated
+    if not decompressor.eof:
+        raise ValueError('Truncated gzip stream')
+
+
+def add_container_keys(value: Any, keys: Set[str]):
+    """Add the keys of nested members holding an object or an array"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, (dict, list)):
+                keys.add(key)
+                add_container_keys(item, keys)
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)):
+                add_container_keys(item, keys)
+
+
+class JSONObjectStream(object):
+    """
+    Incremental parser of a JSON object read from utf-8 chunks.  Members
+    are decoded by the standard library decoder, a batch of complete members
+    at a time: the batch ends at the last top level member boundary in the
+    buffer, located by pattern and confirmed by the decoder (a cut inside a
+    nested value never parses).  Keys of nested containers seen so far are
+    skipped as boundaries, and members around a failed batch are parsed one
+    at a time.  The text buffer holds about one chunk.
+    """
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._scan_once = json.JSONDecoder().scan_once
+        self._container_keys: Set[str] = set()
+        self._batch_ok = False
+        self._learned = False
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read(self) -> bool:
+        """Append the next chunk to the unread text, False at end of input"""
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            text = self._text_decoder.decode(b'', final=True)
+            self.eof = True
+        else:
+            text = self._text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        self._batch_ok = True
+        return True
+
+    def _read_more(self) -> bool:
+        """Read until the unread text doubles, so long values parse in amortized linear time"""
+        target = 2 * (len(self.buffer) - self.pos) + 1
+        read = False
+        while len(self.buffer) - self.pos < target and self._read():
+            read = True
+        return read
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._read():
+                return
+
+    def _expect(self, chars: str) -> str:
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer) or self.buffer[self.pos] not in chars:
+            raise json.JSONDecodeError(f'Expecting one of {chars!r}', self.buffer, self.pos)
+        char = self.buffer[self.pos]
+        self.pos += 1
+        return char
+
+    def _value(self) -> Any:
+        while True:
+            try:
+                value, end = self._scan_once(self.buffer, self.pos)
+            except (StopIteration, json.JSONDecodeError):
+                char = self.buffer[self.pos:self.pos + 1]
+                if char and char in JSON_WHITESPACE:
+                    self._skip_whitespace()
+                    continue
+                if self._read_more():
+                    continue
+                # Raise the decoder's error for the incomplete text
+                json.JSONDecoder().raw_decode(self.buffer, self.pos)
+                raise json.JSONDecodeError('Expecting value', self.buffer, self.pos)
+            # A number cut by the end of the buffer may continue in the next chunk
+            if (end == len(self.buffer) or self.buffer[end] in NUMBER_CHARS) and self._read_more():
+                continue
+            self.pos = end
+            return value
+
+    def _batch(self) -> Optional[Dict]:
+        """Members before the last top level boundary in the buffer, None if there is none"""
+        buffer = self.buffer
+        # Closing brackets are far fewer than commas in lists of values
+        last_brace = buffer.rfind('}', self.pos)
+        last_bracket = buffer.rfind(']', self.pos)
+        while True:
+            close = max(last_brace, last_bracket)
+            if close < 0:
+                self._batch_ok = False
+                return None
+            if close == last_brace:
+                last_brace = buffer.rfind('}', self.pos, close)
+            else:
+                last_bracket = buffer.rfind(']', self.pos, close)
+            match = MEMBER_BOUNDARY.match(buffer, close + 1)
+            if match is not None and match.group(2) not in self._container_keys:
+                cut = match.start(1)
+                break
+        text = '{' + buffer[self.pos:cut] + '}'
+        try:
+            members, end = self._scan_once(text, 0)
+        except (StopIteration, json.JSONDecodeError):
+            end = -1
+        if end != len(text):
+            # Not a top level boundary, parse one member at a time until the next read
+            self._batch_ok = False
+            return None
+        self.pos = cut + 1
+        return members
+
+    def _member(self) -> Tuple[str, Any]:
+        # Plain keys are matched directly, others go through the decoder
+        match = MEMBER_KEY.match(self.buffer, self.pos)
+        if match is not None:
+            key = match.group(1)
+            self.pos = match.end()
+        else:
+            self._skip_whitespace()
+            key = self._value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError('Expecting property name', self.buffer, self.pos)
+            self._expect(':')
+        value = self._value()
+        add_container_keys(value, self._container_keys)
+        self._learned = True
+        return key, value
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Members of the object in file order"""
+        self._expect('{')
+        self._skip_whitespace()
+        if self.buffer[self.pos:self.pos + 1] == '}':
+            self.pos += 1
+        else:
+            while True:
+                if self._learned and self._batch_ok:
+                    members = self._batch()
+                    if members is not None:
+                        yield from members.items()
+                        continue
+                yield self._member()
+                match = MEMBER_END.match(self.buffer, self.pos)
+                if match is not None:
+                    self.pos = match.end()
+                    separator = match.group(1)
+                else:
+                    separator = self._expect(',}')
+                if separator == '}':
+                    break
+        self._skip_whitespace()
+        if self.pos < len(self.buffer):
+            raise json.JSONDecodeError('Extra data', self.buffer, self.pos)
+
+
+def iter_json_object_items(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+    """Members of the JSON object in `chunks`, parsed incrementally"""
+    return JSONObjectStream(chunks).items()
+
+
+def load_json_object(chunks: Iterable[bytes]) -> Dict:
+    """Parse the JSON object in `chunks` incrementally"""
+    return dict(iter_json_object_items(chunks))
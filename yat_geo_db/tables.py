@@ -0,0 +1,158 @@
+"""
+Array backed tables used for compact and memory-mappable lookups
+"""
+from collections.abc import Mapping, Sequence
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class StringTable(Sequence):
+    """Sequence of strings stored as utf-8 bytes with int64 offsets"""
+    def __init__(self, offsets: np.ndarray, data: np.ndarray):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]):
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(offsets=offsets, data=data)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {'offsets': self.offsets, 'data': self.data}
+
+
+class SortedLookup(Mapping):
+    """
+    Read-only mapping from keys (str or int) to positions, backed by a sorted
+    key array and a parallel array of positions
+    """
+    def __init__(self, keys: np.ndarray, positions: np.ndarray):
+        self.keys_array = keys
+        self.positions = positions
+        self.is_str = keys.dtype.kind == 'S'
+
+    @classmethod
+    def from_keys(cls, keys: List, positions: Optional[Iterable[int]] = None):
+        if positions is None:
+            positions = range(len(keys))
+        if keys and isinstance(keys[0], str):
+            key_array = np.array([key.encode('utf-8') for key in keys], dtype=bytes)
+        else:
+            key_array = np.array(keys, dtype=np.int64)
+        position_array = np.fromiter(positions, dtype=np.int64, count=len(keys))
+        order = np.argsort(key_array, kind='stable')
+        return cls(keys=key_array[order], positions=position_array[order])
+
+    def _encode(self, key):
+        if self.is_str:
+            if not isinstance(key, str):
+                return None
+            return key.encode('utf-8')
+        if isinstance(key, (bool, np.bool_)) or not isinstance(key, (int, np.integer)):
+            return None
+        return key
+
+    def __getitem__(self, key) -> int:
+        encoded = self._encode(key)
+        if encoded is not None and len(self.keys_array):
+            index = int(np.searchsorted(self.keys_array, encoded))
+            if index < len(self.keys_array) and self.keys_array[index] == encoded:
+                return int(self.positions[index])
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key in self.keys_array:
+            yield key.decode('utf-8') if self.is_str else int(key)
+
+    def __len__(self):
+        return len(self.keys_array)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {'keys': self.keys_array, 'positions': self.positions}
+
+
+class PositionMap(Mapping):
+    """
+    Read-only mapping of lookup keys to values stored by position, with
+    `length` only keys at positions below it (dense positions, lookups
+    growing past the stored values)
+    """
+    def __init__(self, lookup: SortedLookup, value_at: Callable[[int], object], length: Optional[int] = None):
+        self.lookup = lookup
+        self.value_at = value_at
+        self.length = length
+
+    def __getitem__(self, key):
+        position = self.lookup[key]
+        if self.length is not None and position >= self.length:
+            raise KeyError(key)
+        return self.value_at(position)
+
+    def __iter__(self):
+        if self.length is None:
+            return iter(self.lookup)
+        return (key for key, position in self.lookup.items() if position < self.length)
+
+    def __len__(self):
+        if self.length is None:
+            return len(self.lookup)
+        return min(self.length, len(self.lookup))
+
+
+class PositionSequence(Sequence):
+    """Read-only sequence of values built by position on access"""
+    def __init__(self, length: int, values: Callable[[int], object]):
+        self.length = length
+        self.values = values
+
+    def __getitem__(self, position: int):
+        if not 0 <= position < self.length:
+            raise IndexError(position)
+        return self.values(int(position))
+
+    def __len__(self):
+        return self.length
+
+
+class ExtendedSequence(Sequence):
+    """Read-only base sequence with values appended or replaced in memory"""
+    def __init__(self, base: Sequence):
+        self.base = base
+        self.extra = []
+        self.replaced = {}
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+        if index < len(self.base):
+            if index in self.replaced:
+                return self.replaced[index]
+            return self.base[index]
+        return self.extra[index - len(self.base)]
+
+    def __setitem__(self, index: int, value):
+        if index < 0:
+            index += len(self)
+        if index < len(self.base):
+            self.replaced[index] = value
+        else:
+            self.extra[index - len(self.base)] = value
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def append(self, value):
+        self.extra.append(value)